@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Serialization of pythonAST and genericAST trees.
+
+The binary format is written while the tree is walked and read back
+without parsing the source again. It starts with MAGIC and the format
+version, followed by a single value, each value being a tag byte and its
+payload:
+
+    NONE, FALSE, TRUE
+    INT        zigzag varint
+    STR        varint length and UTF-8 bytes, added to the string table
+    STR_REF    varint index in the string table
+    LIST       varint length and the items
+    TUPLE      varint length and the items
+    OBJECT     shape, then the value of each field of the shape
+    REDUCE     shape and the tuple of arguments rebuilding the object, for
+               classes defining __reduce__ such as the interned Types
+    REF        varint index of an object already written
+
+A shape is a class and the names of its fields. It is written as a varint
+index in the shape table, or as the next index followed by the module and
+name of the class, the number of fields and their names (string values)
+when it first appears. Objects are numbered in the order they are
+written, so nodes shared by several parents (e.g. the return statements
+of a FuncDecl) are written once. Only classes of
+SERIALIZABLE_MODULES are written or rebuilt, objects are rebuilt with
+their attributes without calling __init__.
+"""
+
+import gc
+import importlib
+import json
+
+MAGIC = b"PYAST"
+FORMAT_VERSION = 1
+SERIALIZABLE_MODULES = ("pythonAST", "genericAST", "pythonSymbolTable", "genericParallel")
+# bytes buffered before they are written to the output
+BUFFER_SIZE = 1 << 16
+
+NONE, FALSE, TRUE, INT, STR, STR_REF, LIST, TUPLE, OBJECT, REDUCE, REF = range(11)
+
+
+class SerializationError(Exception): pass
+
+
+class BinaryWriter(object):
+    """
+    Writes trees to out, a binary file, in the format described above
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.buffer = bytearray()
+        self.strings = dict()
+        self.shapes = dict()
+        self.objects = dict()
+
+    def write(self, node):
+        self.buffer += MAGIC
+        self.buffer.append(FORMAT_VERSION)
+        self.value(node)
+        self.flush()
+
+    def flush(self):
+        self.out.write(self.buffer)
+        self.buffer = bytearray()
+
+    def varint(self, n):
+        while n > 0x7f:
+            self.buffer.append(n & 0x7f | 0x80)
+            n >>= 7
+        self.buffer.append(n)
+
+    def value(self, value):
+        if value is None:
+            self.buffer.append(NONE)
+        elif value is True or value is False:
+            self.buffer.append(TRUE if value else FALSE)
+        elif isinstance(value, int):
+            self.buffer.append(INT)
+            self.varint(value << 1 if value >= 0 else (-value << 1) - 1)
+        elif isinstance(value, str):
+            self.string(value)
+        elif isinstance(value, (list, tuple)):
+            self.buffer.append(LIST if isinstance(value, list) else TUPLE)
+            self.varint(len(value))
+            for item in value:
+                self.value(item)
+        else:
+            self.object(value)
+        if len(self.buffer) >= BUFFER_SIZE:
+            self.flush()
+
+    def string(self, value):
+        index = self.strings.get(value)
+        if index is not None:
+            self.buffer.append(STR_REF)
+            self.varint(index)
+            return
+        self.strings[value] = len(self.strings)
+        data = value.encode()
+        self.buffer.append(STR)
+        self.varint(len(data))
+        self.buffer += data
+
+    def object(self, value):
+        index = self.objects.get(id(value))
+        if index is not None:
+            self.buffer.append(REF)
+            self.varint(index)
+            return
+        cls = value.__class__
+        if cls.__module__ not in SERIALIZABLE_MODULES:
+            raise SerializationError(f"Cannot serialize {cls.__module__}.{cls.__name__}")
+        self.objects[id(value)] = len(self.objects)
+        if cls.__reduce__ is not object.__reduce__:
+            self.buffer.append(REDUCE)
+            self.shape(cls, ())
+            self.value(tuple(value.__reduce__()[1]))
+            return
+        fields = vars(value)
+        self.buffer.append(OBJECT)
+        self.shape(cls, tuple(fields))
+        for field in fields.values():
+            self.value(field)
+
+    def shape(self, cls, names):
+        index = self.shapes.get((cls, names))
+        if index is not None:
+            self.varint(index)
+            return
+        index = self.shapes[(cls, names)] = len(self.shapes)
+        self.varint(index)
+        self.string(cls.__module__)
+        self.string(cls.__name__)
+        self.varint(len(names))
+        for name in names:
+            self.string(name)
+
+
+class BinaryReader(object):
+    """
+    Rebuilds the tree serialized in data, a bytes-like object such as a
+    memory-mapped file
+    """
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+        self.strings = []
+        self.shapes = []
+        self.objects = []
+
+    def read(self):
+        if bytes(self.data[:len(MAGIC)]) != MAGIC:
+            raise SerializationError("Not a serialized AST")
+        if len(self.data) == len(MAGIC):
+            raise SerializationError("Truncated AST")
+        self.pos = len(MAGIC) + 1
+        if self.data[len(MAGIC)] != FORMAT_VERSION:
+            raise SerializationError(f"Unsupported AST format version {self.data[len(MAGIC)]}, "
+                                     f"expected {FORMAT_VERSION}")
+        try:
+            return self.value()
+        except IndexError:
+            raise SerializationError("Truncated AST")
+
+    def varint(self):
+        data = self.data
+        byte = data[self.pos]
+        self.pos += 1
+        if byte < 0x80:
+            return byte
+        n, shift = byte & 0x7f, 7
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            n |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return n
+            shift += 7
+
+    def value(self):
+        data = self.data
+        tag = data[self.pos]
+        self.pos += 1
+        if tag == OBJECT:
+            cls, names = self.shape()
+            obj = cls.__new__(cls)
+            self.objects.append(obj)
+            fields = obj.__dict__
+            for name in names:
+                fields[name] = self.value()
+            return obj
+        if tag == INT:
+            n = data[self.pos]
+            if n < 0x80:
+                self.pos += 1
+            else:
+                n = self.varint()
+            return -((n + 1) >> 1) if n & 1 else n >> 1
+        if tag == STR_REF:
+            return self.strings[self.varint()]
+        if tag == REF:
+            return self.objects[self.varint()]
+        if tag == LIST or tag == TUPLE:
+            items = [self.value() for _ in range(self.varint())]
+            return items if tag == LIST else tuple(items)
+        if tag == NONE:
+            return None
+        if tag == STR:
+            end = self.varint() + self.pos
+            if end > len(data):
+                # slicing past the end would not fail
+                raise SerializationError("Truncated AST")
+            value = str(data[self.pos:end], "utf-8")
+            self.pos = end
+            self.strings.append(value)
+            return value
+        if tag == TRUE or tag == FALSE:
+            return tag == TRUE
+        if tag == REDUCE:
+            cls, _ = self.shape()
+            index = len(self.objects)
+            self.objects.append(None)
+            self.objects[index] = cls(*self.value())
+            return self.objects[index]
+        raise SerializationError(f"Unknown tag {tag} at offset {self.pos - 1}")
+
+    def shape(self):
+        index = self.varint()
+        if index < len(self.shapes):
+            return self.shapes[index]
+        module_name, name = self.value(), self.value()
+        if module_name not in SERIALIZABLE_MODULES:
+            raise SerializationError(f"Cannot deserialize {module_name}.{name}")
+        cls = getattr(importlib.import_module(module_name), name, None)
+        if not isinstance(cls, type) or cls.__module__ != module_name:
+            raise SerializationError(f"Unknown class {module_name}.{name}")
+        names = tuple(self.value() for _ in range(self.varint()))
+        self.shapes.append((cls, names))
+        return cls, names
+
+
+def dump(node, out):
+    """
+    Write the tree rooted at node to out, a binary file
+    """
+    BinaryWriter(out).write(node)
+
+
+def load(source):
+    """
+    Read back a tree written by dump from source, a binary file or a
+    bytes-like object
+    """
+    if hasattr(source, "read"):
+        source = source.read()
+    # the reader only creates objects, which the cycle collector would keep
+    # walking as they are allocated
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return BinaryReader(source).read()
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class JSONWriter(object):
+    """
+    Writes a tree to out, a text file, as the JSON object of its class,
+    line number, attributes (see attr_names) and children, as the text of
+    json.dumps with the given indent, without building the object first
+    """
+
+    def __init__(self, out, indent=4):
+        self.out = out
+        self.indent = " " * indent
+
+    def write(self, node, level=0):
+        write = self.out.write
+        if not hasattr(node, "children"):
+            # e.g. the ";" the parser keeps for an empty statement
+            write(json.dumps(node))
+            return
+        inner = "\n" + self.indent * (level + 1)
+        write(f"{{{inner}\"node_class\": {json.dumps(node.__class__.__name__)},{inner}\"lineno\": "
+              f"{json.dumps(node.lineno)}")
+        if node.attr_names:
+            write(f",{inner}\"attributes\": {{")
+            separator = ""
+            for name in node.attr_names:
+                write(f"{separator}{inner}{self.indent}{json.dumps(name)}: {json.dumps(attribute_value(node, name))}")
+                separator = ","
+            write(f"{inner}}}")
+        children = node.children()
+        if children:
+            write(f",{inner}\"children\": {{")
+            separator = ""
+            for (name, child) in children:
+                write(f"{separator}{inner}{self.indent}{json.dumps(name)}: ")
+                self.write(child, level + 2)
+                separator = ","
+            write(f"{inner}}}")
+        write("\n" + self.indent * level + "}")
+
+
+def attribute_value(node, name):
+    """
+    The attribute name of node as a plain value, types by their name
+    """
+    value = getattr(node, name)
+    if value.__class__.__name__ == "Type" and value.__class__.__module__ in SERIALIZABLE_MODULES:
+        return value.name
+    return value
@@ -1,5 +1,3 @@
-import secrets
-
 class CNode:
     def __init__(self, lineno: int):
         self.lineno: int = lineno
@@ -24,12 +22,23 @@ class FunctionDeclarations(CNode):
     attr_names = ()
     
 class FunctionDeclaration(CNode):
-    def __init__(self, name="", params=None, ret_type=None, body=None, lineno=0):
+    """
+    With profile set, the body is emitted as _pyrt_body_<name> and the
+    function itself becomes a wrapper timing and counting its calls.
+    With memoize set and not profile, the wrapper caches the results of
+    the body instead, see c_libs/python_memo.h.
+    attribute (const or pure) is given to the C compiler by the prototype.
+    """
+    def __init__(self, name="", params=None, ret_type=None, body=None, lineno=0, profile=False, attribute=None,
+                 memoize=False):
         self.name = name
         self.params = params
         self.ret_type = ret_type
         self.body = body
         self.lineno = lineno
+        self.profile = profile
+        self.attribute = attribute
+        self.memoize = memoize
     
     def children(self):
         nodelist = [
@@ -40,8 +49,72 @@ class FunctionDeclaration(CNode):
         return tuple(nodelist)
     attr_names = ('name', )
 
+    def signature(self):
+        return f"{self.ret_type.to_code()} {self.name}({self.params.to_code()})"
+
+    def prototype(self):
+        """
+        Declaration of the function with its attribute, which has to come
+        before the definition and any call for the C compiler to use it
+        """
+        attribute = f" __attribute__(({self.attribute}))" if self.attribute and not self.profile else ""
+        return f"{self.signature()}{attribute};\n"
+
+    def memoized(self):
+        # instrumented builds profile the calls of the original function
+        return self.memoize and not self.profile
+
+    def body_name(self):
+        return f"_pyrt_body_{self.name}" if self.profile or self.memoized() else self.name
+
+    def body_signature(self):
+        return f"{self.ret_type.to_code()} {self.body_name()}({self.params.to_code()})"
+
+    def profile_wrapper(self):
+        """
+        Code of the wrapper calling the body of an instrumented function
+        """
+        if not self.profile:
+            return ""
+        args = ", ".join(p.name for p in self.params.params or [])
+        call = f"{self.body_name()}({args})"
+        lines = [f"{self.signature()} {{",
+                 f"static struct pyrt_function_profile _pyrt_profile = {{\"{self.name}\", {self.lineno}}};",
+                 "struct pyrt_frame _pyrt_frame;",
+                 "pyrt_profile_enter(&_pyrt_profile, &_pyrt_frame);"]
+        if self.ret_type.name == "void":
+            lines += [f"{call};", "pyrt_profile_exit(&_pyrt_frame);"]
+        else:
+            lines += [f"{self.ret_type.to_code()} _pyrt_result = {call};",
+                      "pyrt_profile_exit(&_pyrt_frame);",
+                      "return _pyrt_result;"]
+        return "\n".join(lines) + "\n}\n"
+
+    def memo_wrapper(self):
+        """
+        Code of the wrapper looking up the arguments of a memoized function
+        in its cache before calling the body, recursive calls go through it
+        """
+        if not self.memoized():
+            return ""
+        params = self.params.params or []
+        args = ", ".join(p.name for p in params)
+        ret_type = self.ret_type.to_code()
+        lines = [f"{self.signature()} {{",
+                 f"static struct pyrt_memo _pyrt_memo = PYRT_MEMO_INIT({len(params)});",
+                 f"int _pyrt_args[{len(params)}] = {{{args}}};",
+                 "int _pyrt_result;",
+                 "if (pyrt_memo_lookup(&_pyrt_memo, _pyrt_args, &_pyrt_result)) {",
+                 f"return ({ret_type}) _pyrt_result;",
+                 "}",
+                 f"_pyrt_result = {self.body_name()}({args});",
+                 "pyrt_memo_store(&_pyrt_memo, _pyrt_args, _pyrt_result);",
+                 f"return ({ret_type}) _pyrt_result;"]
+        return "\n".join(lines) + "\n}\n"
+
     def to_code(self):
-        return f"{self.ret_type.to_code()} {self.name}({self.params.to_code()}) {{\n{self.body.to_code()}\n}}\n"
+        return (f"{self.body_signature()} {{\n{self.body.to_code()}\n}}\n"
+                f"{self.profile_wrapper()}{self.memo_wrapper()}")
 
 class FunctionCall(CNode):
     def __init__(self, name, params, lineno):
@@ -75,15 +148,18 @@ class ParameterList(CNode):
         return ""
 
 class Parameter(CNode):
-    def __init__(self, name, param_type, lineno):
+    def __init__(self, name, param_type, lineno, restrict=False):
         self.name = name
         self.param_type = param_type
         self.lineno = lineno
+        self.restrict = restrict
     
     def children(self):
         return (('type', self.param_type),)
     attr_names = ('name',)
     def to_code(self):
+        if self.restrict:
+            return f"{self.param_type.to_code()} restrict {self.name}"
         return f"{self.param_type.to_code()} {self.name}"
 
 class VariableDeclarations(CNode):
@@ -152,10 +228,15 @@ class ElseBlock(CNode):
         return f"else {{\n{self.body.to_code()}\n}}"
 
 class WhileStm(CNode):
-    def __init__(self, cond, body, lineno):
+    """
+    profile is the name of the enclosing source function when iterations
+    are counted, see --instrument
+    """
+    def __init__(self, cond, body, lineno, profile=None):
         self.cond = cond
         self.body = body
         self.lineno = lineno
+        self.profile = profile
 
     def children(self):
         nodelist = []
@@ -166,7 +247,89 @@ class WhileStm(CNode):
         return tuple(nodelist)
     attr_names = ()
     def to_code(self):
-        return f"while ({self.cond.to_code()}) {{\n{self.body.to_code()}\n}}"
+        counter = ""
+        if self.profile is not None:
+            counter = loop_counter(self.profile, self.lineno)
+        return f"while ({self.cond.to_code()}) {{\n{counter}{self.body.to_code()}\n}}"
+
+class ParallelFor(CNode):
+    """
+    Counted loop shared by a team of OpenMP threads, see genericParallel.
+    The counter starts from its value before the loop, reductions are
+    summed and counter and privates keep the values of the last iteration.
+    threads is the size of the team, 0 for the OpenMP default.
+    """
+    def __init__(self, counter, op, bound, step, body, reductions, privates, threads, lineno):
+        self.counter = counter
+        self.op = op
+        self.bound = bound
+        self.step = step
+        self.body = body
+        self.reductions = reductions
+        self.privates = privates
+        self.threads = threads
+        self.lineno = lineno
+
+    def children(self):
+        return (('bound', self.bound), ('body', self.body))
+    attr_names = ('counter', 'op', 'step', 'reductions', 'privates', 'threads')
+
+    def to_code(self):
+        clauses = f"reduction(+: {', '.join(self.reductions)}) lastprivate({', '.join([self.counter] + self.privates)})"
+        if self.threads:
+            clauses += f" num_threads({self.threads})"
+        step = f"+= {self.step}" if self.step > 0 else f"-= {-self.step}"
+        return (f"{{\nint _pyrt_start = {self.counter};\n#pragma omp parallel for {clauses}\n"
+                f"for ({self.counter} = _pyrt_start; {self.counter} {self.op} {self.bound.to_code()}; "
+                f"{self.counter} {step}) {{\n{self.body.to_code()}\n}}\n}}")
+
+def loop_counter(function, lineno):
+    """
+    Code counting the iterations of the loop at lineno of function, see --instrument
+    """
+    return (f"static struct pyrt_loop_profile _pyrt_loop = {{\"{function}\", {lineno}}};\n"
+            "PYRT_COUNT_LOOP(&_pyrt_loop);\n")
+
+class LoopCounter(CNode):
+    """
+    Iteration counter of a loop lowered to gotos, in a block of its own
+    so that the counters of several loops do not clash
+    """
+    def __init__(self, function, lineno):
+        self.function = function
+        self.lineno = lineno
+
+    def children(self):
+        return ()
+    attr_names = ('function', )
+
+    def to_code(self):
+        return f"{{\n{loop_counter(self.function, self.lineno)}}}"
+
+class Label(CNode):
+    def __init__(self, name, lineno):
+        self.name = name
+        self.lineno = lineno
+
+    def children(self):
+        return ()
+    attr_names = ('name', )
+
+    def to_code(self):
+        # StmList ends every statement with ;, which gives the label an empty statement
+        return f"{self.name}:"
+
+class Goto(CNode):
+    def __init__(self, label, lineno):
+        self.label = label
+        self.lineno = lineno
+
+    def children(self):
+        return ()
+    attr_names = ('label', )
+
+    def to_code(self):
+        return f"goto {self.label}"
 
 class RetStm(CNode):
     def __init__(self, expr, lineno):
@@ -247,10 +410,10 @@ class ExpressionList(CNode):
         return ""
 
 class List(CNode):
-    def __init__(self, expr_list, lineno):
+    def __init__(self, expr_list, identifier, lineno):
         self.expr_list = expr_list
         self.lineno = lineno
-        self.identifier = "list_def_"+secrets.token_hex(16)
+        self.identifier = identifier
         self.ref = Constant(Type("id", lineno=self.lineno), self.identifier, lineno=self.lineno)
     
     def children(self):
@@ -290,9 +453,30 @@ class Index(CNode):
         pass
 
 class Type(CNode): 
-    def __init__(self, name, lineno):
-        self.name = name
-        self.lineno = lineno
+    """
+    Types are hash-consed: Type(name) always returns the one shared, immutable
+    instance for that name, so two types are equal exactly when they are identical.
+    """
+    _interned = dict()
+
+    def __new__(cls, name, lineno=0):
+        t = cls._interned.get(name)
+        if t is None:
+            t = super().__new__(cls)
+            object.__setattr__(t, 'name', name)
+            object.__setattr__(t, 'lineno', 0)
+            # setdefault keeps a single instance if two threads race here
+            t = cls._interned.setdefault(name, t)
+        return t
+
+    def __init__(self, name, lineno=0):
+        pass
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("Type instances are shared and cannot be modified")
+
+    def __reduce__(self):
+        return (self.__class__, (self.name,))
     
     def children(self):
         nodelist = []
@@ -348,6 +532,26 @@ class Cast(CNode):
     def to_code(self):
         return f"({self.type.to_code()}) ({self.expr.to_code()})"
 
+class Emitted(CNode):
+    """
+    C code that was generated ahead of time, e.g. on another process. The
+    declaration of an emitted function goes with the other prototypes.
+    """
+    def __init__(self, code, lineno, declaration=""):
+        self.code = code
+        self.lineno = lineno
+        self.declaration = declaration
+
+    def children(self):
+        return ()
+    attr_names = ()
+
+    def prototype(self):
+        return self.declaration
+
+    def to_code(self):
+        return self.code
+
 class Reference(CNode):
     def __init__(self, expr, lineno):
         self.expr = expr
@@ -376,7 +580,7 @@ class Program(CNode):
     """
     Keeps track of C program components, such as global variable and function declarations
     """
-    def __init__(self, global_vars=None, functions=None, lineno=1, **kwargs):
+    def __init__(self, global_vars=None, functions=None, lineno=1, profile=False, memoize=False, unity=False, **kwargs):
         if global_vars is None:
             global_vars = VariableDeclarations([], lineno)
         if functions is None:
@@ -384,6 +588,9 @@ class Program(CNode):
         self.global_vars : VariableDeclarations = global_vars
         self.functions = functions
         self.lineno = lineno
+        self.profile = profile
+        self.memoize = memoize
+        self.unity = unity
     
     def add_variable(self, variable: "VariableDeclaration"):
         self.global_vars.variables.append(variable)
@@ -396,17 +603,42 @@ class Program(CNode):
                 ('functions', self.functions))
     attr_names = ()
 
+    def runtime_modules(self):
+        """
+        The runtime modules the program uses, each a header and a source file of c_libs
+        """
+        modules = ["python_print", "python_list", "python_string", "slicing", "python_builtins"]
+        if self.profile:
+            modules.append("python_profile")
+        if self.memoize:
+            modules.append("python_memo")
+        return modules
+
+    def includes(self):
+        """
+        The includes of the runtime headers. A unity program also includes
+        the sources of the runtime, which is then compiled into the same
+        translation unit and its accessors can be inlined into the program.
+        The program refers to the version stamp of the runtime, so that the
+        linker keeps it in the binary.
+        """
+        modules = self.runtime_modules()
+        includes = "".join(f"#include \"{module}.h\"\n" for module in modules)
+        if self.unity:
+            includes += "".join(f"#include \"{module}.c\"\n"
+                                for module in modules + ["python_errors", "python_stats", "pyrt_version"])
+        includes += ("extern const char _pyrt_version[];\n"
+                     "static const char *const _pyrt_program_version __attribute__((used)) = _pyrt_version;\n")
+        return includes
+
     def to_code(self):
-        ret = "#include \"python_print.h\"\n" + \
-              "#include \"python_list.h\"\n" + \
-              "#include \"python_string.h\"\n" + \
-              "#include \"slicing.h\"\n"
+        ret = [self.includes()]
         for variable in self.global_vars.variables:
-            ret += f"{variable.to_code()};\n"
-        
-        funcs = ""
+            ret.append(f"{variable.to_code()};\n")
         for function in self.functions.functions:
-            funcs += function.to_code()
-
-        return ret + funcs
+            if isinstance(function, Emitted) or (isinstance(function, FunctionDeclaration) and function.name != "main"):
+                ret.append(function.prototype())
+        for function in self.functions.functions:
+            ret.append(function.to_code())
+        return "".join(ret)
 
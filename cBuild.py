@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+import platform
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cRuntime import RUNTIME_DIR, runtime_sources
+
+class BuildOptions(object):
+    """
+    How the generated C is turned into native binaries
+    """
+
+    def __init__(self, cc="gcc", opt_level="2", native=False, lto=False, pgo=False,
+                 jobs=1, cache_dir=".objcache", stats=False, release=False, openmp=False, unity=False):
+        self.cc = cc
+        self.opt_level = opt_level
+        self.native = native
+        self.lto = lto
+        self.pgo = pgo
+        self.stats = stats
+        self.release = release
+        self.openmp = openmp
+        # programs include the runtime sources, see cAST.Program.includes
+        self.unity = unity
+        self.jobs = jobs
+        self.cache_dir = cache_dir
+
+    def cflags(self):
+        flags = [f"-O{self.opt_level}"]
+        if self.native:
+            flags.append("-march=native")
+        if self.lto:
+            flags.append("-flto")
+        if self.stats:
+            flags.append("-DPYRT_STATS")
+        if self.release:
+            flags.append("-DPYRT_RELEASE")
+        if self.openmp:
+            flags.append("-fopenmp")
+        return flags
+
+
+class BuildError(Exception): pass
+
+
+class Builder(object):
+    """
+    Compiles every translation unit in out_dir in parallel and links the
+    programs against the shared runtime objects.
+
+    Object files are cached in options.cache_dir under the hash of the
+    compiler, the flags and the contents of the source and runtime headers,
+    so unchanged translation units are never compiled twice. With
+    -march=native the hash also covers the target options the compiler
+    resolves it to, so a shared cache never serves objects built for
+    another CPU. Profile guided
+    builds bypass the cache, since their objects depend on the recorded profile.
+    Unity programs are linked on their own, and their hash also covers the
+    runtime sources they include.
+    """
+
+    def __init__(self, out_dir, options: BuildOptions):
+        self.out_dir = os.path.abspath(out_dir)
+        self.runtime_dir = os.path.join(self.out_dir, RUNTIME_DIR)
+        self.options = options
+        headers = b""
+        kinds = (".h", ".c") if options.unity else (".h",)
+        for name in sorted(f for f in os.listdir(self.runtime_dir) if f.endswith(kinds)):
+            with open(os.path.join(self.runtime_dir, name), 'rb') as f:
+                headers += name.encode() + f.read()
+        self.headers = headers
+        self.target = self.native_target() if options.native else b""
+
+    def native_target(self):
+        """
+        The target options -march=native stands for on this machine, as
+        listed by gcc, or the description of the machine if the compiler
+        cannot list them
+        """
+        try:
+            result = subprocess.run([self.options.cc, "-march=native", "-Q", "--help=target"], capture_output=True)
+            if result.returncode == 0:
+                return result.stdout
+        except OSError:
+            pass
+        return " ".join(platform.uname()).encode()
+
+    def run(self, command):
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+        except OSError as e:
+            raise BuildError(f"{' '.join(command)}\n{e}")
+        if result.returncode != 0:
+            raise BuildError(" ".join(command) + "\n" + result.stderr)
+
+    def compile_object(self, source, flags):
+        obj = os.path.splitext(source)[0] + ".o"
+        command = [self.options.cc] + flags + ["-I", self.runtime_dir, "-c", "-o", obj, source]
+        if self.options.pgo:
+            self.run(command)
+            return obj
+
+        digest = hashlib.sha256()
+        digest.update(" ".join([self.options.cc] + flags).encode())
+        digest.update(self.target)
+        digest.update(self.headers)
+        with open(source, 'rb') as f:
+            digest.update(f.read())
+        cached = os.path.join(self.options.cache_dir, digest.hexdigest() + ".o")
+        if not os.path.exists(cached):
+            self.run(command)
+            os.makedirs(self.options.cache_dir, exist_ok=True)
+            # copy under a temporary name first so concurrent builds never see a partial object
+            partial = f"{cached}.{os.getpid()}.{threading.get_ident()}"
+            shutil.copyfile(obj, partial)
+            os.replace(partial, cached)
+        else:
+            shutil.copyfile(cached, obj)
+        return obj
+
+    def link(self, program_obj, runtime_objs, flags):
+        binary = os.path.splitext(program_obj)[0]
+        self.run([self.options.cc] + flags + ["-o", binary, program_obj] + runtime_objs)
+        return binary
+
+    def build_all(self, programs, flags):
+        """
+        Compile the runtime and programs (C files relative to out_dir) with
+        flags and link them, returning the binaries that were built
+        """
+        runtime_paths = [] if self.options.unity else [os.path.join(self.runtime_dir, s) for s in runtime_sources()]
+        program_sources = [os.path.join(self.out_dir, p) for p in programs]
+        with ThreadPoolExecutor(max_workers=self.options.jobs) as pool:
+            try:
+                runtime_objs = list(pool.map(lambda s: self.compile_object(s, flags), runtime_paths))
+            except BuildError as e:
+                # no program can be linked without the runtime
+                print(f"Error building {e}")
+                return []
+            results = [pool.submit(lambda s: self.link(self.compile_object(s, flags), runtime_objs, flags), s)
+                       for s in program_sources]
+            binaries = []
+            for result in results:
+                try:
+                    binaries.append(result.result())
+                except BuildError as e:
+                    print(f"Error building {e}")
+        return binaries
+
+    def train_one(self, binary, timeout=60):
+        """
+        Run an instrumented binary once to record its profile. The exit
+        status is ignored, failing programs still produce useful profiles.
+        """
+        try:
+            subprocess.run([binary], cwd=os.path.dirname(binary), timeout=timeout,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except subprocess.TimeoutExpired:
+            print(f"Training run of {binary} timed out")
+
+    def train(self, binaries):
+        with ThreadPoolExecutor(max_workers=self.options.jobs) as pool:
+            list(pool.map(self.train_one, binaries))
+
+    def build(self, programs):
+        flags = self.options.cflags()
+        if self.options.pgo:
+            self.train(self.build_all(programs, flags + ["-fprofile-generate"]))
+            flags = flags + ["-fprofile-use", "-fprofile-correction", "-Wno-missing-profile"]
+        return self.build_all(programs, flags)
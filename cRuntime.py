@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+import shutil
+
+RUNTIME_SOURCE_DIR = "c_libs"
+RUNTIME_DIR = "runtime"
+RUNTIME_LIBRARY = "libpyrt.a"
+
+def runtime_files(kind):
+    """
+    Names of the runtime files of the given kind ('.c' or '.h'), in a stable order
+    """
+    return sorted(f for f in os.listdir(RUNTIME_SOURCE_DIR) if f.endswith(kind))
+
+def runtime_sources():
+    """
+    Names of the C files of the runtime written by write_runtime
+    """
+    return runtime_files(".c") + ["pyrt_version.c"]
+
+def runtime_version():
+    """
+    Version stamp of the runtime, derived from the contents of c_libs so that
+    it only changes when the runtime itself changes
+    """
+    digest = hashlib.sha256()
+    for name in runtime_files(".h") + runtime_files(".c"):
+        digest.update(name.encode())
+        with open(os.path.join(RUNTIME_SOURCE_DIR, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+def write_runtime(out_dir):
+    """
+    Copy the runtime sources once into out_dir/runtime, together with a
+    version stamp, which every program refers to (see cAST.Program.includes)
+    so that it is linked into the binary. The Makefile written by write_makefile builds them into
+    a single static library shared by every generated program.
+    """
+    runtime_dir = os.path.join(out_dir, RUNTIME_DIR)
+    shutil.copytree(RUNTIME_SOURCE_DIR, runtime_dir)
+    version = runtime_version()
+    with open(os.path.join(runtime_dir, "pyrt_version.h"), 'w') as f:
+        f.write("#ifndef PYRT_VERSION_H\n" +
+                "#define PYRT_VERSION_H\n" +
+                f"#define PYRT_VERSION \"{version}\"\n" +
+                "#endif\n")
+    with open(os.path.join(runtime_dir, "pyrt_version.c"), 'w') as f:
+        f.write("#include \"pyrt_version.h\"\n" +
+                "const char _pyrt_version[] = \"pyrt \" PYRT_VERSION;\n")
+    return version
+
+def write_makefile(out_dir, programs, cflags="-O2", unity=False):
+    """
+    Write out_dir/Makefile building the runtime library once and linking every
+    program against it. programs is a list of C files relative to out_dir,
+    each one is built into an executable of the same name without extension.
+    Every target lists its real dependencies, so make -j can build the runtime
+    objects and the programs in parallel. cflags is the default for CFLAGS.
+    Unity programs include the runtime sources themselves (see --unity) and
+    are compiled on their own instead.
+    """
+    sources = runtime_sources()
+    headers = runtime_files(".h") + ["pyrt_version.h"]
+    library = f"{RUNTIME_DIR}/{RUNTIME_LIBRARY}"
+    binaries = [os.path.splitext(p)[0] for p in programs]
+
+    lines = [
+        "# Generated by compiler.py, build with make -j",
+        f"CFLAGS ?= {cflags}",
+        "RUNTIME_HEADERS = " + " ".join(f"{RUNTIME_DIR}/{h}" for h in headers),
+        "RUNTIME_SOURCES = " + " ".join(f"{RUNTIME_DIR}/{s}" for s in sources),
+        "RUNTIME_OBJS = " + " ".join(f"{RUNTIME_DIR}/{os.path.splitext(s)[0]}.o" for s in sources),
+        "PROGRAMS = " + " ".join(binaries),
+        "",
+        "all: $(PROGRAMS)",
+        "",
+        f"{library}: $(RUNTIME_OBJS)",
+        "\t$(AR) rcs $@ $^",
+        "",
+        f"{RUNTIME_DIR}/%.o: {RUNTIME_DIR}/%.c $(RUNTIME_HEADERS)",
+        "\t$(CC) $(CFLAGS) -c -o $@ $<",
+        "",
+    ]
+    for program, binary in zip(programs, binaries):
+        if unity:
+            lines.append(f"{binary}: {program} $(RUNTIME_SOURCES) $(RUNTIME_HEADERS)")
+            lines.append(f"\t$(CC) $(CFLAGS) -I{RUNTIME_DIR} -o $@ $<")
+        else:
+            lines.append(f"{binary}: {program} {library} $(RUNTIME_HEADERS)")
+            lines.append(f"\t$(CC) $(CFLAGS) -I{RUNTIME_DIR} -o $@ $< {library}")
+        lines.append("")
+    lines += [
+        "clean:",
+        f"\trm -f $(PROGRAMS) $(RUNTIME_OBJS) {library}",
+        "",
+        ".PHONY: all clean",
+        "",
+    ]
+    with open(os.path.join(out_dir, "Makefile"), 'w') as f:
+        f.write("\n".join(lines))
@@ -0,0 +1,93 @@
+#include <stdio.h>
+#include "python_builtins.h"
+#include "python_errors.h"
+
+int list_length(struct List* l){
+    return l->length;
+}
+
+int string_length(String* s){
+    return s->length;
+}
+
+struct List* list_range(int start, int stop, int step){
+    if (PYRT_UNLIKELY(step == 0)){
+        pyrt_value_error("range() arg 3 must not be zero");
+    }
+    struct List* l = new_list();
+    if (step > 0){
+        for (int i = start; i < stop; i += step){
+            pushInt(l, i);
+        }
+    } else {
+        for (int i = start; i > stop; i += step){
+            pushInt(l, i);
+        }
+    }
+    return l;
+}
+
+static int number_value(struct Node* node, int pos){
+    if (node->node_type == p_bool){
+        return node->value.bool_value;
+    }
+    PYRT_CHECK_TAG(node, p_int, pos, "int");
+    return node->value.int_value;
+}
+
+int list_sum(struct List* l){
+    int sum = 0;
+    struct Node* node = l->head;
+    for (int i = 0; i < l->length; i++){
+        sum += number_value(node, i);
+        node = node->next;
+    }
+    return sum;
+}
+
+int list_min(struct List* l){
+    if (PYRT_UNLIKELY(l->length == 0)){
+        pyrt_value_error("min() arg is an empty sequence");
+    }
+    struct Node* node = l->head;
+    int min = number_value(node, 0);
+    for (int i = 1; i < l->length; i++){
+        node = node->next;
+        int value = number_value(node, i);
+        if (value < min){
+            min = value;
+        }
+    }
+    return min;
+}
+
+int list_max(struct List* l){
+    if (PYRT_UNLIKELY(l->length == 0)){
+        pyrt_value_error("max() arg is an empty sequence");
+    }
+    struct Node* node = l->head;
+    int max = number_value(node, 0);
+    for (int i = 1; i < l->length; i++){
+        node = node->next;
+        int value = number_value(node, i);
+        if (value > max){
+            max = value;
+        }
+    }
+    return max;
+}
+
+int int_min(int a, int b){
+    return a < b ? a : b;
+}
+
+int int_max(int a, int b){
+    return a > b ? a : b;
+}
+
+String* int_to_string(int x){
+    String* s = new_string();
+    // the longest int, -2147483648, fits the inline buffer
+    s->length = snprintf(s->data, STRING_INLINE_CAPACITY, "%d", x);
+    return s;
+}
@@ -0,0 +1,22 @@
+#ifndef PYTHON_BUILTINS
+#define PYTHON_BUILTINS
+#include "python_list.h"
+#include "python_string.h"
+
+// Builtin functions of the source language, see pythonSymbolTable.BUILTINS.
+// Lengths are read from the length fields, the others walk the nodes of
+// their list once.
+
+int list_length(struct List* l);
+int string_length(String* s);
+// the list [start, start + step, ...] of the ints before stop
+struct List* list_range(int start, int stop, int step);
+// sum, min and max read bool elements as 0 and 1, like Python
+int list_sum(struct List* l);
+int list_min(struct List* l);
+int list_max(struct List* l);
+int int_min(int a, int b);
+int int_max(int a, int b);
+String* int_to_string(int x);
+
+#endif
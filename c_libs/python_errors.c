@@ -0,0 +1,23 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include "python_errors.h"
+
+void pyrt_index_error(const char* container, int pos){
+    // in a parallel loop, the first thread to fail reports and exits
+#ifdef _OPENMP
+    #pragma omp critical(pyrt_error)
+#endif
+    {
+        printf("Index %d is out of bounds for %s\n", pos, container);
+        exit(1);
+    }
+}
+
+void pyrt_value_error(const char* message){
+    printf("%s\n", message);
+    exit(1);
+}
+
+void pyrt_type_error(int pos, const char* type){
+    fprintf(stderr, "List element %d is not of type %s", pos, type);
+}
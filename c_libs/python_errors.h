@@ -0,0 +1,35 @@
+#ifndef PYTHON_ERRORS
+#define PYTHON_ERRORS
+
+// Error paths of the runtime, kept out of line and marked cold so that the
+// checks guarding them stay small in the hot accessors.
+
+#if defined(__GNUC__)
+#define PYRT_LIKELY(x) __builtin_expect(!!(x), 1)
+#define PYRT_UNLIKELY(x) __builtin_expect(!!(x), 0)
+#define PYRT_COLD __attribute__((cold, noinline))
+#define PYRT_NORETURN __attribute__((noreturn))
+#else
+#define PYRT_LIKELY(x) (x)
+#define PYRT_UNLIKELY(x) (x)
+#define PYRT_COLD
+#define PYRT_NORETURN
+#endif
+
+// print the out of bounds message for a list or string and exit
+PYRT_COLD PYRT_NORETURN void pyrt_index_error(const char* container, int pos);
+// print the message of a failed builtin, e.g. min of an empty list, and exit
+PYRT_COLD PYRT_NORETURN void pyrt_value_error(const char* message);
+// warn that a list element does not have the type it is read as
+PYRT_COLD void pyrt_type_error(int pos, const char* type);
+
+// Release builds (-DPYRT_RELEASE) trust the element type given by the cast
+// in the source program and skip the type tag check of list accessors.
+#ifdef PYRT_RELEASE
+#define PYRT_CHECK_TAG(node, tag, pos, type) ((void)0)
+#else
+#define PYRT_CHECK_TAG(node, tag, pos, type) \
+    do { if (PYRT_UNLIKELY((node)->node_type != (tag))) pyrt_type_error(pos, type); } while (0)
+#endif
+
+#endif
@@ -1,8 +1,14 @@
 #include <stdlib.h>
 #include "python_list.h"
+#include "python_stats.h"
+#include "python_errors.h"
 
 struct List * new_list(){
     struct List * nl = (struct List *) malloc(sizeof(struct List));
+    PYRT_STAT_ALLOC(PYRT_STAT_LIST, sizeof(struct List));
+    nl->length = 0;
+    nl->head = NULL;
+    nl->tail = NULL;
     return nl;
 }
 
@@ -10,40 +16,36 @@ void insert(struct List * head, struct Node * node){
     if (head->length == 0){
         head->head = node;
     } else {
-        struct Node * slot = head->head;
-        for (int i = 0; i<head->length-1; i++){
-            slot = slot->next;
-        }
-        slot->next = node;
+        head->tail->next = node;
     }
+    head->tail = node;
     head->length++;
 }
 
 void pushInt(struct List* head, int val) {
     struct Node* new_node = (struct Node*)malloc(sizeof(struct Node));
-    void* data = malloc(sizeof(int));
-    new_node->data = data;
+    PYRT_STAT_ALLOC(PYRT_STAT_NODE, sizeof(struct Node));
+    new_node->value.int_value = val;
     new_node->next = NULL;
     new_node->node_type = p_int;
-    *((int *) data) = val;
 
     insert(head, new_node);
 }
 
 void pushShort(struct List* head, short val) {
     struct Node* new_node = (struct Node*)malloc(sizeof(struct Node));
-    void* data = malloc(sizeof(short));
-    new_node->data = data;
+    PYRT_STAT_ALLOC(PYRT_STAT_NODE, sizeof(struct Node));
+    new_node->value.bool_value = val;
     new_node->next = NULL;
     new_node->node_type = p_bool;
-    *((short*)data) = val;
 
     insert(head, new_node);
 }
 
 void pushList(struct List* head, struct List * val) {
     struct Node* new_node = (struct Node*)malloc(sizeof(struct Node));
-    new_node->data = val;
+    PYRT_STAT_ALLOC(PYRT_STAT_NODE, sizeof(struct Node));
+    new_node->value.data = val;
     new_node->next = NULL;
     new_node->node_type = p_list;
     
@@ -53,29 +55,29 @@ void pushList(struct List* head, struct List * val) {
 
 void pushString(struct List* head, String * val) {
     struct Node* new_node = (struct Node*)malloc(sizeof(struct Node));
-    new_node->data = val;
+    PYRT_STAT_ALLOC(PYRT_STAT_NODE, sizeof(struct Node));
+    new_node->value.data = val;
     new_node->next = NULL;
     new_node->node_type = p_string;
     insert(head, new_node);
 }
 
-void extend_list(struct List* to, struct List* from){
+static void append_elements(struct List* to, struct List* from){
     struct Node * head = from->head;
     for (int i = 0; i<from->length; i++){
         switch (head->node_type)
         {
         case p_int:
-            pushInt(to, *((int *)head->data));
+            pushInt(to, head->value.int_value);
             break;
-        case p_bool:;
-            short val = *((short *) head->data);
-            pushShort(to, val);
+        case p_bool:
+            pushShort(to, head->value.bool_value);
             break;
         case p_list:
-            pushList(to, head->data);
+            pushList(to, head->value.data);
             break;
         case p_string:
-            pushString(to, head->data);
+            pushString(to, head->value.data);
             break;
         default:
             break;
@@ -84,61 +86,96 @@ void extend_list(struct List* to, struct List* from){
     }
 }
 
+void extend_list(struct List* to, struct List* from){
+    PYRT_STAT(extend_lists, 1);
+    PYRT_STAT(extend_list_elements, from->length);
+    append_elements(to, from);
+}
+
 struct Node* getNode(struct List* from, int pos){
     if (pos < 0){
         pos = from->length+pos;
     }
-    if (pos+1 > from->length){
-        printf("Index %d is out of bounds for list\n", pos);
-        exit(1);
+    if (PYRT_UNLIKELY(pos+1 > from->length)){
+        pyrt_index_error("list", pos);
     }
+    return getNodeUnchecked(from, pos);
+}
+
+struct Node* getNodeUnchecked(struct List* from, int pos){
     struct Node * head = from->head;
     for (int i=0; i<pos; i++){
         head = head->next;
     }
+    PYRT_STAT(get_node_calls, 1);
+    PYRT_STAT(get_node_hops, pos);
     return head;
 }
 
+static int intValue(struct Node* node, int pos){
+    PYRT_CHECK_TAG(node, p_int, pos, "int");
+    return node->value.int_value;
+}
+
+static short shortValue(struct Node* node, int pos){
+    PYRT_CHECK_TAG(node, p_bool, pos, "short");
+    return node->value.bool_value;
+}
+
+static struct List* listValue(struct Node* node, int pos){
+    PYRT_CHECK_TAG(node, p_list, pos, "list");
+    return (struct List *)node->value.data;
+}
+
+static String* stringValue(struct Node* node, int pos){
+    PYRT_CHECK_TAG(node, p_string, pos, "string");
+    return (String *)node->value.data;
+}
+
 int getInt(struct List* from, int pos){
-    struct Node * node = getNode(from, pos);
-    if (node->node_type != p_int){
-        fprintf(stderr, "List element %d is not of type int", pos);
-    }
-    return *((int *)node->data);
+    return intValue(getNode(from, pos), pos);
 }
 
 short getShort(struct List* from, int pos){
-    struct Node * node = getNode(from, pos);
-    if (node->node_type != p_bool){
-        fprintf(stderr, "List element %d is not of type short", pos);
-    }
-    return *((short *)node->data);
+    return shortValue(getNode(from, pos), pos);
 }
 
 struct List * getList(struct List* from, int pos){
-    struct Node * node = getNode(from, pos);
-    if (node->node_type != p_list){
-        fprintf(stderr, "List element %d is not of type list", pos);
-    }
-    return (struct List *)node->data;
+    return listValue(getNode(from, pos), pos);
 }
 
 String * getStringFromList(struct List* from, int pos){
-    struct Node * node = getNode(from, pos);
-    if (node->node_type != p_string){
-        fprintf(stderr, "List element %d is not of type string", pos);
-    }
-    return (String *)node->data;
+    return stringValue(getNode(from, pos), pos);
 }
 
 String * getStringFromString(String* from, int pos){
     if (pos < 0){
         pos = from->length+pos;
     }
-    if (pos+1 > from->length){
-        printf("Index %d is out of bounds for string\n", pos);
-        exit(1);
+    if (PYRT_UNLIKELY(pos+1 > from->length)){
+        pyrt_index_error("string", pos);
     }
+    return getStringFromStringUnchecked(from, pos);
+}
+
+int getIntUnchecked(struct List* from, int pos){
+    return intValue(getNodeUnchecked(from, pos), pos);
+}
+
+short getShortUnchecked(struct List* from, int pos){
+    return shortValue(getNodeUnchecked(from, pos), pos);
+}
+
+struct List * getListUnchecked(struct List* from, int pos){
+    return listValue(getNodeUnchecked(from, pos), pos);
+}
+
+String * getStringFromListUnchecked(struct List* from, int pos){
+    return stringValue(getNodeUnchecked(from, pos), pos);
+}
+
+String * getStringFromStringUnchecked(String* from, int pos){
+    string_flatten(from);
     String* s = new_string();
     stringInsert(s, from->data[pos]);
     return s;
@@ -146,7 +183,9 @@ String * getStringFromString(String* from, int pos){
 
 struct List* concat_lists(struct List* list1, struct List* list2) {
     struct List* nl = new_list();
-    extend_list(nl, list1);
-    extend_list(nl, list2);
+    PYRT_STAT(concat_lists, 1);
+    PYRT_STAT(concat_lists_elements, list1->length+list2->length);
+    append_elements(nl, list1);
+    append_elements(nl, list2);
     return nl;
 }
\ No newline at end of file
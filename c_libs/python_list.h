@@ -9,8 +9,16 @@ enum python_type {
     p_string
 };
 
-struct Node {
+// int and bool elements are stored in the node itself, lists and strings
+// are pointed to
+union python_value {
+    int int_value;
+    short bool_value;
     void* data;
+};
+
+struct Node {
+    union python_value value;
     struct Node *next;
     enum python_type node_type;
 };
@@ -18,6 +26,7 @@ struct Node {
 struct List {
     int length;
     struct Node *head;
+    struct Node *tail;
 };
 
 struct List * new_list();
@@ -26,6 +35,7 @@ void pushInt(struct List* head, int val);
 void pushShort(struct List* head, short val);
 void pushList(struct List* head, struct List * val);
 void pushString(struct List* head, String * val);
+void extend_list(struct List* to, struct List* from);
 
 String * getStringFromList(struct List* from, int pos);
 String * getStringFromString(String* from, int pos);
@@ -34,7 +44,17 @@ int getInt(struct List* from, int pos);
 short getShort(struct List* from, int pos);
 struct List* getList(struct List* from, int pos);
 
+// variants without the bounds check, for indices the compiler proved to be
+// in 0 <= pos < length
+struct Node* getNodeUnchecked(struct List* from, int pos);
+int getIntUnchecked(struct List* from, int pos);
+short getShortUnchecked(struct List* from, int pos);
+struct List* getListUnchecked(struct List* from, int pos);
+String * getStringFromListUnchecked(struct List* from, int pos);
+String * getStringFromStringUnchecked(String* from, int pos);
+
 struct List* concat_lists(struct List* list1, struct List* list2);
 #define push(a, b) _Generic(b, int: pushInt, short: pushShort, struct List *: pushList, String*: pushString)(a, b)
 #define getString(a, b) _Generic(a, struct List *: getStringFromList, String* : getStringFromString)(a, b)
+#define getStringUnchecked(a, b) _Generic(a, struct List *: getStringFromListUnchecked, String* : getStringFromStringUnchecked)(a, b)
 #endif
\ No newline at end of file
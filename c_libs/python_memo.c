@@ -0,0 +1,58 @@
+#include <stdlib.h>
+#include <string.h>
+#include "python_memo.h"
+#include "python_stats.h"
+
+static unsigned memo_slot(const struct pyrt_memo* memo, const int* args){
+    // mix after every argument, so that e.g. (1, n) and (0, n+31) do not collide,
+    // and finish with the murmur3 finalizer to spread close arguments over the table
+    unsigned hash = 0;
+    for (int i = 0; i < memo->arity; i++){
+        hash = (hash ^ (unsigned)args[i]) * 0x9e3779b1u;
+        hash ^= hash >> 15;
+    }
+    hash ^= hash >> 16;
+    hash *= 0x85ebca6bu;
+    hash ^= hash >> 13;
+    hash *= 0xc2b2ae35u;
+    hash ^= hash >> 16;
+    return hash & (PYRT_MEMO_ENTRIES - 1);
+}
+
+int pyrt_memo_lookup(struct pyrt_memo* memo, const int* args, int* result){
+    if (memo->slots != NULL){
+        unsigned slot = memo_slot(memo, args);
+        int* entry = memo->slots + (size_t)slot * (memo->arity + 1);
+        if (memo->used[slot] && memcmp(entry, args, sizeof(int) * memo->arity) == 0){
+            PYRT_STAT(memo_hits, 1);
+            *result = entry[memo->arity];
+            return 1;
+        }
+    }
+    PYRT_STAT(memo_misses, 1);
+    return 0;
+}
+
+void pyrt_memo_store(struct pyrt_memo* memo, const int* args, int result){
+    if (memo->slots == NULL){
+        memo->slots = (int*)malloc(sizeof(int) * (memo->arity + 1) * PYRT_MEMO_ENTRIES);
+        memo->used = (unsigned char*)calloc(PYRT_MEMO_ENTRIES, 1);
+        if (memo->slots == NULL || memo->used == NULL){
+            // run without a cache
+            free(memo->slots);
+            free(memo->used);
+            memo->slots = NULL;
+            memo->used = NULL;
+            return;
+        }
+    }
+    unsigned slot = memo_slot(memo, args);
+    int* entry = memo->slots + (size_t)slot * (memo->arity + 1);
+    // a call can be computed twice while an outer call with the same arguments runs
+    if (memo->used[slot] && memcmp(entry, args, sizeof(int) * memo->arity) != 0){
+        PYRT_STAT(memo_evictions, 1);
+    }
+    memcpy(entry, args, sizeof(int) * memo->arity);
+    entry[memo->arity] = result;
+    memo->used[slot] = 1;
+}
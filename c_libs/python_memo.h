@@ -0,0 +1,31 @@
+#ifndef PYTHON_MEMO
+#define PYTHON_MEMO
+
+// Result caches of the functions memoized with --memoize. Every memoized
+// function has a static struct pyrt_memo, a hash table from its arguments
+// (ints, bools widened to int) to its result. The table is allocated on
+// first use with PYRT_MEMO_ENTRIES slots and a new result evicts the one
+// in its slot, so the cache never grows beyond that.
+
+#ifndef PYRT_MEMO_ENTRIES
+#define PYRT_MEMO_ENTRIES 65536
+#endif
+
+#if (PYRT_MEMO_ENTRIES & (PYRT_MEMO_ENTRIES - 1)) != 0
+#error "PYRT_MEMO_ENTRIES must be a power of two"
+#endif
+
+struct pyrt_memo {
+    int arity;
+    // PYRT_MEMO_ENTRIES slots of arity arguments followed by the result
+    int* slots;
+    unsigned char* used;
+};
+
+#define PYRT_MEMO_INIT(arity) {(arity), NULL, NULL}
+
+// set *result and return 1 if the result for args is cached, return 0 otherwise
+int pyrt_memo_lookup(struct pyrt_memo* memo, const int* args, int* result);
+void pyrt_memo_store(struct pyrt_memo* memo, const int* args, int result);
+
+#endif
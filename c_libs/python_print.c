@@ -22,21 +22,20 @@ void printList(struct List * l){
         switch (head->node_type)
         {
         case p_int:
-            printf("%d", *((int *)head->data));
+            printf("%d", head->value.int_value);
             break;
-        case p_bool:;
-            short val = *((short *) head->data);
-            if (val == 0){
+        case p_bool:
+            if (head->value.bool_value == 0){
                 printf("False");
             } else {
                 printf("True");
             }
             break;
         case p_list:
-            printList(head->data);
+            printList(head->value.data);
             break;
         case p_string:
-            printString(head->data);
+            printString(head->value.data);
         default:
             break;
         }
@@ -46,7 +45,6 @@ void printList(struct List * l){
 }
 
 void printString(String* s){
-    for (int i=0; i<s->length; i++){
-        printf("%c", s->data[i]);
-    }
+    string_flatten(s);
+    fwrite(s->data, sizeof(char), s->length, stdout);
 }
\ No newline at end of file
@@ -0,0 +1,83 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+#include "python_profile.h"
+
+static struct pyrt_function_profile* functions = NULL;
+static struct pyrt_loop_profile* loops = NULL;
+static struct pyrt_frame* current = NULL;
+static int dump_registered = 0;
+
+static long long now_ns(){
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (long long)ts.tv_sec*1000000000LL+ts.tv_nsec;
+}
+
+static void dump_profile(){
+    // frames still open when exit is called, e.g. after an index error
+    while (current != NULL){
+        pyrt_profile_exit(current);
+    }
+    const char* path = getenv("PYRT_PROFILE");
+    FILE* f = fopen(path != NULL ? path : "pyrt_profile.json", "w");
+    if (f == NULL){
+        return;
+    }
+    fprintf(f, "{\n\"functions\": [");
+    for (struct pyrt_function_profile* p = functions; p != NULL; p = p->next){
+        fprintf(f, "%s\n  {\"name\": \"%s\", \"line\": %d, \"calls\": %ld, \"total_ns\": %lld, \"self_ns\": %lld}",
+                p == functions ? "" : ",", p->name, p->line, p->calls, p->total_ns, p->self_ns);
+    }
+    fprintf(f, "\n],\n\"loops\": [");
+    for (struct pyrt_loop_profile* l = loops; l != NULL; l = l->next){
+        fprintf(f, "%s\n  {\"function\": \"%s\", \"line\": %d, \"iterations\": %ld}",
+                l == loops ? "" : ",", l->function, l->line, l->iterations);
+    }
+    fprintf(f, "\n]\n}\n");
+    fclose(f);
+}
+
+static void register_dump(){
+    if (!dump_registered){
+        dump_registered = 1;
+        atexit(dump_profile);
+    }
+}
+
+void pyrt_profile_enter(struct pyrt_function_profile* profile, struct pyrt_frame* frame){
+    if (!profile->registered){
+        profile->registered = 1;
+        profile->next = functions;
+        functions = profile;
+        register_dump();
+    }
+    profile->calls++;
+    profile->active++;
+    frame->profile = profile;
+    frame->child_ns = 0;
+    frame->parent = current;
+    current = frame;
+    frame->start_ns = now_ns();
+}
+
+void pyrt_profile_exit(struct pyrt_frame* frame){
+    long long elapsed = now_ns()-frame->start_ns;
+    struct pyrt_function_profile* profile = frame->profile;
+    profile->self_ns += elapsed-frame->child_ns;
+    profile->active--;
+    if (profile->active == 0){
+        profile->total_ns += elapsed;
+    }
+    if (frame->parent != NULL){
+        frame->parent->child_ns += elapsed;
+    }
+    current = frame->parent;
+}
+
+void pyrt_register_loop(struct pyrt_loop_profile* loop){
+    loop->registered = 1;
+    loop->next = loops;
+    loops = loop;
+    register_dump();
+}
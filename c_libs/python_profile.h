@@ -0,0 +1,42 @@
+#ifndef PYTHON_PROFILE
+#define PYTHON_PROFILE
+
+// Profiling support for programs compiled with --instrument. Every function
+// and while loop gets a static profile record that registers itself on first
+// use, the profile is written as JSON when the program exits, to the file
+// named by PYRT_PROFILE or pyrt_profile.json.
+
+struct pyrt_function_profile {
+    const char* name;
+    int line;
+    long calls;
+    // activations currently on the stack, so recursion is timed once
+    int active;
+    long long total_ns;
+    long long self_ns;
+    int registered;
+    struct pyrt_function_profile* next;
+};
+
+struct pyrt_loop_profile {
+    const char* function;
+    int line;
+    long iterations;
+    int registered;
+    struct pyrt_loop_profile* next;
+};
+
+struct pyrt_frame {
+    struct pyrt_function_profile* profile;
+    long long start_ns;
+    long long child_ns;
+    struct pyrt_frame* parent;
+};
+
+void pyrt_profile_enter(struct pyrt_function_profile* profile, struct pyrt_frame* frame);
+void pyrt_profile_exit(struct pyrt_frame* frame);
+void pyrt_register_loop(struct pyrt_loop_profile* loop);
+
+#define PYRT_COUNT_LOOP(loop) do { if (!(loop)->registered) pyrt_register_loop(loop); (loop)->iterations++; } while (0)
+
+#endif
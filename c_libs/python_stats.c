@@ -0,0 +1,37 @@
+#include "python_stats.h"
+
+#ifdef PYRT_STATS
+#include <stdio.h>
+#include <stdlib.h>
+
+struct pyrt_stats pyrt_stats;
+
+static const char* kind_names[PYRT_STAT_KINDS] = {"List", "Node", "String", "String buffer"};
+
+static void print_stats(){
+    fprintf(stderr, "pyrt runtime statistics\n");
+    fprintf(stderr, "  %-14s %12s %14s\n", "type", "allocations", "bytes");
+    for (int kind = 0; kind < PYRT_STAT_KINDS; kind++){
+        fprintf(stderr, "  %-14s %12ld %14lld\n", kind_names[kind], pyrt_stats.allocations[kind], pyrt_stats.bytes[kind]);
+    }
+    fprintf(stderr, "  getNode          %ld calls, %lld hops\n", pyrt_stats.get_node_calls, pyrt_stats.get_node_hops);
+    fprintf(stderr, "  stringInsert     %ld calls, %lld bytes copied growing buffers\n",
+            pyrt_stats.string_inserts, pyrt_stats.string_growth_bytes);
+    fprintf(stderr, "  concat_lists     %ld calls, %lld elements copied\n",
+            pyrt_stats.concat_lists, pyrt_stats.concat_lists_elements);
+    fprintf(stderr, "  concat_strings   %ld calls, %lld bytes copied, %ld rope nodes, %lld bytes flattened\n",
+            pyrt_stats.concat_strings, pyrt_stats.concat_strings_bytes, pyrt_stats.rope_nodes, pyrt_stats.flatten_bytes);
+    fprintf(stderr, "  extend_list      %ld calls, %lld elements appended\n",
+            pyrt_stats.extend_lists, pyrt_stats.extend_list_elements);
+    fprintf(stderr, "  string_append    %ld calls, %lld bytes appended\n",
+            pyrt_stats.string_appends, pyrt_stats.string_append_bytes);
+    fprintf(stderr, "  sliceList        %ld calls, %lld elements\n", pyrt_stats.list_slices, pyrt_stats.list_slice_elements);
+    fprintf(stderr, "  sliceString      %ld calls, %lld characters\n", pyrt_stats.string_slices, pyrt_stats.string_slice_chars);
+    fprintf(stderr, "  memo             %ld hits, %ld misses, %ld evictions\n",
+            pyrt_stats.memo_hits, pyrt_stats.memo_misses, pyrt_stats.memo_evictions);
+}
+
+__attribute__((constructor)) static void register_stats(){
+    atexit(print_stats);
+}
+#endif
@@ -0,0 +1,65 @@
+#ifndef PYTHON_STATS
+#define PYTHON_STATS
+
+// Runtime statistics, compiled in with -DPYRT_STATS. The runtime counts
+// allocations per type and the work done by its operations through the
+// PYRT_STAT macros, which expand to nothing otherwise. A summary is printed
+// to stderr when the program exits.
+
+#ifdef PYRT_STATS
+
+enum pyrt_stat_kind {
+    PYRT_STAT_LIST,
+    PYRT_STAT_NODE,
+    PYRT_STAT_STRING,
+    PYRT_STAT_STRING_DATA,
+    PYRT_STAT_KINDS
+};
+
+struct pyrt_stats {
+    long allocations[PYRT_STAT_KINDS];
+    long long bytes[PYRT_STAT_KINDS];
+    long get_node_calls;
+    long long get_node_hops;
+    long string_inserts;
+    // characters moved when a string buffer outgrows its capacity
+    long long string_growth_bytes;
+    long concat_lists;
+    long long concat_lists_elements;
+    long concat_strings;
+    long long concat_strings_bytes;
+    long rope_nodes;
+    long long flatten_bytes;
+    long extend_lists;
+    long long extend_list_elements;
+    long string_appends;
+    long long string_append_bytes;
+    long list_slices;
+    long long list_slice_elements;
+    long string_slices;
+    long long string_slice_chars;
+    long memo_hits;
+    long memo_misses;
+    long memo_evictions;
+};
+
+extern struct pyrt_stats pyrt_stats;
+
+#ifdef _OPENMP
+// parallel loops read lists from several threads
+#define PYRT_STAT_ADD(field, n) __atomic_fetch_add(&pyrt_stats.field, (n), __ATOMIC_RELAXED)
+#else
+#define PYRT_STAT_ADD(field, n) (pyrt_stats.field += (n))
+#endif
+
+#define PYRT_STAT_ALLOC(kind, size) (PYRT_STAT_ADD(allocations[kind], 1), PYRT_STAT_ADD(bytes[kind], (size)))
+#define PYRT_STAT(counter, n) PYRT_STAT_ADD(counter, (n))
+
+#else
+
+#define PYRT_STAT_ALLOC(kind, size) ((void)0)
+#define PYRT_STAT(counter, n) ((void)0)
+
+#endif
+
+#endif
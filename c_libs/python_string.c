@@ -1,30 +1,195 @@
+#include <string.h>
 #include "python_string.h"
+#include "python_stats.h"
 String* new_string(){
     String* s = (String*)malloc(sizeof(String));
+    PYRT_STAT_ALLOC(PYRT_STAT_STRING, sizeof(String));
     s->length = 0;
-    s->data = NULL;
+    s->capacity = STRING_INLINE_CAPACITY;
+    s->data = s->inline_data;
+    s->left = NULL;
+    s->right = NULL;
+    s->depth = 0;
     return s;
 }
 
-void stringInsert(String* s, char c){
-    char* n = (char*)malloc(sizeof(char)*(s->length+1));
+void string_reserve(String* s, int capacity){
+    if (capacity <= s->capacity){
+        return;
+    }
+    if (capacity < 2*s->capacity){
+        capacity = 2*s->capacity;
+    }
+    PYRT_STAT(string_growth_bytes, s->length);
+    if (s->data == s->inline_data){
+        char* n = (char*)malloc(sizeof(char)*capacity);
+        PYRT_STAT_ALLOC(PYRT_STAT_STRING_DATA, capacity);
+        memcpy(n, s->data, s->length);
+        s->data = n;
+    } else {
+        s->data = (char*)realloc(s->data, sizeof(char)*capacity);
+        PYRT_STAT_ALLOC(PYRT_STAT_STRING_DATA, capacity);
+    }
+    s->capacity = capacity;
+}
+
+String* string_flatten(String* s){
+    if (s->left == NULL){
+        return s;
+    }
+    char* buffer = s->inline_data;
+    if (s->length > STRING_INLINE_CAPACITY){
+        buffer = (char*)malloc(sizeof(char)*s->length);
+        PYRT_STAT_ALLOC(PYRT_STAT_STRING_DATA, s->length);
+    }
+    PYRT_STAT(flatten_bytes, s->length);
+    // walk the leaves left to right, the stack never holds more than depth+1 nodes
+    String** stack = (String**)malloc(sizeof(String*)*(s->depth+1));
+    int top = 0;
+    int pos = 0;
+    stack[top++] = s;
+    while (top > 0){
+        String* node = stack[--top];
+        if (node->left != NULL){
+            stack[top++] = node->right;
+            stack[top++] = node->left;
+        } else {
+            memcpy(buffer+pos, node->data, node->length);
+            pos += node->length;
+        }
+    }
+    free(stack);
+    s->data = buffer;
+    s->capacity = s->length > STRING_INLINE_CAPACITY ? s->length : STRING_INLINE_CAPACITY;
+    s->left = NULL;
+    s->right = NULL;
+    s->depth = 0;
+    return s;
+}
+
+// rope_min_length[d] is the smallest length of a balanced rope of depth d,
+// the Fibonacci numbers from 1 and 2, see string_rebalance
+static long long rope_min_length[ROPE_MAX_DEPTH+2];
+
+static String* rope_node(String* left, String* right){
+    PYRT_STAT(rope_nodes, 1);
+    String* s = new_string();
+    s->left = left;
+    s->right = right;
+    s->length = left->length+right->length;
+    s->depth = 1+(left->depth > right->depth ? left->depth : right->depth);
+    return s;
+}
+
+// add the balanced rope or leaf r to the right of forest, whose slot i holds
+// nothing or a rope of rope_min_length[i] to rope_min_length[i+1] characters,
+// longer ones to the left
+static void rope_add_unit(String** forest, String* r){
+    String* shorter = NULL;
     int i = 0;
-    for (; i<s->length; i++){
-        n[i] = s->data[i];
+    for (; i < ROPE_MAX_DEPTH && r->length >= rope_min_length[i+1]; i++){
+        if (forest[i] != NULL){
+            shorter = shorter == NULL ? forest[i] : rope_node(forest[i], shorter);
+            forest[i] = NULL;
+        }
+    }
+    if (shorter != NULL){
+        r = rope_node(shorter, r);
     }
-    n[i] = c;
-    free(s->data);
-    s->data = n;
+    for (;; i++){
+        if (forest[i] != NULL){
+            r = rope_node(forest[i], r);
+            forest[i] = NULL;
+        }
+        if (i == ROPE_MAX_DEPTH || r->length < rope_min_length[i+1]){
+            forest[i] = r;
+            return;
+        }
+    }
+}
+
+static void rope_add_to_forest(String** forest, String* r){
+    if (r->length == 0){
+        return;
+    }
+    if (r->left == NULL || r->length >= rope_min_length[r->depth]){
+        rope_add_unit(forest, r);
+        return;
+    }
+    rope_add_to_forest(forest, r->left);
+    rope_add_to_forest(forest, r->right);
+}
+
+void string_rebalance(String* s){
+    if (s->left == NULL){
+        return;
+    }
+    if (rope_min_length[0] == 0){
+        rope_min_length[0] = 1;
+        rope_min_length[1] = 2;
+        for (int i = 2; i < ROPE_MAX_DEPTH+2; i++){
+            rope_min_length[i] = rope_min_length[i-1]+rope_min_length[i-2];
+        }
+    }
+    // balanced subtrees are kept whole and new nodes join them, the nodes of
+    // s may be shared with other strings and are left alone
+    String* forest[ROPE_MAX_DEPTH+1] = {NULL};
+    rope_add_to_forest(forest, s->left);
+    rope_add_to_forest(forest, s->right);
+    String* balanced = NULL;
+    for (int i = 0; i <= ROPE_MAX_DEPTH; i++){
+        if (forest[i] != NULL){
+            balanced = balanced == NULL ? forest[i] : rope_node(forest[i], balanced);
+        }
+    }
+    if (balanced->left == NULL){
+        // a single leaf besides empty ones
+        string_flatten(s);
+        return;
+    }
+    s->left = balanced->left;
+    s->right = balanced->right;
+    s->depth = balanced->depth;
+}
+
+void stringInsert(String* s, char c){
+    PYRT_STAT(string_inserts, 1);
+    string_flatten(s);
+    string_reserve(s, s->length+1);
+    s->data[s->length] = c;
     s->length++;
 }
 
 String* concat_strings(String* a, String* b){
     String* ns = new_string();
-    for (int i=0; i<a->length;i++){
-        stringInsert(ns, a->data[i]);
+    PYRT_STAT(concat_strings, 1);
+    if (a->length+b->length <= STRING_INLINE_CAPACITY){
+        // copying a few characters is cheaper than a rope node
+        string_flatten(a);
+        string_flatten(b);
+        memcpy(ns->data, a->data, a->length);
+        memcpy(ns->data+a->length, b->data, b->length);
+        ns->length = a->length+b->length;
+        PYRT_STAT(concat_strings_bytes, ns->length);
+        return ns;
     }
-    for (int i=0; i<b->length;i++){
-        stringInsert(ns, b->data[i]);
+    PYRT_STAT(rope_nodes, 1);
+    ns->left = a;
+    ns->right = b;
+    ns->length = a->length+b->length;
+    ns->depth = 1+(a->depth > b->depth ? a->depth : b->depth);
+    if (ns->depth > ROPE_MAX_DEPTH){
+        string_rebalance(ns);
     }
     return ns;
 }
+
+void string_append(String* s, String* b){
+    PYRT_STAT(string_appends, 1);
+    PYRT_STAT(string_append_bytes, b->length);
+    string_flatten(s);
+    string_flatten(b);
+    string_reserve(s, s->length+b->length);
+    memcpy(s->data+s->length, b->data, b->length);
+    s->length += b->length;
+}
@@ -2,14 +2,32 @@
 #define PYTHON_STRING
 #include <stdlib.h>
 
+// strings of up to STRING_INLINE_CAPACITY characters are stored in the
+// struct itself, data points either to inline or to a heap buffer
+#define STRING_INLINE_CAPACITY 16
+// a rope deeper than this is rebalanced on concatenation, see string_rebalance
+#define ROPE_MAX_DEPTH 64
+
+// A string is either flat, with its characters in data, or a rope node
+// standing for the concatenation of left and right. Ropes are flattened
+// in place by string_flatten before their characters are read.
 typedef struct python_string
 {
     int length;
+    int capacity;
     char* data;
+    char inline_data[STRING_INLINE_CAPACITY];
+    struct python_string* left;
+    struct python_string* right;
+    int depth;
 } String;
 
 String* new_string();
+void string_reserve(String* s, int capacity);
+String* string_flatten(String* s);
+void string_rebalance(String* s);
 void stringInsert(String* s, char c);
 String* concat_strings(String* a, String* b);
+void string_append(String* s, String* b);
 
 #endif
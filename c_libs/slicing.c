@@ -1,4 +1,5 @@
 #include "slicing.h"
+#include "python_stats.h"
 struct List* sliceList(struct List* list, int start, int end, int step) {
     struct List * nl = new_list();
     if (start < 0){
@@ -13,27 +14,32 @@ struct List* sliceList(struct List* list, int start, int end, int step) {
     if (step < 0){
         for (int i = end-1; i>=start; i += step) {
             struct Node* node = getNode(list, i);
-            struct Node* new_node = (struct Node*)malloc(sizeof (struct Node*));
+            struct Node* new_node = (struct Node*)malloc(sizeof (struct Node));
+            PYRT_STAT_ALLOC(PYRT_STAT_NODE, sizeof(struct Node));
             new_node->node_type = node->node_type;
-            new_node->data = node->data;
+            new_node->value = node->value;
             new_node->next = NULL;
             insert(nl, new_node);
         }
     }else {
         for (int i = start; i<end; i += step) {
             struct Node* node = getNode(list, i);
-            struct Node* new_node = (struct Node*)malloc(sizeof (struct Node*));
+            struct Node* new_node = (struct Node*)malloc(sizeof (struct Node));
+            PYRT_STAT_ALLOC(PYRT_STAT_NODE, sizeof(struct Node));
             new_node->node_type = node->node_type;
-            new_node->data = node->data;
+            new_node->value = node->value;
             new_node->next = NULL;
             insert(nl, new_node);
         }
     }
+    PYRT_STAT(list_slices, 1);
+    PYRT_STAT(list_slice_elements, nl->length);
     return nl;
 }
 
 String* sliceString(String* string, int start, int end, int step) {
     String * ns = new_string();
+    string_flatten(string);
     if (start < 0){
         start = 0;
     }
@@ -43,6 +49,9 @@ String* sliceString(String* string, int start, int end, int step) {
     if (end > string->length){
         end = string->length;
     }
+    if (end > start && step != 0){
+        string_reserve(ns, (end-start)/(step < 0 ? -step : step)+1);
+    }
     if (step < 0){
         for (int i = end-1; i>=start; i += step) {
             stringInsert(ns, string->data[i]);
@@ -52,5 +61,7 @@ String* sliceString(String* string, int start, int end, int step) {
             stringInsert(ns, string->data[i]);
         }
     }
+    PYRT_STAT(string_slices, 1);
+    PYRT_STAT(string_slice_chars, ns->length);
     return ns;
 }
\ No newline at end of file
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of compiler.py and of the programs it generates. Each benchmark
+generates its inputs, runs them without and with what it measures, prints
+the fastest of a few runs of each, and fails unless both agree, e.g. print
+the same or write the same C. --scale multiplies the size of the inputs.
+
+    python checks/checkBenchmarks.py [NAME ...] [--scale S] [--repeat N] [--keep DIR]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from checkCommon import (REPO, RUN_TIMEOUT, CheckError, build, build_and_run, compiler_command, differences,
+                         link_sources, read_sources, report, work_dir_name)
+
+# the lexer benchmark runs both scanners of the compiler in this process
+sys.path.insert(0, REPO)
+from pythonDFAScanner import DFALexer
+from pythonScanner import pythonLexer
+
+# top level blocks of the stream benchmark, of 9 lines each
+STREAM_BLOCKS = 4000
+# functions of the function-workers benchmark
+WORKER_FUNCTIONS = 2000
+# appends to the shortest string of the ropes benchmark, doubled twice
+ROPE_APPENDS = 250000
+# passes over the list of the release benchmark, reading 8 elements each
+RELEASE_ROUNDS = 4000000
+# largest argument of fib in the memoize benchmark, its calls grow as 1.6^n
+MEMO_DEPTH = 36
+# iterations of the parallel loop of the parallel benchmark, each one looping 2000 times
+PARALLEL_CALLS = 50000
+# iterations of the unity benchmark, each one calling three runtime accessors
+UNITY_ROUNDS = 20000000
+# functions of the source scanned by the lexer benchmark, then its top level blocks
+LEXER_FUNCTIONS = 2000
+
+
+def write_examples(root, programs):
+    """
+    Write the generated programs, sources by name, into root/examples,
+    returning the path of that folder
+    """
+    examples = os.path.join(root, "examples")
+    os.makedirs(examples, exist_ok=True)
+    for (name, source) in programs.items():
+        with open(os.path.join(examples, name), 'w') as f:
+            f.write(source)
+    return examples
+
+
+def compile_measured(work_dir, examples, flags=()):
+    """
+    Compile the examples folder with compiler.py and flags in work_dir, as
+    compile_examples does, returning the generated C by example name, the
+    seconds compiler.py ran and its peak resident memory in MB
+    """
+    link_sources(work_dir, examples)
+    with tempfile.TemporaryFile() as output:
+        start = time.perf_counter()
+        process = subprocess.Popen(compiler_command(flags), cwd=work_dir, stdout=output, stderr=output)
+        # unlike Popen.wait, wait4 returns the resources used by this process
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        sources = read_sources(work_dir, examples)
+        if process.returncode != 0 or len(sources) != len(os.listdir(examples)):
+            output.seek(0)
+            raise CheckError(f"compiler.py {' '.join(flags)} failed:\n{output.read().decode()}")
+    return sources, seconds, usage.ru_maxrss / 1024
+
+
+def run_timed(work_dir, examples, repeat):
+    """
+    Build the programs compiled into work_dir and run each of them repeat
+    times, returning what it printed and its fastest run in seconds, by
+    example name
+    """
+    timings = dict()
+    for (name, program) in build(work_dir, examples=examples).items():
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                run = subprocess.run([program], cwd=os.path.dirname(program), capture_output=True, timeout=RUN_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                raise CheckError(f"{program} ran for more than {RUN_TIMEOUT}s")
+            runs.append(time.perf_counter() - start)
+        timings[name] = (run.stdout + run.stderr, min(runs))
+    return timings
+
+
+def print_timing(label, seconds, baseline, detail=""):
+    """
+    Print one variant of a benchmark, with its speedup over the baseline
+    """
+    print(f"  {label:<32}{seconds:9.3f}s {baseline / seconds:6.2f}x  {detail}".rstrip())
+
+
+def compare_programs(label, root, programs, variants, repeat):
+    """
+    Compile the programs, sources by name, with each variant of flags in
+    turn, and print the time all of them take to run. Returns whether
+    every variant prints what the first one prints.
+    """
+    examples = write_examples(root, programs)
+    expected = None
+    agree = True
+    for flags in variants:
+        work_dir = work_dir_name(root, flags)
+        compile_measured(work_dir, examples, flags)
+        timings = run_timed(work_dir, examples, repeat)
+        seconds = sum(seconds for (_, seconds) in timings.values())
+        outputs = {name: output for (name, (output, _)) in timings.items()}
+        if expected is None:
+            (expected, baseline) = (outputs, seconds)
+        names = differences(expected, outputs)
+        print_timing(" ".join(flags) or "default", seconds, baseline,
+                     f"{' '.join(names)} print something else" if names else "")
+        agree &= not names
+    print(f"{label}: {len(variants)} variants {'agree' if agree else 'differ'}")
+    return agree
+
+
+def stream_source(blocks):
+    """
+    Program of the given number of functions, globals and prints, each one
+    a top level statement
+    """
+    return "".join(f"def f{k}(a: int) -> int: {{\n"
+                   f"    b: int;\n"
+                   f"    b = a * 3 + {k};\n"
+                   f"    return b;\n"
+                   f"}}\n"
+                   f"x{k}: int;\n"
+                   f"x{k} = {k % 97};\n"
+                   f"x{k} = f{k}(x{k});\n"
+                   f"print(x{k});\n" for k in range(blocks))
+
+
+def stream_benchmark(root, scale, repeat):
+    """
+    Whole file against streaming compilation (--stream) of a long program,
+    in time and peak memory of compiler.py
+    """
+    blocks = int(STREAM_BLOCKS * scale)
+    examples = write_examples(root, {"stream": stream_source(blocks)})
+    print(f"stream: compiling {blocks * 9} lines")
+    outputs = dict()
+    baseline = None
+    for flags in ((), ("--stream",)):
+        work_dir = work_dir_name(root, flags)
+        runs = [compile_measured(work_dir, examples, flags)[1:] for _ in range(repeat)]
+        seconds = min(run[0] for run in runs)
+        baseline = baseline or seconds
+        print_timing(" ".join(flags) or "whole file", seconds, baseline,
+                     f"{max(run[1] for run in runs):.0f} MB peak")
+        outputs[flags] = build_and_run(work_dir, examples=examples)
+    return report("stream: programs", outputs[()], outputs[("--stream",)])
+
+
+def workers_source(functions):
+    """
+    Program of the given number of functions with loops, branches and
+    string temporaries, each called once
+    """
+    return "".join(f"def g{k}(n: int, s: str) -> str: {{\n"
+                   f"    r: str;\n"
+                   f"    i: int;\n"
+                   f"    r = s;\n"
+                   f"    i = 0;\n"
+                   f"    while (i < n): {{\n"
+                   f"        if (i % {k % 5 + 2} == 0): {{\n"
+                   f"            r = r + str(i * {k});\n"
+                   f"        }} else: {{\n"
+                   f"            r = r + s[0:1];\n"
+                   f"        }}\n"
+                   f"        i = i + 1;\n"
+                   f"    }}\n"
+                   f"    return r;\n"
+                   f"}}\n" for k in range(functions)) + \
+        "".join(f"print(g{k}({k % 7}, \"x\"));\n" for k in range(functions))
+
+
+def workers_benchmark(root, scale, repeat):
+    """
+    Sequential lowering of the functions of a file against lowering them on
+    a process pool (--function-workers), which must write the same C
+    """
+    functions = int(WORKER_FUNCTIONS * scale)
+    workers = str(max(2, os.cpu_count()))
+    examples = write_examples(root, {"functions": workers_source(functions)})
+    print(f"function-workers: compiling {functions} functions, {os.cpu_count()} CPUs")
+    sources = dict()
+    baseline = None
+    for flags in ((), ("--function-workers", workers)):
+        runs = [compile_measured(work_dir_name(root, flags), examples, flags) for _ in range(repeat)]
+        seconds = min(run[1] for run in runs)
+        baseline = baseline or seconds
+        print_timing(" ".join(flags) or "sequential", seconds, baseline)
+        sources[flags] = runs[0][0]
+    return report("function-workers: C", sources[()], sources[("--function-workers", workers)])
+
+
+def ropes_source(appends):
+    """
+    Program appending to a string in a loop, and prepending to it every
+    1000 appends
+    """
+    return (f"r: str;\n"
+            f"i: int;\n"
+            f"r = \"\";\n"
+            f"i = 0;\n"
+            f"while (i < {appends}): {{\n"
+            f"    r = r + \"abcdefghij\";\n"
+            f"    if (i % 1000 == 0): {{\n"
+            f"        r = str(i) + r;\n"
+            f"    }}\n"
+            f"    i = i + 1;\n"
+            f"}}\n"
+            f"print(len(r));\n"
+            f"print(r[0:20]);\n"
+            f"print(r[len(r) - 20:]);\n")
+
+
+def ropes_output(appends):
+    """
+    What the program of ropes_source prints
+    """
+    r = "".join(str(i) for i in reversed(range(0, appends, 1000))) + "abcdefghij" * appends
+    return f"{len(r)}\n{r[0:20]}\n{r[len(r) - 20:]}\n".encode()
+
+
+def ropes_benchmark(root, scale, repeat):
+    """
+    Strings built by appending in a loop. With ropes the time per append
+    does not grow with the string, where copying on every append made the
+    loop quadratic: each doubling of the appends should double the time.
+    """
+    sizes = [int(ROPE_APPENDS * scale) << k for k in range(3)]
+    examples = write_examples(root, {f"ropes{n}": ropes_source(n) for n in sizes})
+    print(f"ropes: building strings of {' '.join(map(str, sizes))} appends")
+    work_dir = work_dir_name(root, ())
+    compile_measured(work_dir, examples)
+    timings = run_timed(work_dir, examples, repeat)
+    expected = dict()
+    for n in sizes:
+        seconds = timings[f"ropes{n}"][1]
+        # against the time the shortest string would take if the loop stayed linear
+        print_timing(f"{n} appends", seconds, timings[f"ropes{sizes[0]}"][1] * n / sizes[0],
+                     f"against linear growth, {seconds / n * 1e9:.0f} ns per append")
+        expected[f"ropes{n}"] = ropes_output(n)
+    return report("ropes: programs", expected, {name: output for (name, (output, _)) in timings.items()})
+
+
+def release_source(rounds):
+    """
+    Program reading the elements of a list in a loop, each one through
+    the checked accessors of the runtime
+    """
+    return (f"def total(values: list, rounds: int) -> int: {{\n"
+            f"    s: int;\n"
+            f"    i: int;\n"
+            f"    j: int;\n"
+            f"    n: int;\n"
+            f"    s = 0;\n"
+            f"    n = len(values);\n"
+            f"    i = 0;\n"
+            f"    while (i < rounds): {{\n"
+            f"        j = 0;\n"
+            f"        while (j < n): {{\n"
+            f"            s = (s + int(values[j]) * (i % 5)) % 1000003;\n"
+            f"            j = j + 1;\n"
+            f"        }}\n"
+            f"        i = i + 1;\n"
+            f"    }}\n"
+            f"    return s;\n"
+            f"}}\n"
+            f"values: list;\n"
+            f"values = [3, 1, 4, 1, 5, 9, 2, 6];\n"
+            f"print(total(values, {rounds}));\n")
+
+
+def release_benchmark(root, scale, repeat):
+    """
+    Debug builds, plain and optimized, against the release profile
+    (--release), which also drops the element type checks of the runtime
+    """
+    rounds = int(RELEASE_ROUNDS * scale)
+    print(f"release: reading {rounds * 8} list elements")
+    return compare_programs("release", root, {"elements": release_source(rounds)},
+                            [(), ("--optimize",), ("--release",)], repeat)
+
+
+def memoize_source(depth):
+    """
+    Program calling recursive functions from a loop, so that the calls are
+    not evaluated at compile time
+    """
+    return (f"def fib(n: int) -> int: {{\n"
+            f"    if (n < 2): {{\n"
+            f"        return n;\n"
+            f"    }}\n"
+            f"    return fib(n - 1) + fib(n - 2);\n"
+            f"}}\n"
+            f"def binomial(n: int, k: int) -> int: {{\n"
+            f"    if (k == 0 or k == n): {{\n"
+            f"        return 1;\n"
+            f"    }}\n"
+            f"    return binomial(n - 1, k - 1) + binomial(n - 1, k);\n"
+            f"}}\n"
+            f"i: int;\n"
+            f"i = {depth - 3};\n"
+            f"while (i <= {depth}): {{\n"
+            f"    print(fib(i));\n"
+            f"    print(binomial(i - 7, (i - 7) / 2));\n"
+            f"    i = i + 1;\n"
+            f"}}\n")
+
+
+def memoize_benchmark(root, scale, repeat):
+    """
+    Recursive functions called as written against memoized ones
+    (--memoize), both optimized
+    """
+    # fib of 46 is the last one that fits an int, binomial needs i - 7 >= 0
+    depth = max(min(int(MEMO_DEPTH * scale), 46), 10)
+    print(f"memoize: fib and binomial up to {depth}")
+    return compare_programs("memoize", root, {"recursion": memoize_source(depth)},
+                            [("--optimize",), ("--memoize",)], repeat)
+
+
+def parallel_source(calls):
+    """
+    Program summing the results of a const function in a counted loop
+    """
+    return (f"def work(n: int) -> int: {{\n"
+            f"    s: int;\n"
+            f"    j: int;\n"
+            f"    s = 0;\n"
+            f"    j = 0;\n"
+            f"    while (j < 2000): {{\n"
+            f"        s = (s + j * (n % 101)) % 1009;\n"
+            f"        j = j + 1;\n"
+            f"    }}\n"
+            f"    return s;\n"
+            f"}}\n"
+            f"total: int;\n"
+            f"i: int;\n"
+            f"total = 0;\n"
+            f"i = 0;\n"
+            f"while (i < {calls}): {{\n"
+            f"    total = total + work(i);\n"
+            f"    i = i + 1;\n"
+            f"}}\n"
+            f"print(total);\n")
+
+
+def parallel_benchmark(root, scale, repeat):
+    """
+    A sequential reduction against the same loop run by OpenMP (--parallel)
+    on one thread and on every CPU
+    """
+    calls = int(PARALLEL_CALLS * scale)
+    threads = sorted({1, os.cpu_count()})
+    variants = [("--optimize",)] + [("--parallel", "--threads", str(n)) for n in threads]
+    print(f"parallel: reducing {calls} calls, {os.cpu_count()} CPUs")
+    agree = compare_programs("parallel", root, {"reduction": parallel_source(calls)}, variants, repeat)
+    examples = os.path.join(root, "examples")
+    for flags in variants[1:]:
+        if b"#pragma omp parallel for" not in read_sources(work_dir_name(root, flags), examples)["reduction"]:
+            print(f"parallel: {' '.join(flags)} left the loop sequential")
+            agree = False
+    return agree
+
+
+def unity_source(rounds):
+    """
+    Program calling small accessors of the runtime in a loop
+    """
+    return (f"def count(values: list, s: str, rounds: int) -> int: {{\n"
+            f"    t: int;\n"
+            f"    i: int;\n"
+            f"    t = 0;\n"
+            f"    i = 0;\n"
+            f"    while (i < rounds): {{\n"
+            f"        t = (t + int(values[i % 4]) + len(values) + len(s)) % 1000003;\n"
+            f"        i = i + 1;\n"
+            f"    }}\n"
+            f"    return t;\n"
+            f"}}\n"
+            f"values: list;\n"
+            f"values = [1, 2, 3, 4];\n"
+            f"print(count(values, \"abc\", {rounds}));\n")
+
+
+def unity_benchmark(root, scale, repeat):
+    """
+    Programs linked against the runtime library against programs compiled
+    with the runtime as one translation unit (--unity), both optimized
+    """
+    rounds = int(UNITY_ROUNDS * scale)
+    print(f"unity: {rounds * 3} calls of runtime accessors")
+    return compare_programs("unity", root, {"accessors": unity_source(rounds)},
+                            [("--optimize",), ("--unity", "--optimize")], repeat)
+
+
+def ply_lexer():
+    """
+    The PLY lexer of pythonScanner, as pythonParser.build(ply_lexer=True) builds it
+    """
+    lexer = pythonLexer()
+    lexer.build()
+    return lexer.lexer
+
+
+def scan(lexer, data):
+    """
+    Scan data with lexer, returning the type, value and position of every
+    token and the seconds it took
+    """
+    start = time.perf_counter()
+    lexer.input(data)
+    tokens = []
+    token = lexer.token()
+    while token is not None:
+        tokens.append(token)
+        token = lexer.token()
+    seconds = time.perf_counter() - start
+    return [(t.type, t.value, t.lineno, t.lexpos) for t in tokens], seconds
+
+
+def lexer_benchmark(root, scale, repeat):
+    """
+    The PLY lexer of pythonScanner against the scanner of pythonDFAScanner
+    that the parser uses, which must produce the same tokens
+    """
+    blocks = int(LEXER_FUNCTIONS * scale)
+    examples = write_examples(root, {"tokens": workers_source(blocks) + stream_source(blocks)})
+    with open(os.path.join(examples, "tokens")) as f:
+        data = f.read()
+    print(f"lexer: scanning {len(data) / 1e6:.1f} MB")
+    scanned = dict()
+    baseline = None
+    for (label, new_lexer) in (("PLY", ply_lexer), ("DFA", DFALexer)):
+        runs = [scan(new_lexer(), data) for _ in range(repeat)]
+        seconds = min(seconds for (_, seconds) in runs)
+        baseline = baseline or seconds
+        print_timing(label, seconds, baseline, f"{len(runs[0][0]) / seconds / 1e6:.2f}M tokens/s")
+        scanned[label] = runs[0][0]
+    agree = scanned["PLY"] == scanned["DFA"]
+    print(f"lexer: tokens {'agree' if agree else 'differ'}")
+    return agree
+
+
+BENCHMARKS = {
+    "stream": stream_benchmark,
+    "function-workers": workers_benchmark,
+    "ropes": ropes_benchmark,
+    "release": release_benchmark,
+    "memoize": memoize_benchmark,
+    "parallel": parallel_benchmark,
+    "unity": unity_benchmark,
+    "lexer": lexer_benchmark,
+}
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Time compiler.py and its programs without and with each optimization.')
+    argparser.add_argument('names', nargs='*', help=f'Benchmarks to run, all by default: {" ".join(BENCHMARKS)}')
+    argparser.add_argument('--scale', help='Factor of the size of the generated inputs', type=float, default=1.0)
+    argparser.add_argument('--repeat', help='Runs of each variant, the fastest one is printed', type=int, default=3)
+    argparser.add_argument('--keep', help='Directory keeping the inputs and out folders of every benchmark', default=None)
+    args = argparser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        argparser.error(f"unknown benchmarks {' '.join(unknown)}, choose from {' '.join(BENCHMARKS)}")
+
+    root = args.keep or tempfile.mkdtemp(prefix="benchmarks")
+    try:
+        agree = True
+        for name in args.names or BENCHMARKS:
+            agree &= BENCHMARKS[name](os.path.join(root, name), args.scale, args.repeat)
+    finally:
+        if args.keep is None:
+            shutil.rmtree(root)
+    sys.exit(0 if agree else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Helpers of the check scripts: each run of compiler.py happens in its own
+working directory, holding links to the examples and the runtime and the
+out folder of that run, so runs can be compared with each other and the out folder of
+the repository is left alone.
+"""
+
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPILER = os.path.join(REPO, "compiler.py")
+EXAMPLES = os.path.join(REPO, "examples")
+# seconds each program may run
+RUN_TIMEOUT = 10
+# examples named when runs differ
+MAX_REPORTED = 10
+# flags of the pipelines compared with the default one
+PIPELINES = [
+    ("--optimize",),
+    ("--ssa",),
+    ("--optimize", "--ssa"),
+    ("--release",),
+    ("--memoize",),
+    ("--parallel",),
+    ("--stream",),
+    ("--stream", "--optimize"),
+    ("--unity", "--optimize"),
+    ("--instrument", "--optimize"),
+    ("--function-workers", "2", "--optimize", "--ssa"),
+]
+
+
+class CheckError(Exception): pass
+
+
+def compiler_command(flags, switch_interval=None):
+    """
+    Command running compiler.py with flags, in an interpreter switching
+    threads every switch_interval seconds instead of every 5 ms if given
+    """
+    if switch_interval is None:
+        return [sys.executable, COMPILER, *flags]
+    code = (f"import runpy, sys; sys.path.insert(0, {REPO!r}); sys.setswitchinterval({switch_interval}); "
+            f"sys.argv = {[COMPILER, *flags]!r}; runpy.run_path({COMPILER!r}, run_name='__main__')")
+    return [sys.executable, "-c", code]
+
+
+def compile_examples(work_dir, flags=(), env=None, examples=EXAMPLES, switch_interval=None):
+    """
+    Compile every example of the examples folder with compiler.py and the
+    given flags in work_dir, returning the generated C of each compiled
+    example by its name. env is added to the environment of compiler.py,
+    see compiler_command for switch_interval.
+    """
+    link_sources(work_dir, examples)
+    result = subprocess.run(compiler_command(flags, switch_interval), cwd=work_dir, capture_output=True, text=True,
+                            env={**os.environ, **(env or {})})
+    if result.returncode != 0:
+        raise CheckError(f"compiler.py {' '.join(flags)} failed:\n{result.stderr}")
+    return read_sources(work_dir, examples)
+
+
+def link_sources(work_dir, examples=EXAMPLES):
+    """
+    Create work_dir with links to the examples folder and the runtime,
+    both read by compiler.py relative to its working directory
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    for (name, target) in (("examples", examples), ("c_libs", os.path.join(REPO, "c_libs"))):
+        link = os.path.join(work_dir, name)
+        if not os.path.exists(link):
+            os.symlink(target, link)
+
+
+def read_sources(work_dir, examples=EXAMPLES):
+    """
+    Generated C of each example compiled into the out folder of work_dir,
+    by example name
+    """
+    sources = dict()
+    out = os.path.join(work_dir, "out")
+    for name in sorted(os.listdir(examples)):
+        path = os.path.join(out, name, name + ".c")
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                sources[name] = f.read()
+    return sources
+
+
+def build(work_dir, jobs=4, examples=EXAMPLES):
+    """
+    Build the programs of the out folder of work_dir with its Makefile,
+    returning the path of the program of each example by its name
+    """
+    out = os.path.join(work_dir, "out")
+    result = subprocess.run(["make", f"-j{jobs}"], cwd=out, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise CheckError(f"make failed in {out}:\n{result.stdout}{result.stderr}")
+    programs = (os.path.join(out, name, name) for name in sorted(os.listdir(examples)))
+    return {os.path.basename(program): program for program in programs if os.path.exists(program)}
+
+
+def build_and_run(work_dir, jobs=4, examples=EXAMPLES):
+    """
+    Build the programs of the out folder of work_dir with its Makefile and
+    run each of them, returning what it printed and whether it was killed
+    by a signal, by example name. The exit status itself is not compared,
+    a program without statements returns whatever main left behind.
+    """
+    outputs = dict()
+    for (name, program) in build(work_dir, jobs, examples).items():
+        try:
+            run = subprocess.run([program], cwd=os.path.dirname(program), capture_output=True, timeout=RUN_TIMEOUT)
+            outputs[name] = (run.stdout + run.stderr, run.returncode < 0)
+        except subprocess.TimeoutExpired:
+            outputs[name] = (b"", "timeout")
+    return outputs
+
+
+def work_dir_name(root, flags):
+    """
+    Folder of root in which compiler.py runs with flags
+    """
+    return os.path.join(root, "".join(flags).replace("--", "_").strip("_") or "default")
+
+
+def differences(expected, actual):
+    """
+    Names of the examples whose entries differ between the two dicts
+    """
+    return sorted(name for name in expected.keys() | actual.keys() if expected.get(name) != actual.get(name))
+
+
+def report(label, expected, actual):
+    """
+    Print the examples on which actual differs from expected, returning
+    whether they all agree
+    """
+    names = differences(expected, actual)
+    if names:
+        more = " ..." if len(names) > MAX_REPORTED else ""
+        print(f"{label}: {len(names)} differ: {' '.join(names[:MAX_REPORTED])}{more}")
+    else:
+        print(f"{label}: {len(actual)} agree")
+    return not names
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Compiles every example with each pipeline of compiler.py, once on a
+single thread and then several times on a thread pool (-j), and checks
+that the concurrent runs generate byte for byte the C of the sequential
+one, e.g. that compilations running at the same time share no parser,
+lexer or context state. The interpreter switches threads every
+SWITCH_INTERVAL seconds, so that they interleave within the parse of
+even a small example.
+
+    python checks/checkConcurrency.py [--jobs N] [--rounds N] [--copies N] [--keep DIR]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from checkCommon import EXAMPLES, PIPELINES, compile_examples, report, work_dir_name
+
+SWITCH_INTERVAL = 1e-6
+
+
+def copy_examples(examples, copies):
+    """
+    Fill the folder examples with the given number of copies of every
+    example, so that the threads compile more files at the same time
+    """
+    os.makedirs(examples)
+    for name in os.listdir(EXAMPLES):
+        for copy in range(copies):
+            shutil.copy(os.path.join(EXAMPLES, name), os.path.join(examples, f"{name}_{copy}"))
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Check that compiler.py -j generates the C of a sequential run.')
+    argparser.add_argument('-j', '--jobs', help='Number of threads compiling the examples', type=int, default=8)
+    argparser.add_argument('--rounds', help='Number of concurrent runs of each pipeline', type=int, default=5)
+    argparser.add_argument('--copies', help='Number of copies of each example compiled by every run', type=int, default=4)
+    argparser.add_argument('--keep', help='Directory keeping the out folders of the last runs', default=None)
+    args = argparser.parse_args()
+
+    root = args.keep or tempfile.mkdtemp(prefix="concurrency")
+    try:
+        examples = os.path.join(root, "examples")
+        copy_examples(examples, args.copies)
+        same = True
+        for flags in [()] + PIPELINES:
+            label = " ".join(flags) or "default"
+            expected = compile_examples(work_dir_name(os.path.join(root, "sequential"), flags), flags + ("-j", "1"),
+                                         examples=examples)
+            for round in range(args.rounds):
+                actual = compile_examples(work_dir_name(os.path.join(root, "concurrent"), flags),
+                                          flags + ("-j", str(args.jobs)), examples=examples,
+                                          switch_interval=SWITCH_INTERVAL)
+                same &= report(f"{label} -j {args.jobs} #{round + 1}", expected, actual)
+    finally:
+        if args.keep is None:
+            shutil.rmtree(root)
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
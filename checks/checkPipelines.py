@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Compiles every example with each pipeline of compiler.py, builds and runs
+the programs, and checks that they print the same as the programs of the
+default pipeline, e.g. that the control flow of --ssa or the calls folded
+by --optimize agree with the plain lowering.
+
+    python checks/checkPipelines.py [--keep DIR]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from checkCommon import PIPELINES, compile_examples, build_and_run, report, work_dir_name
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Check that all pipelines of compiler.py agree on the examples.')
+    argparser.add_argument('--keep', help='Directory keeping the out folder of every pipeline', default=None)
+    args = argparser.parse_args()
+
+    root = args.keep or tempfile.mkdtemp(prefix="pipelines")
+    try:
+        compile_examples(work_dir_name(root, ()))
+        expected = build_and_run(work_dir_name(root, ()))
+        print(f"default: {len(expected)} programs")
+        agree = True
+        for flags in PIPELINES:
+            work_dir = work_dir_name(root, flags)
+            compile_examples(work_dir, flags)
+            agree &= report(" ".join(flags), expected, build_and_run(work_dir))
+    finally:
+        if args.keep is None:
+            shutil.rmtree(root)
+    sys.exit(0 if agree else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Compiles every example twice with each pipeline of compiler.py, the
+second time with another hash seed, and checks that the generated C is
+byte for byte the same, e.g. that the names of compiler temporaries only
+depend on the source.
+
+    python checks/checkReproducible.py [--keep DIR]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from checkCommon import PIPELINES, compile_examples, report, work_dir_name
+
+# PYTHONHASHSEED of the two compilations, changing the order of sets of strings
+HASH_SEEDS = ("1", "2")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Check that compiler.py generates the same C on every run.')
+    argparser.add_argument('--keep', help='Directory keeping the out folders of both runs', default=None)
+    args = argparser.parse_args()
+
+    root = args.keep or tempfile.mkdtemp(prefix="reproducible")
+    try:
+        same = True
+        for flags in [()] + PIPELINES:
+            first, second = (compile_examples(work_dir_name(os.path.join(root, seed), flags), flags,
+                                              {"PYTHONHASHSEED": seed}) for seed in HASH_SEEDS)
+            same &= report(" ".join(flags) or "default", first, second)
+    finally:
+        if args.keep is None:
+            shutil.rmtree(root)
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
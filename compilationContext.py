@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import copy
+import sys
+from collections import Counter
+
+class ParseError(Exception): pass
+
+# names of the generated C that are not in the source start with this
+# prefix, which the symbol table refuses to declare
+RESERVED_PREFIX = "_pyrt"
+
+class CompilerOptions(object):
+    """
+    Command line options changing the generated code, shared by every
+    compilation of a run. Plain attributes only, so it can be sent to the
+    worker processes lowering functions.
+    """
+
+    def __init__(self, optimize=False, instrument=False, report=False, ssa=False, memoize=False,
+                 parallel=False, threads=0, unity=False, function_workers=0):
+        # run the genericAST optimization passes, see genericOptimizer
+        self.optimize = optimize
+        # cache the results of pure recursive functions, see genericEffects
+        self.memoize = memoize
+        # run independent counted loops on threads, see genericParallel,
+        # with threads threads each or the OpenMP default if 0
+        self.parallel = parallel
+        self.threads = threads
+        # lower functions through their SSA form, see genericSSA
+        self.ssa = ssa
+        # print what the optimization passes did for each file
+        self.report = report
+        # emit profiling counters and timers, see c_libs/python_profile.h
+        self.instrument = instrument
+        # include the runtime sources in the program, see cAST.Program.includes
+        self.unity = unity
+        # processes of the pool lowering functions, see
+        # pythonAST.python_ast_to_generic
+        self.function_workers = function_workers
+
+class CompilationContext(object):
+    """
+    Mutable state belonging to a single compilation.
+
+    One context is created per source file and threaded through parsing
+    and lowering, so several compilations can run in the same process
+    (for example on a thread pool) without sharing any state.
+    """
+
+    def __init__(self, options: CompilerOptions=None):
+        self.options = options if options is not None else CompilerOptions()
+        # return statements seen since the last function declaration
+        self.return_stack = []
+        # lists and strings that must be declared before the statement
+        # currently being lowered, see genericAST.StmList.transform
+        self.list_declarations = []
+        self.str_declarations = []
+        # syntax errors recorded by the parser
+        self.errors = []
+        # offset in the source of the text being parsed, which is only a
+        # statement of it when streaming, see pythonParser.parse_statements
+        self.lexpos_offset = 0
+        # counters for compiler temporaries, see new_temp_name
+        self.temp_counters = dict()
+        # source function being lowered, main for top level code
+        self.function_name = "main"
+        # what the optimization passes did, by event
+        self.report = Counter()
+
+    def print_report(self, file_name):
+        if not self.options.report:
+            return
+        # a single write, so reports of concurrent compilations do not interleave
+        line = (f"{file_name}: evaluated {self.report['calls evaluated']} calls, "
+                f"removed {self.report['bounds checks removed']} of "
+                f"{self.report['bounds checks']} bounds checks, found {self.report['const functions']} const "
+                f"and {self.report['pure functions']} pure functions and {self.report['restrict parameters']} "
+                f"restrict parameters")
+        memoized = sorted(k.split(" ", 1)[1] for k in self.report if k.startswith("memoized "))
+        if memoized:
+            line += f", memoized {', '.join(memoized)}"
+        if self.options.parallel:
+            line += f", parallelized {self.report['parallel loops']} loops"
+        if self.options.ssa:
+            line += (f", propagated {self.report['ssa copies propagated']} copies, hoisted "
+                     f"{self.report['ssa instructions hoisted']} and removed "
+                     f"{self.report['ssa dead instructions removed']} dead instructions")
+        sys.stdout.write(line + "\n")
+
+    def syntax_error(self, token):
+        """
+        Record a syntax error at the given token. The token is None
+        when the parser reached the end of input unexpectedly.
+        """
+        if token is None:
+            self.errors.append(ParseError("Syntax error at end of input"))
+        else:
+            if self.lexpos_offset:
+                token = copy.copy(token)
+                token.lexpos += self.lexpos_offset
+            self.errors.append(ParseError("Syntax error at token " + str(token), token.lineno))
+
+    def new_temp_name(self, prefix):
+        """
+        Return the next name for a compiler temporary, e.g. _pyrt_l0,
+        _pyrt_l1 for lists and _pyrt_s0 for strings. Names only depend on the
+        order in which they are requested, so the generated C is identical
+        across runs.
+        """
+        count = self.temp_counters.get(prefix, 0)
+        self.temp_counters[prefix] = count + 1
+        return f"{RESERVED_PREFIX}_{prefix}{count}"
+
+    def drain_return_stack(self):
+        """
+        Return and forget the return statements collected so far
+        """
+        ret_stms = self.return_stack[:]
+        self.return_stack.clear()
+        return ret_stms
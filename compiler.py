@@ -1,49 +1,205 @@
 import argparse
+import mmap
 import os
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pythonParser import pythonParser
 from pythonAST import python_ast_to_generic, NodeVisitor
 from pythonTypeChecker import TypeChecker, ParseError
+from pythonSymbolTable import SymbolTable
+import genericAST
+import genericEvaluator
+import genericOptimizer
+import genericEffects
+import genericParallel
+import genericSSA
+import cAST
+from compilationContext import CompilationContext, CompilerOptions
+from cRuntime import write_runtime, write_makefile
+from cBuild import Builder, BuildOptions
 
-def run_compiler(m: pythonParser, data: str, file_name:str):
-    python_ast = m.parser.parse(data, tracking=True)
+def run_compiler(m: pythonParser, data: str, file_name:str, pool: ProcessPoolExecutor=None, options: CompilerOptions=None):
+    ctx = CompilationContext(options)
+    python_ast = m.parse(data, ctx)
     tc = TypeChecker()
     try:
+        if ctx.errors:
+            raise ctx.errors[0]
         tc.typecheck(python_ast)
-        generic_ast = python_ast_to_generic(python_ast)
-        c_ast = generic_ast.to_c_node()
+        generic_ast = python_ast_to_generic(python_ast, pool, ctx.options, ctx.report)
+        if ctx.options.optimize:
+            genericEvaluator.fold_program(generic_ast, ctx.report)
+            genericOptimizer.optimize_program(generic_ast, ctx.report)
+            effects = genericEffects.annotate_program(generic_ast, ctx.report, ctx.options.memoize)
+            if ctx.options.parallel:
+                genericParallel.parallelize_program(generic_ast, effects.summaries, ctx.report)
+        if ctx.options.ssa:
+            genericSSA.optimize_program(generic_ast, ctx.report)
+        c_ast = generic_ast.to_c_node(ctx)
         with open(file_name, 'w') as f:
             f.write(c_ast.to_code())
+        ctx.print_report(file_name)
+        return True
     except ParseError as p:
         print(f"Error in file {file_name} {p}")
+        return False
+
+def run_compiler_streaming(m: pythonParser, source, file_name: str, options: CompilerOptions=None):
+    """
+    Same as run_compiler, but type checks, lowers and emits one top level
+    statement at a time, so memory use does not grow with the statements of
+    main or the bodies of functions. Globals and functions are written out
+    as soon as they are lowered, the body of main is spilled to a temporary
+    file until the end. What is kept grows with the number of globals and
+    functions: their types and signatures, and with --optimize the effects
+    of every function and its lowered body, which calls with constant
+    arguments are evaluated with.
+    """
+    ctx = CompilationContext(options)
+    tc = TypeChecker()
+    st = SymbolTable()
+    global_types = dict()
+    folder = genericEvaluator.ConstantCallFolder(ctx.report)
+    effects = genericEffects.EffectsAnalysis(global_types, ctx.report, ctx.options.memoize)
+    try:
+        with open(file_name, 'w') as f, tempfile.TemporaryFile('w+') as main_body:
+            f.write(cAST.Program(profile=ctx.options.instrument, memoize=ctx.options.memoize,
+                                 unity=ctx.options.unity).includes())
+            separator = ""
+            for statement in m.parse_statements(source, ctx):
+                if ctx.errors:
+                    raise ctx.errors[0]
+                tc.typecheck(statement, st)
+                generic = statement.to_generic_node()
+                if isinstance(generic, genericAST.VariableDeclaration):
+                    global_types[generic.name] = generic.var_type.name
+                    f.write(f"{generic.to_c_node(ctx).to_code()};\n")
+                elif isinstance(generic, genericAST.FunctionDeclaration):
+                    st.keep_signature(generic.name)
+                    if ctx.options.optimize:
+                        folder.fold_stm_list(generic.body)
+                        folder.add_function(generic)
+                        genericOptimizer.optimize_function(generic, global_types, ctx.report)
+                        effects.annotate(generic)
+                        if ctx.options.parallel:
+                            genericParallel.parallelize_function(generic, effects.summaries, global_types, ctx.report)
+                    if ctx.options.ssa:
+                        generic = genericSSA.optimize_function(generic, ctx.report)
+                    c_function = generic.to_c_node(ctx)
+                    f.write(c_function.prototype() + c_function.to_code())
+                else:
+                    if ctx.options.optimize:
+                        generic = folder.fold_statement(generic)
+                    if ctx.options.parallel:
+                        genericParallel.parallelize_main(genericAST.StmList([generic], generic.lineno),
+                                                         effects.summaries, global_types, ctx.report)
+                    body = genericAST.StmList([generic], generic.lineno).to_c_node(ctx)
+                    main_body.write(separator + body.to_code())
+                    separator = "\n"
+            if ctx.errors:
+                raise ctx.errors[0]
+            c_main = genericAST.Program.c_main(None, ctx.options.instrument)
+            f.write(f"{c_main.body_signature()} {{\n")
+            main_body.seek(0)
+            shutil.copyfileobj(main_body, f)
+            f.write(f"\n}}\n{c_main.profile_wrapper()}")
+        ctx.print_report(file_name)
+        return True
+    except ParseError as p:
+        os.remove(file_name)
+        print(f"Error in file {file_name} {p}")
+        return False
+
+def compile_file(m: pythonParser, path: str, file_name: str, stream: bool, pool: ProcessPoolExecutor=None, options: CompilerOptions=None):
+    """
+    Compile the source at path into file_name, through a memory-mapped
+    file and the streaming pipeline if stream is set. Otherwise functions
+    are lowered on pool, if given.
+    """
+    if not stream:
+        with open(path, 'r') as f:
+            data = f.read()
+        return run_compiler(m, data, file_name, pool, options)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return run_compiler_streaming(m, b"", file_name, options)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            return run_compiler_streaming(m, source, file_name, options)
+
+def compile_example(m: pythonParser, d: str, stream: bool, pool: ProcessPoolExecutor=None, options: CompilerOptions=None):
+    """
+    Compile examples/d into out/d/d.c, returning its path relative to out
+    or None if it could not be compiled
+    """
+    os.mkdir(os.path.join("out", d))
+    name = os.path.join(d, os.path.split(d)[1]) + ".c"
+    if compile_file(m, os.path.join('examples', d), os.path.join("out", name), stream, pool, options):
+        return name
+    return None
 
 def main():
     argparser = argparse.ArgumentParser(description='Take in the python source code and parses it')
     argparser.add_argument('-f', '--file', help='Input file with python source code', default=None)
+    argparser.add_argument('-j', '--jobs', help='Number of examples and translation units to compile concurrently', type=int, default=1)
+    argparser.add_argument('--stream', help='Read sources through memory-mapped files and compile them statement by statement', action='store_true')
+    argparser.add_argument('--function-workers', help='Number of processes lowering the functions of each file concurrently', type=int, default=0)
+    argparser.add_argument('--optimize', help='Run the genericAST optimization passes (calls evaluated at compile time, common subexpression elimination, in-place appends, pure and const functions)', action='store_true')
+    argparser.add_argument('--release', help='Release profile: optimize, and build the runtime without element type checks (-DPYRT_RELEASE)', action='store_true')
+    argparser.add_argument('--ssa', help='Lower functions through SSA form and run its passes (copy propagation, loop invariant code motion, dead code elimination)', action='store_true')
+    argparser.add_argument('--memoize', help='Optimize, and cache the results of recursive functions of int and bool parameters that have no side effects', action='store_true')
+    argparser.add_argument('--parallel', help='Optimize, and run counted loops with independent iterations on several threads with OpenMP', action='store_true')
+    argparser.add_argument('--threads', help='Number of threads running each parallel loop, the OpenMP default (OMP_NUM_THREADS) if 0', type=int, default=0)
+    argparser.add_argument('--report', help='Print what the optimization passes did for each file', action='store_true')
+    argparser.add_argument('--instrument', help='Count and time every function call and count loop iterations, the program writes a JSON profile at exit', action='store_true')
+    argparser.add_argument('--unity', help='Compile the runtime into each program as a single translation unit, so its accessors can be inlined', action='store_true')
+    argparser.add_argument('--build', help='Invoke the C compiler to produce native binaries', action='store_true')
+    argparser.add_argument('--cc', help='C compiler used by --build', default=os.environ.get('CC', 'gcc'))
+    argparser.add_argument('--opt-level', help='Optimization level used by --build', choices=['0', '1', '2', '3', 's', 'fast'], default='2')
+    argparser.add_argument('--native', help='Tune the binaries for the local machine (-march=native)', action='store_true')
+    argparser.add_argument('--lto', help='Enable link time optimization', action='store_true')
+    argparser.add_argument('--pgo', help='Profile guided optimization, trained by running each program once', action='store_true')
+    argparser.add_argument('--runtime-stats', help='Build the runtime with allocation and operation statistics (-DPYRT_STATS)', action='store_true')
+    argparser.add_argument('--cache-dir', help='Directory caching object files by content hash', default='.objcache')
     args = argparser.parse_args()
 
     m = pythonParser()
     m.build()
+    options = CompilerOptions(optimize=args.optimize or args.release or args.memoize or args.parallel,
+                              instrument=args.instrument, report=args.report, ssa=args.ssa, memoize=args.memoize,
+                              parallel=args.parallel, threads=args.threads, unity=args.unity,
+                              function_workers=args.function_workers)
 
     if os.path.exists('out'):
         shutil.rmtree('out')
 
+    os.mkdir("out")
+    write_runtime("out")
+    programs = []
+    function_pool = None
+    if args.function_workers > 0:
+        function_pool = ProcessPoolExecutor(max_workers=args.function_workers)
     if args.file:
-        shutil.copytree("c_libs", "out")
-        with open(args.file, 'r') as f:
-            data = f.read()
-        file_name = os.path.basename(args.file)
-        out_name = os.path.join("out", file_name+".c")
-        run_compiler(m, data, out_name)
+        file_name = os.path.basename(args.file)+".c"
+        if compile_file(m, args.file, os.path.join("out", file_name), args.stream, function_pool, options):
+            programs.append(file_name)
     else:
-        os.mkdir("out")
-        for d in os.listdir('examples'):
-            example_folder = os.path.join("out", d)
-            shutil.copytree("c_libs", example_folder)
-            with open(os.path.join('examples', d)) as f:
-                data = f.read()
-            name = os.path.join(example_folder, os.path.split(d)[1]) + ".c"
-            run_compiler(m, data, name)
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            results = [pool.submit(compile_example, m, d, args.stream, function_pool, options) for d in sorted(os.listdir('examples'))]
+            programs = [r.result() for r in results if r.result() is not None]
+    if function_pool is not None:
+        function_pool.shutdown()
+    cflags = "-O2 -DPYRT_RELEASE" if args.release else "-O2"
+    if args.parallel:
+        cflags += " -fopenmp"
+    write_makefile("out", programs, cflags, args.unity)
+
+    if args.build:
+        build_options = BuildOptions(cc=args.cc, opt_level=args.opt_level, native=args.native, lto=args.lto,
+                                     pgo=args.pgo, jobs=args.jobs, cache_dir=args.cache_dir,
+                                     stats=args.runtime_stats, release=args.release, openmp=args.parallel,
+                                     unity=args.unity)
+        Builder("out", build_options).build(programs)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,8 @@
 import cAST
-import secrets
+from compilationContext import CompilationContext
 
-# to shift from OOP to procedural programming, we need to explicitly declare all objects 
-list_declarations = []
-str_declarations = []
+# to shift from OOP to procedural programming, we need to explicitly declare all objects,
+# they are collected per statement in CompilationContext.list_declarations/str_declarations
 class GenericNode:
     def __init__(self, lineno: int):
         self.lineno: int = lineno
@@ -20,16 +19,22 @@ class FunctionDeclarations(GenericNode):
         return tuple(("func[%d]" % i, var) for i, var in enumerate(self.functions))
     attr_names = ()
 
-    def to_c_node(self) -> cAST.FunctionDeclarations:
-        return default_conversion(self, cAST.FunctionDeclarations)
+    def to_c_node(self, ctx) -> cAST.FunctionDeclarations:
+        return default_conversion(self, cAST.FunctionDeclarations, ctx)
     
 class FunctionDeclaration(GenericNode):
-    def __init__(self, name="", params=None, ret_type=None, body=None, lineno=0, **kwargs):
+    """
+    attribute is the GCC function attribute (const or pure) found by genericEffects, if any,
+    memoize is set when genericEffects decided to cache the results of the function
+    """
+    def __init__(self, name="", params=None, ret_type=None, body=None, lineno=0, attribute=None, memoize=False, **kwargs):
         self.name = name
         self.params = params
         self.ret_type = ret_type
         self.body = body
         self.lineno = lineno
+        self.attribute = attribute
+        self.memoize = memoize
     
     def children(self):
         nodelist = [
@@ -40,8 +45,31 @@ class FunctionDeclaration(GenericNode):
         return tuple(nodelist)
     attr_names = ('name', )
     
-    def to_c_node(self) -> cAST.FunctionDeclaration:
-        return default_conversion(self, cAST.FunctionDeclaration)
+    def to_c_node(self, ctx) -> cAST.FunctionDeclaration:
+        # temporaries are local to the function, numbering them from zero keeps the
+        # emitted function independent of the functions lowered before it
+        outer = ctx.temp_counters, ctx.function_name
+        ctx.temp_counters, ctx.function_name = dict(), self.name
+        function = default_conversion(self, cAST.FunctionDeclaration, ctx)
+        function.profile = ctx.options.instrument
+        ctx.temp_counters, ctx.function_name = outer
+        return function
+
+class EmittedFunction(GenericNode):
+    """
+    A function that was already lowered and emitted to C, see pythonAST.emit_function
+    """
+    def __init__(self, code, lineno, declaration=""):
+        self.code = code
+        self.lineno = lineno
+        self.declaration = declaration
+
+    def children(self):
+        return ()
+    attr_names = ()
+
+    def to_c_node(self, ctx) -> cAST.Emitted:
+        return cAST.Emitted(self.code, self.lineno, self.declaration)
 
 class Function(GenericNode):
     def __init__(self, name, params, ret_type, body, lineno):
@@ -60,8 +88,8 @@ class Function(GenericNode):
         return tuple(nodelist)
     attr_names = ('name', )
 
-    def to_c_node(self) -> cAST.FunctionDeclaration:
-        return default_conversion(self, cAST.FunctionDeclaration)
+    def to_c_node(self, ctx) -> cAST.FunctionDeclaration:
+        return default_conversion(self, cAST.FunctionDeclaration, ctx)
 
 class FunctionCall(GenericNode):
     def __init__(self, name, params, lineno):
@@ -76,8 +104,8 @@ class FunctionCall(GenericNode):
         return tuple(nodelist)
     attr_names = ('name', )
 
-    def to_c_node(self) -> cAST.FunctionCall:
-        return default_conversion(self, cAST.FunctionCall)
+    def to_c_node(self, ctx) -> cAST.FunctionCall:
+        return default_conversion(self, cAST.FunctionCall, ctx)
 
 class ParameterList(GenericNode):
     def __init__(self, params, lineno):
@@ -91,21 +119,22 @@ class ParameterList(GenericNode):
         return tuple(nodelist)
     attr_names = ()
 
-    def to_c_node(self) -> cAST.ParameterList:
-        return default_conversion(self, cAST.ParameterList)
+    def to_c_node(self, ctx) -> cAST.ParameterList:
+        return default_conversion(self, cAST.ParameterList, ctx)
 
 class Parameter(GenericNode):
-    def __init__(self, name, param_type, lineno):
+    def __init__(self, name, param_type, lineno, restrict=False):
         self.name = name
         self.param_type = param_type
         self.lineno = lineno
+        self.restrict = restrict
     
     def children(self):
         return (('type', self.param_type),)
     attr_names = ('name',)
 
-    def to_c_node(self) -> cAST.Parameter:
-        return default_conversion(self, cAST.Parameter)
+    def to_c_node(self, ctx) -> cAST.Parameter:
+        return default_conversion(self, cAST.Parameter, ctx)
 
 class VariableDeclarations(GenericNode):
     def __init__(self, variables=[], lineno=0):
@@ -116,8 +145,8 @@ class VariableDeclarations(GenericNode):
         return tuple(("var[%d]" % i, var) for i, var in enumerate(self.variables))
     attr_names = ()
 
-    def to_c_node(self) -> cAST.VariableDeclarations:
-        return default_conversion(self, cAST.VariableDeclarations)
+    def to_c_node(self, ctx) -> cAST.VariableDeclarations:
+        return default_conversion(self, cAST.VariableDeclarations, ctx)
 
 class VariableDeclaration(GenericNode):
     def __init__(self, name, var_type, lineno=0):
@@ -130,8 +159,8 @@ class VariableDeclaration(GenericNode):
     
     attr_names = ("name",)
     
-    def to_c_node(self) -> cAST.VariableDeclaration:
-        return default_conversion(self, cAST.VariableDeclaration)
+    def to_c_node(self, ctx) -> cAST.VariableDeclaration:
+        return default_conversion(self, cAST.VariableDeclaration, ctx)
 
 class IfStm(GenericNode):
     def __init__(self, cond, body, else_branch, lineno):
@@ -150,11 +179,18 @@ class IfStm(GenericNode):
         return tuple(nodelist)
     attr_names = ()
 
-    def to_c_node(self) -> cAST.IfStm:
-        return default_conversion(self, cAST.IfStm)
+    def to_c_node(self, ctx) -> cAST.IfStm:
+        return default_conversion(self, cAST.IfStm, ctx)
 
 class ElifBlock(IfStm):
-    pass
+    """
+    Lowered to an else block holding the if statement, so that it only runs
+    when the previous conditions failed and the lists and strings of its
+    condition are only built then
+    """
+    def to_c_node(self, ctx) -> cAST.ElseBlock:
+        stm = IfStm(self.cond, self.body, self.else_branch, self.lineno)
+        return cAST.ElseBlock(StmList([stm], self.lineno).to_c_node(ctx), self.lineno)
 
 class ElseBlock(GenericNode):
     def __init__(self, body, lineno):
@@ -165,14 +201,19 @@ class ElseBlock(GenericNode):
         return (('body', self.body),)
     attr_names = ()
 
-    def to_c_node(self) -> cAST.ElseBlock:
-        return default_conversion(self, cAST.ElseBlock)
+    def to_c_node(self, ctx) -> cAST.ElseBlock:
+        return default_conversion(self, cAST.ElseBlock, ctx)
 
 class WhileStm(GenericNode):
-    def __init__(self, cond, body, lineno):
+    """
+    parallel describes how the loop runs on several threads, see
+    genericParallel.ParallelLoop
+    """
+    def __init__(self, cond, body, lineno, parallel=None):
         self.cond = cond
         self.body = body
         self.lineno = lineno
+        self.parallel = parallel
 
     def children(self):
         nodelist = []
@@ -183,8 +224,17 @@ class WhileStm(GenericNode):
         return tuple(nodelist)
     attr_names = ()
 
-    def to_c_node(self) -> cAST.WhileStm:
-        return default_conversion(self, cAST.WhileStm)
+    def to_c_node(self, ctx) -> cAST.WhileStm:
+        if self.parallel is not None and not ctx.options.instrument:
+            # the last statement moves the counter, which the for loop does
+            loop = self.parallel
+            body = StmList(self.body.stmt_lst[:-1], self.body.lineno)
+            return cAST.ParallelFor(loop.counter, loop.op, loop.bound.to_c_node(ctx), loop.step, body.to_c_node(ctx),
+                                    loop.reductions, loop.privates, ctx.options.threads, self.lineno)
+        loop = cAST.WhileStm(self.cond.to_c_node(ctx), self.body.to_c_node(ctx), self.lineno)
+        if ctx.options.instrument:
+            loop.profile = ctx.function_name
+        return loop
 
 class RetStm(GenericNode):
     def __init__(self, expr, lineno):
@@ -195,8 +245,8 @@ class RetStm(GenericNode):
         return (('expr', self.expr),)
     attr_names = ()
 
-    def to_c_node(self) -> cAST.RetStm:
-        return default_conversion(self, cAST.RetStm)
+    def to_c_node(self, ctx) -> cAST.RetStm:
+        return default_conversion(self, cAST.RetStm, ctx)
 
 class Constant(GenericNode):
     def __init__(self, const_type, value, lineno):
@@ -207,9 +257,9 @@ class Constant(GenericNode):
     def children(self):
         nodelist = []
         return tuple(nodelist)
-    attr_names = ('type', 'value', )
+    attr_names = ('const_type', 'value', )
 
-    def to_c_node(self) -> cAST.Constant:
+    def to_c_node(self, ctx) -> cAST.Constant:
         const_type : Type = self.const_type
         value = self.value
         if const_type.name == 'bool':
@@ -218,14 +268,14 @@ class Constant(GenericNode):
             else:
                 value = "0"
         elif const_type.name == "id":
-            return cAST.Constant(const_type.to_c_node(), value, self.lineno)
+            return cAST.Constant(const_type.to_c_node(ctx), value, self.lineno)
         elif const_type.name == "str":
-            ref = "str_ref_"+secrets.token_hex(16)
+            ref = ctx.new_temp_name("s")
             s = cAST.Constant(cAST.Type("id", 0), ref, 0)
-            str_declarations.append((ref, value))
+            ctx.str_declarations.append((ref, value))
             return s
 
-        return cAST.Cast(const_type.to_c_node(), cAST.Constant(const_type.to_c_node(), value, self.lineno), self.lineno)
+        return cAST.Cast(const_type.to_c_node(ctx), cAST.Constant(const_type.to_c_node(ctx), value, self.lineno), self.lineno)
 
 class BinaryOperation(GenericNode):
     def __init__(self, op, left, right, lineno, **kwargs):
@@ -243,31 +293,31 @@ class BinaryOperation(GenericNode):
         return tuple(nodelist)
     attr_names = ('op', )
 
-    def to_c_node(self) -> cAST.BinaryOperation:
+    def to_c_node(self, ctx) -> cAST.BinaryOperation:
         op = self.op
         if op == "and":
             op = "&&"
             return cAST.Cast(cAST.Type("short", self.lineno),
-                        cAST.BinaryOperation(op, self.left.to_c_node(), self.right.to_c_node(), self.lineno),
+                        cAST.BinaryOperation(op, self.left.to_c_node(ctx), self.right.to_c_node(ctx), self.lineno),
                         self.lineno)
         if op == "or":
             op = "||"
             return cAST.Cast(cAST.Type("short", self.lineno),
-                        cAST.BinaryOperation(op, self.left.to_c_node(), self.right.to_c_node(), self.lineno),
+                        cAST.BinaryOperation(op, self.left.to_c_node(ctx), self.right.to_c_node(ctx), self.lineno),
                         self.lineno)
         if op == "concat_lists":
-            param1 = self.left.to_c_node()
-            param2 = self.right.to_c_node()
+            param1 = self.left.to_c_node(ctx)
+            param2 = self.right.to_c_node(ctx)
             params = cAST.ExpressionList([param1, param2], 0)
             call = cAST.FunctionCall("concat_lists", params, 0)
             return call
         if op == "concat_strings":
-            param1 = self.left.to_c_node()
-            param2 = self.right.to_c_node()
+            param1 = self.left.to_c_node(ctx)
+            param2 = self.right.to_c_node(ctx)
             params = cAST.ExpressionList([param1, param2], 0)
             call = cAST.FunctionCall("concat_strings", params, 0)
             return call
-        return cAST.BinaryOperation(op, self.left.to_c_node(), self.right.to_c_node(), self.lineno)
+        return cAST.BinaryOperation(op, self.left.to_c_node(ctx), self.right.to_c_node(ctx), self.lineno)
 
 class UnaryOperation(GenericNode):
     def __init__(self, op, expr, lineno):
@@ -282,13 +332,13 @@ class UnaryOperation(GenericNode):
         return tuple(nodelist)
     attr_names = ('op', )
 
-    def to_c_node(self) -> cAST.UnaryOperation:
+    def to_c_node(self, ctx) -> cAST.UnaryOperation:
         op = self.op
         if op == "not":
             op = "!"
             return cAST.Cast(cAST.Type("short", self.lineno),
-                cAST.UnaryOperation(op, self.expr.to_c_node(), self.lineno), self.lineno)
-        return cAST.UnaryOperation(op, self.expr.to_c_node(), self.lineno)
+                cAST.UnaryOperation(op, self.expr.to_c_node(ctx), self.lineno), self.lineno)
+        return cAST.UnaryOperation(op, self.expr.to_c_node(ctx), self.lineno)
 
 class ExpressionList(GenericNode):
     def __init__(self, exprs, lineno):
@@ -302,8 +352,8 @@ class ExpressionList(GenericNode):
         return  nodelist
     attr_names = ()
 
-    def to_c_node(self) -> cAST.ExpressionList:
-        return default_conversion(self, cAST.ExpressionList)
+    def to_c_node(self, ctx) -> cAST.ExpressionList:
+        return default_conversion(self, cAST.ExpressionList, ctx)
 
 class List(GenericNode):
     def __init__(self, expr_list, lineno):
@@ -315,17 +365,24 @@ class List(GenericNode):
         return nodelist
     attr_names = ()
 
-    def to_c_node(self) -> cAST.List:
-        l = default_conversion(self, cAST.List)
-        list_declarations.append(l)
+    def to_c_node(self, ctx) -> cAST.List:
+        # convert the elements first so nested lists are declared before this one
+        expr_list = self.expr_list.to_c_node(ctx)
+        l = cAST.List(expr_list, ctx.new_temp_name("l"), self.lineno)
+        ctx.list_declarations.append(l)
         return l
 
 class Index(GenericNode):
-    def __init__(self, etype, expr, expr_pos, lineno):
+    """
+    checked is cleared when the index is proven in bounds, see
+    genericOptimizer.BoundsCheckEliminator
+    """
+    def __init__(self, etype, expr, expr_pos, lineno, checked=True):
         self.etype = etype
         self.expr = expr
         self.expr_pos = expr_pos
         self.lineno = lineno
+        self.checked = checked
     
     def children(self):
         nodelist = [
@@ -336,16 +393,17 @@ class Index(GenericNode):
         return nodelist
     attr_names = ()
 
-    def to_c_node(self) -> cAST.Index:
-        params = cAST.ParameterList([self.expr.to_c_node(), self.expr_pos.to_c_node()], 0)
+    def to_c_node(self, ctx) -> cAST.Index:
+        params = cAST.ParameterList([self.expr.to_c_node(ctx), self.expr_pos.to_c_node(ctx)], 0)
+        suffix = "" if self.checked else "Unchecked"
         if (self.etype.name == "int"):
-            return cAST.FunctionCall("getInt", params, 0)
+            return cAST.FunctionCall("getInt" + suffix, params, 0)
         if (self.etype.name == "list"):
-            return  cAST.FunctionCall("getList", params, 0)
+            return  cAST.FunctionCall("getList" + suffix, params, 0)
         if (self.etype.name == "bool"):
-            return cAST.FunctionCall("getShort", params, 0)
+            return cAST.FunctionCall("getShort" + suffix, params, 0)
         if (self.etype.name == "str"):
-            return cAST.FunctionCall("getString", params, 0)
+            return cAST.FunctionCall("getString" + suffix, params, 0)
         raise NotImplementedError()
 
 class Slice(GenericNode):
@@ -366,32 +424,53 @@ class Slice(GenericNode):
             nodelist.append(('end', self.end))
         return nodelist
 
-    def to_c_node(self) -> cAST.Index:
-        params = cAST.ParameterList([self.expr.to_c_node(),
-                                     self.start.to_c_node(),
-                                     self.end.to_c_node(),
-                                     self.step.to_c_node()], 0)
+    def to_c_node(self, ctx) -> cAST.Index:
+        params = cAST.ParameterList([self.expr.to_c_node(ctx),
+                                     self.start.to_c_node(ctx),
+                                     self.end.to_c_node(ctx),
+                                     self.step.to_c_node(ctx)], 0)
         return cAST.FunctionCall("slice", params, 0)
 
 class Type(GenericNode): 
-    def __init__(self, name, lineno):
-        self.name = name
-        self.lineno = lineno
+    """
+    Types are hash-consed: Type(name) always returns the one shared, immutable
+    instance for that name, so two types are equal exactly when they are identical.
+    """
+    _interned = dict()
+
+    def __new__(cls, name, lineno=0):
+        t = cls._interned.get(name)
+        if t is None:
+            t = super().__new__(cls)
+            object.__setattr__(t, 'name', name)
+            object.__setattr__(t, 'lineno', 0)
+            # setdefault keeps a single instance if two threads race here
+            t = cls._interned.setdefault(name, t)
+        return t
+
+    def __init__(self, name, lineno=0):
+        pass
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("Type instances are shared and cannot be modified")
+
+    def __reduce__(self):
+        return (self.__class__, (self.name,))
     
     def children(self):
         nodelist = []
         return tuple(nodelist)
     attr_names = ('name', )
 
-    def to_c_node(self) -> cAST.Type:
-        t = self
+    def to_c_node(self, ctx) -> cAST.Type:
+        name = self.name
         if self.name == "bool":
-            t = Type("short", lineno=self.lineno)
+            name = "short"
         if self.name == "list":
-            t = Type("struct List *", 0) 
+            name = "struct List *"
         if self.name == "str":
-            t = Type("String *", 0) 
-        return default_conversion(t, cAST.Type)
+            name = "String *"
+        return cAST.Type(name, self.lineno)
 
 class StmList(GenericNode):
     def __init__(self, stmt_lst, lineno):
@@ -405,24 +484,29 @@ class StmList(GenericNode):
         return nodelist
     attr_names = ()
 
-    def transform(self, child):
-        list_declarations.clear()
-        str_declarations.clear()
-        node = child.to_c_node()
-        return list_declarations, str_declarations, node
+    def transform(self, child, ctx: CompilationContext):
+        # nested statement lists collect their own declarations, so keep ours aside
+        outer = ctx.list_declarations, ctx.str_declarations
+        ctx.list_declarations, ctx.str_declarations = [], []
+        node = child.to_c_node(ctx)
+        lists, strings = ctx.list_declarations, ctx.str_declarations
+        ctx.list_declarations, ctx.str_declarations = outer
+        return lists, strings, node
     
-    def to_c_node(self) -> cAST.StmList:
+    def to_c_node(self, ctx) -> cAST.StmList:
         statements = []
         for stm in self.stmt_lst:
-            lists, strings, node = self.transform(stm)
+            lists, strings, node = self.transform(stm, ctx)
             for ref, value in strings:
                 statements.append(cAST.VariableDeclaration(ref, cAST.Type("String *", 0), lineno=self.lineno))
                 statements.append(cAST.AssignStm(ref, 
                                   cAST.FunctionCall("new_string", cAST.ParameterList([], self.lineno), self.lineno),
                                   self.lineno))
+                # C nodes are never modified once built, so one reference serves every insert
+                ref_node = cAST.Constant(cAST.Type("id", 0), ref, 0)
                 for v in value:
                     f = cAST.FunctionCall("stringInsert",
-                                          cAST.ParameterList([cAST.Constant(cAST.Type("id", 0), ref, 0), cAST.Constant(cAST.Type("char", 0), v, 0)], self.lineno),
+                                          cAST.ParameterList([ref_node, cAST.Constant(cAST.Type("char", 0), v, 0)], self.lineno),
                                           0)
                     statements.append(f)
             for l in lists:
@@ -445,8 +529,8 @@ class AssignStm(GenericNode):
         return (('expr', self.expr),)
     attr_names= ()
 
-    def to_c_node(self) -> cAST.AssignStm:
-        return default_conversion(self, cAST.AssignStm)
+    def to_c_node(self, ctx) -> cAST.AssignStm:
+        return default_conversion(self, cAST.AssignStm, ctx)
 
 class Program(GenericNode):
     """
@@ -476,31 +560,50 @@ class Program(GenericNode):
                 ('functions', self.functions))
     attr_names = ()
 
-    def to_c_node(self) -> cAST.Program:
-        c_root = cAST.Program(lineno=self.lineno, 
-                          global_vars=self.global_vars.to_c_node(),
-                          functions=self.functions.to_c_node())
+    def add_statement(self, statement: GenericNode):
+        """
+        Add a top level statement, sorting it into the globals, functions or main code
+        """
+        if isinstance(statement, VariableDeclaration):
+            self.add_variable(statement)
+        elif isinstance(statement, FunctionDeclaration):
+            self.add_function(statement)
+        else:
+            self.main_stms.stmt_lst.append(statement)
+
+    @staticmethod
+    def c_main(body: cAST.StmList, profile=False) -> cAST.FunctionDeclaration:
         main_params = cAST.ParameterList([
                                      cAST.Parameter("argc", cAST.Type("int", 0), 0), 
                                      cAST.Parameter("argv", cAST.Type("char**", 0), 0)
                                     ], 0)
-        main = cAST.FunctionDeclaration(name="main", 
+        return cAST.FunctionDeclaration(name="main", 
                                    params=main_params, 
                                    ret_type=cAST.Type("void", 0), 
-                                   body=self.main_stms.to_c_node())
-        c_root.add_function(main)
+                                   body=body,
+                                   lineno=1,
+                                   profile=profile)
+
+    def to_c_node(self, ctx) -> cAST.Program:
+        c_root = cAST.Program(lineno=self.lineno, 
+                          global_vars=self.global_vars.to_c_node(ctx),
+                          functions=self.functions.to_c_node(ctx),
+                          profile=ctx.options.instrument,
+                          memoize=ctx.options.memoize,
+                          unity=ctx.options.unity)
+        c_root.add_function(self.c_main(self.main_stms.to_c_node(ctx), ctx.options.instrument))
         return c_root
 
-def default_conversion(node: GenericNode, cNodeClass) -> cAST.CNode:
-    kwargs = node.__dict__
+def default_conversion(node: GenericNode, cNodeClass, ctx: CompilationContext) -> cAST.CNode:
+    kwargs = dict(node.__dict__)
     for k,v in kwargs.items():
         if isinstance(v, GenericNode):
-            kwargs[k] = v.to_c_node()
+            kwargs[k] = v.to_c_node(ctx)
         elif isinstance(v, list):
             els = []
             for el in v:
                 if isinstance(el, GenericNode):
-                    els.append(el.to_c_node())
+                    els.append(el.to_c_node(ctx))
                 else:
                     els.append(el)
             kwargs[k] = els
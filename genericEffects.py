@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Side effect analysis of the functions of a genericAST program, run with
+--optimize after the passes of genericOptimizer. Every function is
+classified as
+
+    const: computes its result from its int and bool arguments only
+    pure: may also read globals, lists and strings, but changes nothing
+          its caller can observe and always returns
+    impure: anything else, e.g. prints, assigns a global, may fail an
+            index check, divide by zero or loop forever
+
+Functions returning int or bool get the matching GCC attribute, so the C
+compiler can share repeated calls and hoist them out of loops, and list
+and string parameters are declared restrict when they point to the only
+list or string the function can reach.
+
+Recursive functions may not return, so they are impure for their callers
+and get no attribute. With --memoize, those that would otherwise be const
+and only take int and bool parameters cache their results instead.
+"""
+
+from collections import Counter
+import genericAST
+from genericOptimizer import APPEND_FUNCTIONS, APPEND_FUNCTION_NAMES, counted_loop, declared_types
+
+CONST = 0
+PURE = 1
+IMPURE = 2
+ATTRIBUTES = {CONST: "const", PURE: "pure"}
+HEAP_TYPES = ("list", "str")
+# operators trapping on a zero divisor
+DIVISION_OPS = ('/', '//', '%')
+# effects of the runtime functions of the builtins, see pythonSymbolTable.BUILTINS:
+# they read or allocate lists and strings, min and max fail on empty lists
+# and list_range on a zero step
+BUILTIN_EFFECTS = {"list_length": PURE, "string_length": PURE, "list_range": IMPURE, "list_sum": PURE,
+                   "list_min": IMPURE, "list_max": IMPURE, "int_min": CONST, "int_max": CONST,
+                   "int_to_string": PURE}
+
+
+def nonzero_constant(node):
+    return isinstance(node, genericAST.Constant) and node.const_type.name == "int" and int(node.value) != 0
+
+
+def safe_divisor(node):
+    """
+    Whether dividing by node can never trap: a nonzero constant, other than
+    -1 which overflows when dividing the smallest int
+    """
+    return nonzero_constant(node) and int(node.value) != -1
+
+
+class FunctionEffects(object):
+    """
+    Summary of a function: its effect and whether it reads or assigns a
+    list or string global, itself or through the functions it calls
+    """
+    def __init__(self, effect, heap_globals):
+        self.effect = effect
+        self.heap_globals = heap_globals
+
+
+class EffectsAnalysis(object):
+    """
+    Summaries of the functions analysed so far, by name. A function can
+    only call the functions declared before it, so analysing them in
+    declaration order always knows the callees.
+
+    Reading a string may flatten its rope in place (see string_flatten),
+    which changes its representation but not its value, and appending in
+    place only grows fresh locals (see InPlaceAppendLowering), so neither
+    makes a function impure. Unchecked indices may still fail the element
+    type checks of debug builds, which is treated like --release does.
+    """
+
+    def __init__(self, global_types, report=None, memoize=False):
+        self.global_types = global_types
+        self.report = report if report is not None else Counter()
+        self.memoize = memoize
+        self.summaries = dict()
+        self.local_types = dict()
+        self.function_name = None
+        self.effect = CONST
+        self.heap_globals = False
+        self.recursive = False
+
+    def annotate(self, function: genericAST.FunctionDeclaration):
+        """
+        Analyse function, record its summary and set its attribute and the
+        restrict flags of its parameters
+        """
+        params = (function.params.params if function.params else None) or ()
+        self.local_types = dict({p.name: p.param_type.name for p in params}, **declared_types(function.body))
+        self.function_name = function.name
+        self.effect = CONST
+        self.heap_globals = False
+        self.recursive = False
+        self.stm_list(function.body)
+        if (self.memoize and self.recursive and self.effect == CONST and params
+                and function.ret_type.name in ("int", "bool")
+                and all(p.param_type.name in ("int", "bool") for p in params)):
+            function.memoize = True
+            self.report[f"memoized {function.name}"] += 1
+        summary = FunctionEffects(IMPURE if self.recursive else self.effect, self.heap_globals)
+        self.summaries[function.name] = summary
+        if summary.effect != IMPURE and function.ret_type.name in ("int", "bool"):
+            function.attribute = ATTRIBUTES[summary.effect]
+            self.report[f"{function.attribute} functions"] += 1
+        # with a single list or string parameter and no such global, every
+        # list or string the function touches is reached from that parameter
+        # or allocated by the function itself
+        heap_params = [p for p in params if p.param_type.name in HEAP_TYPES]
+        if len(heap_params) == 1 and not summary.heap_globals:
+            heap_params[0].restrict = True
+            self.report["restrict parameters"] += 1
+        return summary
+
+    def raise_to(self, effect):
+        self.effect = max(self.effect, effect)
+
+    def unknown(self):
+        self.raise_to(IMPURE)
+        self.heap_globals = True
+
+    def stm_list(self, stm_list):
+        for stm in (stm_list.stmt_lst if stm_list else None) or ():
+            self.statement(stm)
+
+    def statement(self, stm):
+        if isinstance(stm, genericAST.AssignStm):
+            if stm.name not in self.local_types:
+                self.raise_to(IMPURE)
+                self.heap_globals |= self.global_types.get(stm.name) in HEAP_TYPES
+            self.expression(stm.expr)
+        elif isinstance(stm, genericAST.VariableDeclaration):
+            pass
+        elif isinstance(stm, genericAST.IfStm):
+            self.expression(stm.cond)
+            self.stm_list(stm.body)
+            if stm.else_branch is not None:
+                self.statement(stm.else_branch)
+        elif isinstance(stm, genericAST.ElseBlock):
+            self.stm_list(stm.body)
+        elif isinstance(stm, genericAST.WhileStm):
+            if counted_loop(stm, self.local_types) is None:
+                self.raise_to(IMPURE)
+            self.expression(stm.cond)
+            self.stm_list(stm.body)
+        elif isinstance(stm, genericAST.RetStm):
+            if stm.expr is not None:
+                self.expression(stm.expr)
+        elif isinstance(stm, genericAST.FunctionCall):
+            self.expression(stm)
+        else:
+            # nested functions
+            self.unknown()
+
+    def expression(self, node):
+        if isinstance(node, genericAST.Constant):
+            if node.const_type.name == "str":
+                self.raise_to(PURE)
+            elif node.const_type.name == "id":
+                var_type = self.local_types.get(node.value)
+                if var_type is None:
+                    self.raise_to(PURE)
+                    var_type = self.global_types.get(node.value)
+                    self.heap_globals |= var_type in HEAP_TYPES
+                if var_type in HEAP_TYPES:
+                    self.raise_to(PURE)
+            return
+        if isinstance(node, genericAST.FunctionCall):
+            self.call(node)
+        elif isinstance(node, genericAST.Index):
+            self.raise_to(IMPURE if node.checked else PURE)
+        elif isinstance(node, genericAST.Slice):
+            # a zero step never ends
+            self.raise_to(PURE if nonzero_constant(node.step) else IMPURE)
+        elif isinstance(node, genericAST.List):
+            self.raise_to(PURE)
+        elif isinstance(node, genericAST.BinaryOperation) and node.op in APPEND_FUNCTIONS:
+            self.raise_to(PURE)
+        elif isinstance(node, genericAST.BinaryOperation) and node.op in DIVISION_OPS:
+            # gcc may drop or move a const or pure call, and the trap with it
+            if not safe_divisor(node.right):
+                self.raise_to(IMPURE)
+        for (_, child) in node.children() or ():
+            if isinstance(child, genericAST.GenericNode):
+                self.expression(child)
+
+    def call(self, node: genericAST.FunctionCall):
+        if node.name == "print":
+            self.raise_to(IMPURE)
+        elif node.name in APPEND_FUNCTION_NAMES:
+            self.raise_to(PURE)
+        elif node.name == "list_range" and nonzero_constant(node.params.exprs[2]):
+            self.raise_to(PURE)
+        elif node.name in BUILTIN_EFFECTS:
+            self.raise_to(BUILTIN_EFFECTS[node.name])
+        elif node.name == self.function_name:
+            # adds no effect of its own, but the function may not return
+            self.recursive = True
+        elif node.name in self.summaries:
+            summary = self.summaries[node.name]
+            self.raise_to(summary.effect)
+            self.heap_globals |= summary.heap_globals
+        else:
+            self.unknown()
+
+
+def annotate_program(program: genericAST.Program, report=None, memoize=False):
+    """
+    Analyse every function of program, see EffectsAnalysis.annotate, and
+    return the analysis. Functions already emitted by worker processes are
+    left alone, calls to them are impure.
+    """
+    types = {v.name: v.var_type.name for v in program.global_vars.variables}
+    analysis = EffectsAnalysis(types, report, memoize)
+    for function in program.functions.functions:
+        if isinstance(function, genericAST.FunctionDeclaration):
+            analysis.annotate(function)
+    return analysis
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Compile time evaluation of calls with constant arguments, run with
+--optimize before the passes of genericOptimizer. A call such as
+is_even(10) or make_screams() is run by a small interpreter of the
+genericAST and replaced by the int, bool, str or list literal it returns.
+
+The interpreter follows the generated C rather than Python (32 bit ints,
+division and remainder truncating towards zero, slices as in slicing.c),
+and gives up on anything it cannot reproduce exactly: printing, reading or
+assigning a global, calling a function it does not have the body of,
+overflow, division by zero, a failed index, comparing lists or strings
+(which compares their addresses in C) and running out of its step budget.
+The call is then left alone.
+"""
+
+from collections import Counter
+import genericAST
+from genericOptimizer import APPEND_FUNCTION_NAMES, declared_types
+
+# statements and expressions evaluated for a single call before giving up
+STEP_BUDGET = 100000
+# largest literal a call is replaced with, counting list elements and characters
+MAX_LITERAL_SIZE = 256
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+VALUE_TYPES = {"int": int, "bool": bool, "str": str, "list": list}
+# runtime functions the builtins are lowered to, see pythonSymbolTable.BUILTINS
+BUILTIN_FUNCTIONS = {"list_length", "string_length", "list_range", "list_sum", "list_min", "list_max",
+                     "int_min", "int_max", "int_to_string"}
+
+
+class EvaluationError(Exception): pass
+
+
+class Frame(object):
+    """
+    Variables of a function being evaluated, only its parameters and
+    locals (types maps them to their type names) can be read and assigned
+    """
+    def __init__(self, types, values):
+        self.types = types
+        self.values = values
+
+
+class Evaluator(object):
+    """
+    Interpreter of the functions given by name in functions. Every call
+    evaluated through call gets STEP_BUDGET steps.
+    """
+
+    def __init__(self, functions):
+        self.functions = functions
+        self.steps = 0
+
+    def call(self, name, args):
+        self.steps = STEP_BUDGET
+        return self.call_function(name, args)
+
+    def constant(self, node):
+        """
+        Value of node, which may not read any variable
+        """
+        self.steps = STEP_BUDGET
+        return self.evaluate(node, Frame(dict(), dict()))
+
+    def step(self):
+        self.steps -= 1
+        if self.steps < 0:
+            raise EvaluationError("step budget exhausted")
+
+    def call_function(self, name, args):
+        if name in BUILTIN_FUNCTIONS:
+            return self.builtin(name, args)
+        function = self.functions.get(name)
+        if function is None:
+            raise EvaluationError(f"no body for {name}")
+        params = (function.params.params if function.params else None) or ()
+        types = dict({p.name: p.param_type.name for p in params}, **declared_types(function.body))
+        frame = Frame(types, {p.name: self.convert(a, p.param_type.name) for p, a in zip(params, args)})
+        result = self.run(function.body, frame)
+        if result is None:
+            raise EvaluationError(f"{name} does not return")
+        return self.convert(result[0], function.ret_type.name)
+
+    def builtin(self, name, args):
+        """
+        Result of the runtime function name of c_libs/python_builtins.c
+        """
+        if name in ("list_length", "string_length"):
+            return len(args[0])
+        if name == "list_range":
+            start, stop, step = args
+            if step == 0:
+                raise EvaluationError("range step is zero")
+            values = range(start, stop, step)
+            for _ in values:
+                self.step()
+            return list(values)
+        if name == "int_to_string":
+            return str(args[0])
+        if name in ("int_min", "int_max"):
+            return min(args) if name == "int_min" else max(args)
+        values = args[0]
+        if not all(type(v) in (int, bool) for v in values):
+            raise EvaluationError(f"{name} of a list holding other values than ints")
+        for _ in values:
+            self.step()
+        if name == "list_sum":
+            return self.check_int(sum(int(v) for v in values))
+        if not values:
+            raise EvaluationError(f"{name} of an empty list")
+        return int(min(values) if name == "list_min" else max(values))
+
+    def convert(self, value, type_name):
+        """
+        value stored into a C variable of type type_name. Comparisons are
+        ints in C, they only become bools (shorts) when stored.
+        """
+        if type_name == "bool" and type(value) is int and value in (0, 1):
+            return bool(value)
+        if type(value) is not VALUE_TYPES.get(type_name):
+            raise EvaluationError(f"{type(value).__name__} stored as {type_name}")
+        return value
+
+    def run(self, stm_list, frame):
+        """
+        Execute stm_list, returning (value,) once a return is reached and None otherwise
+        """
+        for stm in (stm_list.stmt_lst if stm_list else None) or ():
+            result = self.execute(stm, frame)
+            if result is not None:
+                return result
+        return None
+
+    def execute(self, stm, frame):
+        self.step()
+        if isinstance(stm, genericAST.VariableDeclaration):
+            # locals declared again in a loop hold no value until assigned
+            frame.values.pop(stm.name, None)
+        elif isinstance(stm, genericAST.AssignStm):
+            if stm.name not in frame.types:
+                raise EvaluationError(f"assigns global {stm.name}")
+            frame.values[stm.name] = self.convert(self.evaluate(stm.expr, frame), frame.types[stm.name])
+        elif isinstance(stm, genericAST.RetStm):
+            return (self.evaluate(stm.expr, frame),)
+        elif isinstance(stm, genericAST.IfStm):
+            if self.truth(self.evaluate(stm.cond, frame)):
+                return self.run(stm.body, frame)
+            if stm.else_branch is not None:
+                return self.execute(stm.else_branch, frame)
+        elif isinstance(stm, genericAST.ElseBlock):
+            return self.run(stm.body, frame)
+        elif isinstance(stm, genericAST.WhileStm):
+            while self.truth(self.evaluate(stm.cond, frame)):
+                result = self.run(stm.body, frame)
+                if result is not None:
+                    return result
+        elif isinstance(stm, genericAST.FunctionCall) and stm.name in APPEND_FUNCTION_NAMES:
+            # the target is always a fresh local, see InPlaceAppendLowering
+            target, added = stm.params.exprs
+            frame.values[target.value] = self.evaluate(target, frame) + self.evaluate(added, frame)
+        elif isinstance(stm, genericAST.FunctionCall):
+            self.evaluate(stm, frame)
+        else:
+            raise EvaluationError(f"cannot execute {type(stm).__name__}")
+        return None
+
+    def truth(self, value):
+        if type(value) not in (int, bool):
+            raise EvaluationError("condition is not an int or bool")
+        return bool(value)
+
+    def evaluate(self, node, frame):
+        self.step()
+        if isinstance(node, genericAST.Constant):
+            kind = node.const_type.name
+            if kind == "int":
+                return int(node.value)
+            if kind == "bool":
+                return node.value == "True"
+            if kind == "str":
+                return node.value
+            if node.value not in frame.values:
+                raise EvaluationError(f"{node.value} is a global or not assigned")
+            return frame.values[node.value]
+        if isinstance(node, genericAST.BinaryOperation):
+            return self.binary(node, frame)
+        if isinstance(node, genericAST.UnaryOperation):
+            value = self.evaluate(node.expr, frame)
+            if node.op == "not":
+                return not self.truth(value)
+            if node.op == "-" and type(value) is int:
+                return self.check_int(-value)
+            raise EvaluationError(f"cannot apply {node.op}")
+        if isinstance(node, genericAST.List):
+            return [self.evaluate(e, frame) for e in node.expr_list.exprs or ()]
+        if isinstance(node, genericAST.Index):
+            return self.index(node, frame)
+        if isinstance(node, genericAST.Slice):
+            return self.slice(node, frame)
+        if isinstance(node, genericAST.FunctionCall):
+            args = [self.evaluate(e, frame) for e in (node.params.exprs if node.params else None) or ()]
+            return self.call_function(node.name, args)
+        raise EvaluationError(f"cannot evaluate {type(node).__name__}")
+
+    def check_int(self, value):
+        if not INT_MIN <= value <= INT_MAX:
+            raise EvaluationError("int overflow")
+        return value
+
+    def binary(self, node, frame):
+        if node.op in ("and", "or"):
+            left = self.truth(self.evaluate(node.left, frame))
+            if left == (node.op == "or"):
+                return left
+            return self.truth(self.evaluate(node.right, frame))
+        left = self.evaluate(node.left, frame)
+        right = self.evaluate(node.right, frame)
+        if node.op in ("concat_lists", "concat_strings"):
+            return left + right
+        if type(left) not in (int, bool) or type(right) not in (int, bool):
+            raise EvaluationError(f"cannot apply {node.op} to lists or strings")
+        if node.op == "+":
+            return self.check_int(left + right)
+        if node.op == "-":
+            return self.check_int(left - right)
+        if node.op == "*":
+            return self.check_int(left * right)
+        if node.op in ("/", "%"):
+            if right == 0:
+                raise EvaluationError("division by zero")
+            quotient = abs(left) // abs(right) * (1 if (left < 0) == (right < 0) else -1)
+            return self.check_int(quotient if node.op == "/" else left - right * quotient)
+        if node.op == "<":
+            return int(left < right)
+        if node.op == "<=":
+            return int(left <= right)
+        if node.op == ">":
+            return int(left > right)
+        if node.op == ">=":
+            return int(left >= right)
+        if node.op == "==":
+            return int(left == right)
+        if node.op == "!=":
+            return int(left != right)
+        # // is copied into the C code as is
+        raise EvaluationError(f"cannot apply {node.op}")
+
+    def index(self, node, frame):
+        container = self.evaluate(node.expr, frame)
+        pos = self.evaluate(node.expr_pos, frame)
+        if type(container) not in (list, str) or type(pos) is not int:
+            raise EvaluationError("bad index")
+        if pos < 0:
+            pos += len(container)
+        if not 0 <= pos < len(container):
+            raise EvaluationError("index out of bounds")
+        value = container[pos]
+        # elements of another type fail the check of getInt and friends
+        if type(value) is not VALUE_TYPES.get(node.etype.name):
+            raise EvaluationError("element has another type")
+        return value
+
+    def slice(self, node, frame):
+        container = self.evaluate(node.expr, frame)
+        start = self.evaluate(node.start, frame)
+        end = self.evaluate(node.end, frame)
+        step = self.evaluate(node.step, frame)
+        if type(container) not in (list, str) or step == 0:
+            raise EvaluationError("bad slice")
+        # same bounds as sliceList and sliceString
+        start = max(start, 0)
+        if end < 0:
+            end = len(container) + end
+        end = min(end, len(container))
+        if step < 0:
+            positions = range(end - 1, start - 1, step)
+        else:
+            positions = range(start, end, step)
+        self.steps -= len(positions)
+        self.step()
+        if type(container) is str:
+            return "".join(container[i] for i in positions)
+        return [container[i] for i in positions]
+
+
+def literal_size(value):
+    if type(value) is list:
+        return 1 + sum(literal_size(v) for v in value)
+    if type(value) is str:
+        return 1 + len(value)
+    return 1
+
+
+def printable(value):
+    """
+    Whether value can be written as a literal, see cAST.Constant for the characters of strings
+    """
+    if type(value) is list:
+        return all(printable(v) for v in value)
+    if type(value) is str:
+        return all(" " <= c <= "~" and c not in "'\\" for c in value)
+    return True
+
+
+def literal(value, lineno):
+    """
+    genericAST literal evaluating to value
+    """
+    if type(value) is bool:
+        return genericAST.Constant(genericAST.Type("bool"), "True" if value else "False", lineno)
+    if type(value) is int:
+        return genericAST.Constant(genericAST.Type("int"), value, lineno)
+    if type(value) is str:
+        return genericAST.Constant(genericAST.Type("str"), value, lineno)
+    return genericAST.List(genericAST.ExpressionList([literal(v, lineno) for v in value], lineno), lineno)
+
+
+class ConstantCallFolder(object):
+    """
+    Replaces calls with constant arguments to the functions in functions
+    by the literal they evaluate to. Calls are memoized by their
+    arguments, the functions cannot depend on anything else.
+    """
+
+    def __init__(self, report=None):
+        self.report = report if report is not None else Counter()
+        self.functions = dict()
+        self.evaluator = Evaluator(self.functions)
+        self.results = dict()
+
+    def add_function(self, function: genericAST.FunctionDeclaration):
+        self.functions[function.name] = function
+
+    def fold_call(self, node: genericAST.FunctionCall):
+        """
+        Literal replacing node, or None if it cannot be evaluated
+        """
+        if node.name not in self.functions:
+            return None
+        try:
+            args = [self.evaluator.constant(e) for e in (node.params.exprs if node.params else None) or ()]
+        except EvaluationError:
+            return None
+        key = (node.name, repr(args))
+        if key not in self.results:
+            try:
+                value = self.evaluator.call(node.name, args)
+                self.results[key] = value if literal_size(value) <= MAX_LITERAL_SIZE and printable(value) else None
+            except (EvaluationError, RecursionError):
+                self.results[key] = None
+        value = self.results[key]
+        if value is None:
+            return None
+        self.report["calls evaluated"] += 1
+        return literal(value, node.lineno)
+
+    def fold(self, node):
+        """
+        Fold the calls in node and its children, returning the node taking its place
+        """
+        if isinstance(node, genericAST.FunctionCall):
+            folded = self.fold_call(node)
+            if folded is not None:
+                return folded
+        for name, value in vars(node).items():
+            if isinstance(value, genericAST.GenericNode):
+                setattr(node, name, self.fold(value))
+            elif isinstance(value, list):
+                setattr(node, name, [self.fold(v) if isinstance(v, genericAST.GenericNode) else v for v in value])
+        return node
+
+    def fold_statement(self, stm):
+        """
+        Fold the calls in stm. A call made as a statement stays, only its arguments are folded.
+        """
+        if isinstance(stm, genericAST.FunctionCall):
+            if stm.params is not None:
+                self.fold(stm.params)
+            return stm
+        return self.fold(stm)
+
+    def fold_stm_list(self, stm_list):
+        if stm_list and stm_list.stmt_lst:
+            stm_list.stmt_lst = [self.fold_statement(stm) for stm in stm_list.stmt_lst]
+
+
+def fold_program(program: genericAST.Program, report=None):
+    """
+    Fold the calls with constant arguments of every function and of the
+    main statements. Functions already emitted by worker processes are
+    not evaluated.
+    """
+    folder = ConstantCallFolder(report)
+    for function in program.functions.functions:
+        if isinstance(function, genericAST.FunctionDeclaration):
+            folder.fold_stm_list(function.body)
+            folder.add_function(function)
+    folder.fold_stm_list(program.main_stms)
+    return folder.report
@@ -0,0 +1,851 @@
+#!/usr/bin/env python3
+"""
+Optimization passes over the genericAST, run between python_ast_to_generic
+and the lowering to cAST when compiling with --optimize.
+"""
+
+from collections import Counter
+import genericAST
+from compilationContext import RESERVED_PREFIX
+
+ARITHMETIC_OPS = {'+', '-', '*', '/', '//', '%'}
+COMPARISON_OPS = {'<', '<=', '>', '>=', '==', '!='}
+SHORT_CIRCUIT_OPS = {'and', 'or'}
+# statements that do not end a basic block
+SIMPLE_STATEMENTS = (genericAST.AssignStm, genericAST.RetStm,
+                     genericAST.VariableDeclaration, genericAST.FunctionCall)
+# runtime functions growing their first argument in place, by concatenation op
+APPEND_FUNCTIONS = {'concat_lists': 'extend_list', 'concat_strings': 'string_append'}
+APPEND_FUNCTION_NAMES = set(APPEND_FUNCTIONS.values())
+# runtime functions of the len builtin, see pythonSymbolTable.BUILTINS
+LENGTH_FUNCTIONS = {'list_length', 'string_length'}
+
+
+def expression_key(node):
+    """
+    Structural key of a pure expression, equal for expressions that always
+    compute the same value from the same variables. Returns None for
+    expressions that call functions or allocate (list literals, slices,
+    concatenation), which are never shared.
+    """
+    if isinstance(node, genericAST.Constant):
+        return ('const', node.const_type.name, node.value)
+    if isinstance(node, genericAST.BinaryOperation):
+        if node.op not in ARITHMETIC_OPS | COMPARISON_OPS | SHORT_CIRCUIT_OPS:
+            return None
+        left = expression_key(node.left)
+        right = expression_key(node.right)
+        if left is None or right is None:
+            return None
+        return ('binary', node.op, left, right)
+    if isinstance(node, genericAST.UnaryOperation):
+        expr = expression_key(node.expr)
+        if expr is None:
+            return None
+        return ('unary', node.op, expr)
+    if isinstance(node, genericAST.Index):
+        expr = expression_key(node.expr)
+        pos = expression_key(node.expr_pos)
+        if expr is None or pos is None:
+            return None
+        return ('index', node.etype.name, expr, pos)
+    return None
+
+
+def key_variables(key):
+    """
+    Names of the variables a key reads
+    """
+    if key[0] == 'const':
+        return {key[2]} if key[1] == 'id' else set()
+    names = set()
+    for part in key[1:]:
+        if isinstance(part, tuple):
+            names |= key_variables(part)
+    return names
+
+
+def key_type(key):
+    """
+    Name of the type computed by the expression behind key
+    """
+    if key[0] == 'index':
+        return key[1]
+    if key[0] == 'unary':
+        return 'bool' if key[1] == 'not' else 'int'
+    return 'int' if key[1] in ARITHMETIC_OPS else 'bool'
+
+
+def has_impure_call(node):
+    """
+    Whether evaluating node may call a function with side effects on
+    variables, i.e. any function other than print
+    """
+    if isinstance(node, genericAST.FunctionCall) and node.name != "print":
+        return True
+    for (_, child) in node.children() or ():
+        if isinstance(child, genericAST.GenericNode) and has_impure_call(child):
+            return True
+    return False
+
+
+def variables_read(node):
+    """
+    Names of all the variables read anywhere in node
+    """
+    if isinstance(node, genericAST.Constant):
+        return {node.value} if node.const_type.name == "id" else set()
+    names = set()
+    for (_, child) in node.children() or ():
+        if isinstance(child, genericAST.GenericNode):
+            names |= variables_read(child)
+    return names
+
+
+def is_fresh(node):
+    """
+    Whether node always evaluates to a newly allocated list or string
+    """
+    if isinstance(node, (genericAST.List, genericAST.Slice)):
+        return True
+    if isinstance(node, genericAST.Constant):
+        return node.const_type.name == "str"
+    return isinstance(node, genericAST.BinaryOperation) and node.op in APPEND_FUNCTIONS
+
+
+def declared_names(stm_list):
+    """
+    Names of the variables declared in stm_list and its nested blocks,
+    not counting nested functions
+    """
+    names = set()
+    for stm in (stm_list.stmt_lst if stm_list else None) or ():
+        if isinstance(stm, genericAST.VariableDeclaration):
+            names.add(stm.name)
+        elif isinstance(stm, (genericAST.IfStm, genericAST.ElseBlock, genericAST.WhileStm)):
+            names |= declared_names(stm.body)
+            if isinstance(stm, genericAST.IfStm) and stm.else_branch is not None:
+                names |= declared_names(genericAST.StmList([stm.else_branch], stm.lineno))
+    return names
+
+
+def assigned_names(stm_list):
+    """
+    Names of the variables assigned in stm_list and its nested blocks, with
+    the number of assignments to each, not counting nested functions
+    """
+    names = Counter()
+    for stm in (stm_list.stmt_lst if stm_list else None) or ():
+        if isinstance(stm, genericAST.AssignStm):
+            names[stm.name] += 1
+        elif isinstance(stm, (genericAST.IfStm, genericAST.ElseBlock, genericAST.WhileStm)):
+            names.update(assigned_names(stm.body))
+            if isinstance(stm, genericAST.IfStm) and stm.else_branch is not None:
+                names.update(assigned_names(genericAST.StmList([stm.else_branch], stm.lineno)))
+    return names
+
+
+def is_arithmetic(node):
+    """
+    Whether node only combines constants and variables with arithmetic and
+    comparisons, reading no list, string or function
+    """
+    if isinstance(node, genericAST.Constant):
+        return node.const_type.name in ("id", "int", "bool")
+    if isinstance(node, genericAST.BinaryOperation):
+        return (node.op in ARITHMETIC_OPS | COMPARISON_OPS | SHORT_CIRCUIT_OPS
+                and is_arithmetic(node.left) and is_arithmetic(node.right))
+    if isinstance(node, genericAST.UnaryOperation):
+        return is_arithmetic(node.expr)
+    return False
+
+
+def counted_loop(stm: genericAST.WhileStm, local_types):
+    """
+    (name, step) of the local int variable counting the iterations of the
+    loop stm, or None if it is not a counted loop. A counted loop compares
+    its counter with a bound made of locals it does not assign, and moves
+    the counter towards the bound by a constant step in a single assignment
+    at the top level of its body, so it always terminates.
+    """
+    cond = stm.cond
+    if not (isinstance(cond, genericAST.BinaryOperation) and cond.op in ('<', '<=', '>', '>=')):
+        return None
+    assigned = assigned_names(stm.body)
+    for counter, bound, op in ((cond.left, cond.right, cond.op), (cond.right, cond.left, SWAPPED[cond.op])):
+        if not (isinstance(counter, genericAST.Constant) and counter.const_type.name == "id"
+                and local_types.get(counter.value) == "int" and assigned[counter.value] == 1):
+            continue
+        bound_names = variables_read(bound)
+        if not is_arithmetic(bound) or bound_names & set(assigned) or not bound_names <= set(local_types):
+            continue
+        for body_stm in stm.body.stmt_lst or ():
+            if not (isinstance(body_stm, genericAST.AssignStm) and body_stm.name == counter.value):
+                continue
+            step = counter_step(body_stm.expr, counter.value)
+            if step is not None and (step > 0) == (op in ('<', '<=')):
+                return counter.value, step
+    return None
+
+
+def counter_step(expr, name):
+    """
+    c when expr is name + c, c + name or name - c (as -c) for a nonzero int constant c
+    """
+    if not (isinstance(expr, genericAST.BinaryOperation) and expr.op in ('+', '-')):
+        return None
+    operands = [(expr.left, expr.right)]
+    if expr.op == '+':
+        operands.append((expr.right, expr.left))
+    for var, const in operands:
+        if (isinstance(var, genericAST.Constant) and var.const_type.name == "id" and var.value == name
+                and isinstance(const, genericAST.Constant) and const.const_type.name == "int"
+                and int(const.value) != 0):
+            return int(const.value) if expr.op == '+' else -int(const.value)
+    return None
+
+
+class CommonSubexpressionEliminator(object):
+    """
+    Local value numbering over the basic blocks of a function.
+
+    A basic block is a run of simple statements in a StmList, ended by any
+    if, while or nested function. A pure expression computed more than once
+    in a block, with no assignment to the variables it reads in between,
+    is computed once into a compiler temporary that the other occurrences
+    reuse. Statements calling functions other than print are left alone and
+    invalidate every available expression, since the callee may assign globals.
+    """
+
+    def __init__(self):
+        self.temp_count = 0
+
+    def new_temp(self):
+        name = f"{RESERVED_PREFIX}_e{self.temp_count}"
+        self.temp_count += 1
+        return name
+
+    def visit(self, node, on_candidate):
+        """
+        Visit the unconditionally evaluated subexpressions of node in post
+        order, replacing every candidate expression by on_candidate(key, node)
+        """
+        if isinstance(node, genericAST.BinaryOperation):
+            node.left = self.visit(node.left, on_candidate)
+            # the right operand of and/or is only evaluated conditionally
+            if node.op not in SHORT_CIRCUIT_OPS:
+                node.right = self.visit(node.right, on_candidate)
+        elif isinstance(node, genericAST.UnaryOperation):
+            node.expr = self.visit(node.expr, on_candidate)
+        elif isinstance(node, genericAST.Index):
+            node.expr = self.visit(node.expr, on_candidate)
+            node.expr_pos = self.visit(node.expr_pos, on_candidate)
+        elif isinstance(node, genericAST.FunctionCall):
+            if node.params.exprs:
+                node.params.exprs = [self.visit(e, on_candidate) for e in node.params.exprs]
+            return node
+        else:
+            return node
+        key = expression_key(node)
+        if key is None or not key_variables(key):
+            # constant expressions are folded by the C compiler
+            return node
+        return on_candidate(key, node)
+
+    def killed(self, stm):
+        """
+        Names of the variables whose value changes after stm runs
+        """
+        if isinstance(stm, (genericAST.AssignStm, genericAST.VariableDeclaration)):
+            return {stm.name}
+        return set()
+
+    def walk_block(self, stmts, on_candidate, on_statement):
+        """
+        Run on_candidate over the candidate expressions of stmts in evaluation
+        order, calling on_statement(index, kill) after each statement with the
+        set of variables it changes, or None when everything is invalidated
+        """
+        for i, stm in enumerate(stmts):
+            if isinstance(stm, (genericAST.AssignStm, genericAST.RetStm)):
+                expr_attr = 'expr'
+            elif isinstance(stm, genericAST.IfStm):
+                expr_attr = 'cond'
+            else:
+                expr_attr = None
+            if isinstance(stm, genericAST.FunctionCall):
+                impure = has_impure_call(stm)
+                if not impure:
+                    self.visit(stm, on_candidate)
+            elif expr_attr is not None:
+                impure = has_impure_call(getattr(stm, expr_attr))
+                if not impure:
+                    setattr(stm, expr_attr, self.visit(getattr(stm, expr_attr), on_candidate))
+            else:
+                impure = False
+            if impure or not isinstance(stm, SIMPLE_STATEMENTS):
+                # calls may assign globals, and control flow ends the block
+                on_statement(i, None)
+            else:
+                on_statement(i, self.killed(stm))
+
+    def optimize_block(self, stmts):
+        # first walk: group the occurrences of each expression between invalidations
+        live = dict()
+        groups = []
+        occurrence_group = []
+
+        def count(key, node):
+            if key not in live:
+                live[key] = len(groups)
+                groups.append([])
+            groups[live[key]].append(len(occurrence_group))
+            occurrence_group.append(live[key])
+            return node
+
+        def invalidate(i, kill):
+            if kill is None:
+                live.clear()
+                return
+            for key in [k for k in live if key_variables(k) & kill]:
+                del live[key]
+
+        self.walk_block(stmts, count, invalidate)
+        temps = [self.new_temp() if len(g) > 1 else None for g in groups]
+        if not any(temps):
+            return stmts
+
+        # second walk: compute the first occurrence of every repeated expression
+        # into its temporary, then reuse the temporary
+        preludes = dict()
+        occurrence = [0]
+        current = [0]
+
+        def replace(key, node):
+            n = occurrence[0]
+            occurrence[0] += 1
+            group = occurrence_group[n]
+            temp = temps[group]
+            if temp is None:
+                return node
+            if groups[group][0] == n:
+                prelude = preludes.setdefault(current[0], [])
+                prelude.append(genericAST.VariableDeclaration(temp, genericAST.Type(key_type(key)), node.lineno))
+                prelude.append(genericAST.AssignStm(temp, node, node.lineno))
+            return genericAST.Constant(genericAST.Type("id"), temp, node.lineno)
+
+        def next_statement(i, kill):
+            current[0] = i + 1
+
+        self.walk_block(stmts, replace, next_statement)
+        result = []
+        for i, stm in enumerate(stmts):
+            result.extend(preludes.get(i, []))
+            result.append(stm)
+        return result
+
+    def optimize_stm_list(self, stm_list: genericAST.StmList):
+        if not stm_list or not stm_list.stmt_lst:
+            return
+        for stm in stm_list.stmt_lst:
+            self.optimize_nested(stm)
+        stm_list.stmt_lst = self.optimize_block(stm_list.stmt_lst)
+
+    def optimize_nested(self, stm):
+        """
+        Optimize the statement lists nested in stm, each one on its own
+        """
+        if isinstance(stm, genericAST.IfStm):
+            self.optimize_stm_list(stm.body)
+            if stm.else_branch is not None:
+                self.optimize_nested(stm.else_branch)
+        elif isinstance(stm, genericAST.ElseBlock):
+            self.optimize_stm_list(stm.body)
+        elif isinstance(stm, genericAST.WhileStm):
+            self.optimize_stm_list(stm.body)
+        elif isinstance(stm, genericAST.FunctionDeclaration):
+            # temporaries of a nested function may shadow ours, which is fine in C
+            CommonSubexpressionEliminator().optimize_stm_list(stm.body)
+
+
+def join_interval(a, b):
+    """
+    Smallest interval holding both a and b. Intervals are (low, high) pairs
+    with None for an unbounded side.
+    """
+    low = None if a[0] is None or b[0] is None else min(a[0], b[0])
+    high = None if a[1] is None or b[1] is None else max(a[1], b[1])
+    return (low, high)
+
+
+def meet_interval(a, b):
+    """
+    Intersection of a and b, or None when it is empty
+    """
+    low = b[0] if a[0] is None else a[0] if b[0] is None else max(a[0], b[0])
+    high = b[1] if a[1] is None else a[1] if b[1] is None else min(a[1], b[1])
+    if low is not None and high is not None and low > high:
+        return None
+    return (low, high)
+
+
+def add_bound(a, b):
+    return None if a is None or b is None else a + b
+
+
+UNKNOWN = (None, None)
+UNKNOWN_LENGTH = (0, None)
+# comparison with its operands swapped, and its negation
+SWAPPED = {'<': '>', '<=': '>=', '>': '<', '>=': '<=', '==': '==', '!=': '!='}
+NEGATED = {'<': '>=', '<=': '>', '>': '<=', '>=': '<', '==': '!=', '!=': '=='}
+
+
+class BoundsCheckEliminator(object):
+    """
+    Interval analysis of the int variables and of the lengths of the list
+    and str variables of a function, used to prove indices in bounds.
+
+    Ranges come from constants, arithmetic, list and string literals,
+    concatenations, appends, len and range, and are narrowed by the conditions of if
+    and while statements. An Index whose position lies in 0..length-1 of
+    the indexed variable is marked unchecked and lowered to the accessor
+    without the bounds check. Calls other than print may assign globals and
+    forget their ranges; in main every variable is a global.
+    """
+
+    # loop iterations before unstable bounds are widened to infinity
+    WIDEN_AFTER = 2
+
+    def __init__(self, types, local_names, report):
+        # declared type names by variable, globals included
+        self.types = types
+        self.locals = local_names
+        self.report = report
+
+    def value(self, node, env):
+        """
+        Interval of the int expression node
+        """
+        if isinstance(node, genericAST.Constant):
+            if node.const_type.name == "id":
+                return env.get(node.value, UNKNOWN)
+            if node.const_type.name == "int":
+                return (int(node.value), int(node.value))
+            return UNKNOWN
+        if isinstance(node, genericAST.FunctionCall) and node.name in LENGTH_FUNCTIONS:
+            return self.length(node.params.exprs[0], env)
+        if isinstance(node, genericAST.UnaryOperation) and node.op == "-":
+            low, high = self.value(node.expr, env)
+            return (None if high is None else -high, None if low is None else -low)
+        if not isinstance(node, genericAST.BinaryOperation):
+            return UNKNOWN
+        left, right = self.value(node.left, env), self.value(node.right, env)
+        if node.op == "+":
+            return (add_bound(left[0], right[0]), add_bound(left[1], right[1]))
+        if node.op == "-":
+            return (add_bound(left[0], None if right[1] is None else -right[1]),
+                    add_bound(left[1], None if right[0] is None else -right[0]))
+        if node.op == "*" and None not in left + right:
+            products = [a * b for a in left for b in right]
+            return (min(products), max(products))
+        if node.op == "%" and right[0] is not None and right[0] == right[1] and right[0] > 0:
+            # C remainder takes the sign of the dividend
+            low = 0 if left[0] is not None and left[0] >= 0 else -(right[0] - 1)
+            return (low, right[0] - 1)
+        return UNKNOWN
+
+    def length(self, node, env):
+        """
+        Interval of the length of the list or str expression node
+        """
+        if isinstance(node, genericAST.Constant):
+            if node.const_type.name == "id":
+                return env.get(node.value, UNKNOWN_LENGTH)
+            if node.const_type.name == "str":
+                return (len(node.value), len(node.value))
+            return UNKNOWN_LENGTH
+        if isinstance(node, genericAST.List):
+            count = len(node.expr_list.exprs or [])
+            return (count, count)
+        if isinstance(node, genericAST.BinaryOperation) and node.op in APPEND_FUNCTIONS:
+            left, right = self.length(node.left, env), self.length(node.right, env)
+            return (add_bound(left[0], right[0]), add_bound(left[1], right[1]))
+        if isinstance(node, genericAST.Slice):
+            return (0, self.length(node.expr, env)[1])
+        if isinstance(node, genericAST.FunctionCall) and node.name == "list_range":
+            # exact when start, stop and step are known
+            bounds = [self.value(e, env) for e in node.params.exprs]
+            if all(low is not None and low == high for low, high in bounds) and bounds[2][0] != 0:
+                count = len(range(*(low for low, _ in bounds)))
+                return (count, count)
+        return UNKNOWN_LENGTH
+
+    def assigned_range(self, name, expr, env):
+        if self.types.get(name) == "int":
+            return self.value(expr, env)
+        if self.types.get(name) in ("list", "str"):
+            return self.length(expr, env)
+        return UNKNOWN
+
+    def forget_globals(self, env):
+        for name in [n for n in env if n not in self.locals]:
+            del env[name]
+
+    def check_indices(self, node, env, mark):
+        """
+        Mark the indices in node proven in bounds under env
+        """
+        if isinstance(node, genericAST.Index):
+            if mark:
+                self.report["bounds checks"] += 1
+            low, high = self.value(node.expr_pos, env)
+            length_low = self.length(node.expr, env)[0]
+            if (low is not None and high is not None and length_low is not None
+                    and low >= 0 and high < length_low):
+                if mark:
+                    node.checked = False
+                    self.report["bounds checks removed"] += 1
+        for (_, child) in node.children() or ():
+            if isinstance(child, genericAST.GenericNode):
+                self.check_indices(child, env, mark)
+
+    def narrow(self, env, cond, truth):
+        """
+        env where cond evaluates to truth, or None if that cannot happen
+        """
+        if env is None:
+            return None
+        if isinstance(cond, genericAST.UnaryOperation) and cond.op == "not":
+            return self.narrow(env, cond.expr, not truth)
+        if not isinstance(cond, genericAST.BinaryOperation):
+            return env
+        if cond.op in ("and", "or"):
+            if (cond.op == "and") == truth:
+                return self.narrow(self.narrow(env, cond.left, truth), cond.right, truth)
+            return env
+        if cond.op not in NEGATED:
+            return env
+        op = cond.op if truth else NEGATED[cond.op]
+        env = dict(env)
+        for var, other, var_op in ((cond.left, cond.right, op), (cond.right, cond.left, SWAPPED[op])):
+            if not (isinstance(var, genericAST.Constant) and var.const_type.name == "id"
+                    and self.types.get(var.value) == "int"):
+                continue
+            low, high = self.value(other, env)
+            bound = {'<': (None, add_bound(high, -1)), '<=': (None, high),
+                     '>': (add_bound(low, 1), None), '>=': (low, None),
+                     '==': (low, high), '!=': UNKNOWN}[var_op]
+            narrowed = meet_interval(env.get(var.value, UNKNOWN), bound)
+            if narrowed is None:
+                return None
+            env[var.value] = narrowed
+        return env
+
+    def join(self, a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return {name: join_interval(a[name], b[name]) for name in a if name in b}
+
+    def widen(self, old, new):
+        """
+        new with every bound that moved since old made unbounded
+        """
+        if old is None or new is None:
+            return new
+        widened = dict()
+        for name, (low, high) in new.items():
+            if name not in old:
+                continue
+            old_low, old_high = old[name]
+            widened[name] = (low if low == old_low else None, high if high == old_high else None)
+        return widened
+
+    def run(self, stmts, env, mark):
+        """
+        Forward analysis of stmts from env, returning the env after them,
+        None when they cannot complete. With mark set, proven indices are
+        marked unchecked.
+        """
+        for stm in stmts or []:
+            if env is None:
+                return None
+            if isinstance(stm, genericAST.FunctionDeclaration):
+                optimize_bounds_checks(stm, self.types, self.report if mark else Counter())
+                continue
+            if isinstance(stm, (genericAST.AssignStm, genericAST.RetStm, genericAST.FunctionCall)):
+                if has_impure_call(stm) and not (isinstance(stm, genericAST.FunctionCall)
+                                                  and stm.name in APPEND_FUNCTION_NAMES):
+                    env = dict(env)
+                    self.forget_globals(env)
+                self.check_indices(stm, env, mark)
+            if isinstance(stm, genericAST.AssignStm):
+                env = dict(env)
+                env[stm.name] = self.assigned_range(stm.name, stm.expr, env)
+            elif isinstance(stm, genericAST.VariableDeclaration):
+                env = dict(env)
+                env.pop(stm.name, None)
+            elif isinstance(stm, genericAST.RetStm):
+                return None
+            elif isinstance(stm, genericAST.FunctionCall) and stm.name in APPEND_FUNCTION_NAMES:
+                target, added = stm.params.exprs
+                env = dict(env)
+                env[target.value] = self.length(genericAST.BinaryOperation(
+                    "concat_lists", target, added, stm.lineno), env)
+            elif isinstance(stm, genericAST.IfStm):
+                env = self.run_if(stm, env, mark)
+            elif isinstance(stm, genericAST.WhileStm):
+                env = self.run_while(stm, env, mark)
+        return env
+
+    def run_if(self, stm, env, mark):
+        if has_impure_call(stm.cond):
+            env = dict(env)
+            self.forget_globals(env)
+        self.check_indices(stm.cond, env, mark)
+        body = self.run(stm.body.stmt_lst, self.narrow(env, stm.cond, True), mark)
+        other = self.narrow(env, stm.cond, False)
+        if isinstance(stm.else_branch, genericAST.IfStm):
+            other = self.run_if(stm.else_branch, other, mark) if other is not None else None
+        elif stm.else_branch is not None:
+            other = self.run(stm.else_branch.body.stmt_lst, other, mark)
+        return self.join(body, other)
+
+    def head_env(self, stm, env):
+        if env is not None and has_impure_call(stm.cond):
+            env = dict(env)
+            self.forget_globals(env)
+        return env
+
+    def run_while(self, stm, env, mark):
+        head = self.head_env(stm, env)
+        iteration = 0
+        while True:
+            end = self.run(stm.body.stmt_lst, self.narrow(head, stm.cond, True), False)
+            new_head = self.head_env(stm, self.join(head, end))
+            iteration += 1
+            if iteration > self.WIDEN_AFTER:
+                new_head = self.widen(head, new_head)
+            if new_head == head:
+                break
+            head = new_head
+        if head is None:
+            return None
+        self.check_indices(stm.cond, head, mark)
+        if mark:
+            self.run(stm.body.stmt_lst, self.narrow(head, stm.cond, True), True)
+        return self.narrow(head, stm.cond, False)
+
+
+def declared_types(stm_list):
+    """
+    Type names of the variables declared in stm_list and its nested blocks,
+    not counting nested functions
+    """
+    types = dict()
+    for stm in (stm_list.stmt_lst if stm_list else None) or ():
+        if isinstance(stm, genericAST.VariableDeclaration):
+            types[stm.name] = stm.var_type.name
+        elif isinstance(stm, (genericAST.IfStm, genericAST.ElseBlock, genericAST.WhileStm)):
+            types.update(declared_types(stm.body))
+            if isinstance(stm, genericAST.IfStm) and stm.else_branch is not None:
+                types.update(declared_types(genericAST.StmList([stm.else_branch], stm.lineno)))
+    return types
+
+
+def optimize_bounds_checks(function: genericAST.FunctionDeclaration, global_types, report):
+    params = {p.name: p.param_type.name for p in (function.params.params if function.params else None) or ()}
+    local_types = dict(params, **declared_types(function.body))
+    types = dict(global_types, **local_types)
+    if function.body and function.body.stmt_lst:
+        BoundsCheckEliminator(types, set(local_types), report).run(function.body.stmt_lst, dict(), True)
+
+
+class InPlaceAppendLowering(object):
+    """
+    Lowers r = r + x on lists and strings to extend_list(r, x) or
+    string_append(r, x), which grow the value of r in place instead of
+    copying it into a new one.
+
+    This is only done when nothing else can observe the change, i.e. when r
+    owns its value: r was last assigned a freshly allocated list or string,
+    and that value has not escaped since. A value escapes when it is passed
+    to a function other than print, stored in a list literal, concatenated
+    into a string (ropes share their operands), returned, or copied to
+    another variable while r is still live. Functions can reach every
+    global, so calls other than print take ownership away from all but the
+    locals; in main every variable is a global.
+    """
+
+    def __init__(self, local_names):
+        self.locals = local_names
+        # live variables after each assignment, by id of the statement
+        self.live_out = dict()
+
+    def liveness(self, stmts, live):
+        """
+        Backward liveness of the locals over stmts, given the variables live
+        after them. Records live_out for every assignment and returns the
+        variables live before stmts.
+        """
+        for stm in reversed(stmts or []):
+            if isinstance(stm, genericAST.AssignStm):
+                self.live_out[id(stm)] = live
+                live = (live - {stm.name}) | variables_read(stm.expr)
+            elif isinstance(stm, genericAST.RetStm):
+                live = variables_read(stm.expr) if stm.expr is not None else set()
+            elif isinstance(stm, genericAST.FunctionCall):
+                live = live | variables_read(stm)
+            elif isinstance(stm, genericAST.IfStm):
+                live = self.liveness_if(stm, live)
+            elif isinstance(stm, genericAST.WhileStm):
+                head = live
+                while True:
+                    new_head = live | variables_read(stm.cond) | self.liveness(stm.body.stmt_lst, head)
+                    if new_head == head:
+                        break
+                    head = new_head
+                live = head
+        return live & self.locals
+
+    def liveness_if(self, stm, live):
+        body = self.liveness(stm.body.stmt_lst, live)
+        if isinstance(stm.else_branch, genericAST.IfStm):
+            other = self.liveness_if(stm.else_branch, live)
+        elif stm.else_branch is not None:
+            other = self.liveness(stm.else_branch.body.stmt_lst, live)
+        else:
+            other = live
+        return variables_read(stm.cond) | body | other
+
+    def escape(self, node, owned, escaping):
+        """
+        Remove from owned the variables whose value escapes when node is
+        evaluated, escaping telling whether the value of node itself does
+        """
+        if isinstance(node, genericAST.Constant):
+            if escaping and node.const_type.name == "id":
+                owned.discard(node.value)
+        elif isinstance(node, genericAST.FunctionCall):
+            for expr in (node.params.exprs if node.params else None) or ():
+                self.escape(expr, owned, node.name != "print")
+            if node.name != "print":
+                owned &= self.locals
+        elif isinstance(node, genericAST.List):
+            for expr in node.expr_list.exprs or ():
+                self.escape(expr, owned, True)
+        elif isinstance(node, genericAST.BinaryOperation):
+            # concat_lists copies its operands, concat_strings may share them
+            self.escape(node.left, owned, node.op == "concat_strings")
+            self.escape(node.right, owned, node.op == "concat_strings")
+        else:
+            for (_, child) in node.children() or ():
+                if isinstance(child, genericAST.GenericNode):
+                    self.escape(child, owned, False)
+
+    def appendable(self, stm, owned):
+        expr = stm.expr
+        return (isinstance(expr, genericAST.BinaryOperation) and expr.op in APPEND_FUNCTIONS
+                and isinstance(expr.left, genericAST.Constant) and expr.left.const_type.name == "id"
+                and expr.left.value == stm.name and stm.name not in variables_read(expr.right)
+                and stm.name in owned)
+
+    def run(self, stmts, owned, rewrite):
+        """
+        Forward ownership analysis over stmts, starting from the owned
+        variables and returning those owned afterwards. With rewrite set,
+        appendable assignments are replaced in stmts.
+        """
+        for i, stm in enumerate(stmts or []):
+            if isinstance(stm, genericAST.AssignStm):
+                expr = stm.expr
+                if isinstance(expr, genericAST.BinaryOperation) and expr.op in APPEND_FUNCTIONS:
+                    # the right operand is copied by an in place append, so check it first
+                    self.escape(expr.right, owned, False)
+                    if self.appendable(stm, owned):
+                        if rewrite:
+                            params = genericAST.ExpressionList([expr.left, expr.right], stm.lineno)
+                            stmts[i] = genericAST.FunctionCall(APPEND_FUNCTIONS[expr.op], params, stm.lineno)
+                        continue
+                copied = isinstance(expr, genericAST.Constant) and expr.const_type.name == "id"
+                transfer = (copied and expr.value in owned and expr.value in self.locals
+                            and expr.value not in self.live_out.get(id(stm), set()))
+                self.escape(expr, owned, True)
+                if is_fresh(expr) or transfer:
+                    owned.add(stm.name)
+                else:
+                    owned.discard(stm.name)
+            elif isinstance(stm, genericAST.VariableDeclaration):
+                owned.discard(stm.name)
+            elif isinstance(stm, (genericAST.FunctionCall, genericAST.RetStm)):
+                self.escape(stm, owned, False)
+            elif isinstance(stm, genericAST.IfStm):
+                owned = self.run_if(stm, owned, rewrite)
+            elif isinstance(stm, genericAST.WhileStm):
+                head = set(owned)
+                while True:
+                    self.escape(stm.cond, head, False)
+                    end = self.run(stm.body.stmt_lst, set(head), False)
+                    new_head = head & end
+                    if new_head == head:
+                        break
+                    head = new_head
+                if rewrite:
+                    self.run(stm.body.stmt_lst, set(head), True)
+                owned = head
+            elif isinstance(stm, genericAST.FunctionDeclaration):
+                lower_in_place_appends(stm)
+        return owned
+
+    def run_if(self, stm, owned, rewrite):
+        self.escape(stm.cond, owned, False)
+        body = self.run(stm.body.stmt_lst, set(owned), rewrite)
+        if isinstance(stm.else_branch, genericAST.IfStm):
+            other = self.run_if(stm.else_branch, set(owned), rewrite)
+        elif stm.else_branch is not None:
+            other = self.run(stm.else_branch.body.stmt_lst, set(owned), rewrite)
+        else:
+            other = owned
+        return body & other
+
+    def lower(self, stm_list: genericAST.StmList):
+        if not stm_list or not stm_list.stmt_lst:
+            return
+        self.liveness(stm_list.stmt_lst, set())
+        self.run(stm_list.stmt_lst, set(), True)
+
+
+def lower_in_place_appends(function: genericAST.FunctionDeclaration):
+    params = {p.name for p in (function.params.params if function.params else None) or ()}
+    InPlaceAppendLowering(params | declared_names(function.body)).lower(function.body)
+
+
+def optimize_function(function: genericAST.FunctionDeclaration, global_types=None, report=None):
+    """
+    Run every pass over function. global_types maps the globals to their
+    type names, report counts what the passes did.
+    """
+    report = report if report is not None else Counter()
+    CommonSubexpressionEliminator().optimize_stm_list(function.body)
+    optimize_bounds_checks(function, global_types or dict(), report)
+    lower_in_place_appends(function)
+    return report
+
+
+def global_types(program: genericAST.Program):
+    return {v.name: v.var_type.name for v in program.global_vars.variables}
+
+
+def optimize_program(program: genericAST.Program, report=None):
+    report = report if report is not None else Counter()
+    types = global_types(program)
+    for function in program.functions.functions:
+        if isinstance(function, genericAST.FunctionDeclaration):
+            optimize_function(function, types, report)
+    CommonSubexpressionEliminator().optimize_stm_list(program.main_stms)
+    if program.main_stms.stmt_lst:
+        main_types = dict(types, **declared_types(program.main_stms))
+        BoundsCheckEliminator(main_types, set(), report).run(program.main_stms.stmt_lst, dict(), True)
+    InPlaceAppendLowering(set()).lower(program.main_stms)
+    return report
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Parallel loops for --parallel, found after the passes of genericOptimizer
+and genericEffects. A counted while loop (see genericOptimizer.counted_loop)
+whose counter is moved by the last statement of its body runs as an OpenMP
+parallel for when its iterations are independent:
+
+    every variable it assigns, other than its counter, is either private,
+    i.e. assigned at the top level of the body before anything reads it,
+    or an int reduction, only ever updated by s = s + e or s = s - e (or
+    any sum adding s once) with e not reading s, and read nowhere else in
+    the loop
+
+    it only reads int and bool values and list elements, calls const
+    functions and the builtins in THREAD_SAFE_BUILTINS only and holds no
+    while loop, return or nested function
+
+The language has no element assignment, so the only results a loop can
+leave are its reductions and the last values of its private variables,
+and loops without a reduction are left alone. Reading list elements only
+walks the nodes of lists nothing assigns, which is safe from any thread.
+"""
+
+from collections import Counter
+import genericAST
+from genericEffects import CONST
+from genericOptimizer import (ARITHMETIC_OPS, COMPARISON_OPS, SHORT_CIRCUIT_OPS, SWAPPED, assigned_names,
+                              counted_loop, declared_names, declared_types, variables_read)
+
+VALUE_TYPES = ("int", "bool")
+# runtime functions of builtins that only read their list and cannot fail:
+# len, sum, and min and max of two ints
+THREAD_SAFE_BUILTINS = {"list_length", "list_sum", "int_min", "int_max"}
+
+
+class ParallelLoop(object):
+    """
+    How a WhileStm runs in parallel: its counter moves by step while the
+    comparison op with bound holds, reductions are summed over the
+    iterations and privates keep the value of the last one
+    """
+    def __init__(self, counter, op, bound, step, reductions, privates):
+        self.counter = counter
+        self.op = op
+        self.bound = bound
+        self.step = step
+        self.reductions = reductions
+        self.privates = privates
+
+
+def read_count(node, name):
+    """
+    Number of times the variable name is read in node
+    """
+    if isinstance(node, genericAST.Constant):
+        return int(node.const_type.name == "id" and node.value == name)
+    return sum(read_count(child, name) for (_, child) in node.children() or ()
+               if isinstance(child, genericAST.GenericNode))
+
+
+def reduction_terms(stm: genericAST.AssignStm):
+    """
+    The other terms when stm assigns s a sum in which s itself is added
+    once, e.g. [a, b] for s = s + a - b, or None
+    """
+    terms, found = [], []
+
+    def walk(node, added):
+        if isinstance(node, genericAST.BinaryOperation) and node.op in ('+', '-'):
+            walk(node.left, added)
+            walk(node.right, added == (node.op == '+'))
+        elif (isinstance(node, genericAST.Constant) and node.const_type.name == "id" and node.value == stm.name
+                and added and not found):
+            found.append(node)
+        else:
+            terms.append(node)
+    walk(stm.expr, True)
+    if not found or any(stm.name in variables_read(term) for term in terms):
+        return None
+    return terms
+
+
+def assignments(stmts):
+    """
+    The assignments of stmts and their nested blocks
+    """
+    for stm in stmts:
+        if isinstance(stm, genericAST.AssignStm):
+            yield stm
+        elif isinstance(stm, (genericAST.IfStm, genericAST.ElseBlock)):
+            yield from assignments(stm.body.stmt_lst or ())
+            if isinstance(stm, genericAST.IfStm) and stm.else_branch is not None:
+                yield from assignments([stm.else_branch])
+
+
+def called_functions(node):
+    """
+    Names of the functions called anywhere in node
+    """
+    names = {node.name} if isinstance(node, genericAST.FunctionCall) else set()
+    for (_, child) in node.children() or ():
+        if isinstance(child, genericAST.GenericNode):
+            names |= called_functions(child)
+    return names
+
+
+def parallel_loops(node):
+    """
+    The loops of node marked parallel
+    """
+    if isinstance(node, genericAST.WhileStm) and node.parallel is not None:
+        return [node]
+    loops = []
+    for (_, child) in node.children() or ():
+        if isinstance(child, genericAST.GenericNode):
+            loops += parallel_loops(child)
+    return loops
+
+
+class LoopParallelizer(object):
+    """
+    Marks the parallel loops of a function or of the main code by setting
+    the parallel attribute of their WhileStm. summaries are the function
+    summaries of genericEffects.EffectsAnalysis, global_types maps globals
+    to their type names.
+    """
+
+    def __init__(self, summaries, global_types, report=None):
+        self.summaries = summaries
+        self.global_types = global_types
+        self.report = report if report is not None else Counter()
+        self.local_types = dict()
+        # reductions of the loop being checked, only read by their own updates
+        self.unreadable = set()
+
+    def run(self, stm_list: genericAST.StmList, local_types):
+        self.local_types = local_types
+        self.stm_list(stm_list)
+
+    def stm_list(self, stm_list):
+        for stm in (stm_list.stmt_lst if stm_list else None) or ():
+            if isinstance(stm, genericAST.WhileStm):
+                stm.parallel = self.parallel_loop(stm)
+                if stm.parallel is not None:
+                    self.report["parallel loops"] += 1
+                else:
+                    self.stm_list(stm.body)
+            elif isinstance(stm, (genericAST.IfStm, genericAST.ElseBlock)):
+                self.stm_list(stm.body)
+                if isinstance(stm, genericAST.IfStm) and stm.else_branch is not None:
+                    self.stm_list(genericAST.StmList([stm.else_branch], stm.lineno))
+
+    def var_type(self, name):
+        return self.local_types.get(name, self.global_types.get(name))
+
+    def parallel_loop(self, stm: genericAST.WhileStm):
+        counted = counted_loop(stm, self.local_types)
+        if counted is None:
+            return None
+        counter, step = counted
+        stmts = stm.body.stmt_lst
+        if not (isinstance(stmts[-1], genericAST.AssignStm) and stmts[-1].name == counter):
+            return None
+        body = stmts[:-1]
+        cond = stm.cond
+        if isinstance(cond.left, genericAST.Constant) and cond.left.value == counter:
+            op, bound = cond.op, cond.right
+        else:
+            op, bound = SWAPPED[cond.op], cond.left
+
+        # variables declared in the body are private to each iteration in C
+        local = declared_names(stm.body)
+        privates, read = [], set()
+        for body_stm in body:
+            if (isinstance(body_stm, genericAST.AssignStm) and body_stm.name not in local | read
+                    and body_stm.name not in privates and self.var_type(body_stm.name) in VALUE_TYPES
+                    and body_stm.name not in variables_read(body_stm.expr)):
+                privates.append(body_stm.name)
+            read |= variables_read(body_stm)
+        reductions = []
+        for name in assigned_names(genericAST.StmList(body, stm.lineno)):
+            if name in local or name in privates:
+                continue
+            updates = [s for s in assignments(body) if s.name == name]
+            if (self.var_type(name) != "int" or not all(reduction_terms(s) is not None for s in updates)
+                    or read_count(genericAST.StmList(body, stm.lineno), name) != len(updates)):
+                return None
+            reductions.append(name)
+        if not reductions:
+            return None
+        self.unreadable = set(reductions)
+        if not (all(self.statement(s) for s in body) and self.expression(bound)):
+            return None
+        return ParallelLoop(counter, op, bound, step, reductions, privates)
+
+    def statement(self, stm):
+        if isinstance(stm, genericAST.AssignStm):
+            if stm.name in self.unreadable:
+                return all(self.expression(term) for term in reduction_terms(stm))
+            return self.expression(stm.expr)
+        if isinstance(stm, genericAST.VariableDeclaration):
+            return True
+        if isinstance(stm, genericAST.IfStm):
+            return (self.expression(stm.cond) and all(self.statement(s) for s in stm.body.stmt_lst or ())
+                    and (stm.else_branch is None or self.statement(stm.else_branch)))
+        if isinstance(stm, genericAST.ElseBlock):
+            return all(self.statement(s) for s in stm.body.stmt_lst or ())
+        if isinstance(stm, genericAST.FunctionCall):
+            return self.expression(stm)
+        # while loops, returns and nested functions
+        return False
+
+    def expression(self, node):
+        if isinstance(node, genericAST.Constant):
+            if node.const_type.name == "id":
+                return node.value not in self.unreadable and self.var_type(node.value) in VALUE_TYPES + ("list",)
+            return node.const_type.name in VALUE_TYPES
+        if isinstance(node, genericAST.BinaryOperation):
+            return (node.op in ARITHMETIC_OPS | COMPARISON_OPS | SHORT_CIRCUIT_OPS
+                    and self.expression(node.left) and self.expression(node.right))
+        if isinstance(node, genericAST.UnaryOperation):
+            return self.expression(node.expr)
+        if isinstance(node, genericAST.Index):
+            return (node.etype.name in VALUE_TYPES + ("list",) and self.is_list(node.expr)
+                    and self.expression(node.expr_pos))
+        if isinstance(node, genericAST.FunctionCall):
+            summary = self.summaries.get(node.name)
+            return ((node.name in THREAD_SAFE_BUILTINS or summary is not None and summary.effect == CONST)
+                    and all(self.expression(e) for e in node.params.exprs or ()))
+        return False
+
+    def is_list(self, node):
+        if isinstance(node, genericAST.Constant):
+            return (node.const_type.name == "id" and node.value not in self.unreadable
+                    and self.var_type(node.value) == "list")
+        return isinstance(node, genericAST.Index) and node.etype.name == "list" and self.expression(node)
+
+
+def parallelize_function(function: genericAST.FunctionDeclaration, summaries, global_types, report=None):
+    params = {p.name: p.param_type.name for p in (function.params.params if function.params else None) or ()}
+    parallelizer = LoopParallelizer(summaries, global_types, report)
+    parallelizer.run(function.body, dict(params, **declared_types(function.body)))
+    return parallelizer.report
+
+
+def parallelize_main(main_stms: genericAST.StmList, summaries, global_types, report=None):
+    parallelizer = LoopParallelizer(summaries, global_types, report)
+    parallelizer.run(main_stms, dict(global_types, **declared_types(main_stms)))
+    return parallelizer.report
+
+
+def parallelize_program(program: genericAST.Program, summaries, report=None):
+    """
+    Mark the parallel loops of every function of program and of its main
+    code, whose variables are the globals. The loops of functions called
+    from parallel loops would only start nested teams of a single thread,
+    so they stay sequential. The streaming pipeline emits each function
+    before its callers are known and keeps them.
+    """
+    types = {v.name: v.var_type.name for v in program.global_vars.variables}
+    report = report if report is not None else Counter()
+    functions = {f.name: f for f in program.functions.functions if isinstance(f, genericAST.FunctionDeclaration)}
+    for function in functions.values():
+        parallelize_function(function, summaries, types, report)
+    parallelize_main(program.main_stms, summaries, types, report)
+    pending = set()
+    for loop in parallel_loops(program):
+        pending |= called_functions(loop.body)
+    nested = set()
+    while pending:
+        name = pending.pop()
+        if name in functions and name not in nested:
+            nested.add(name)
+            pending |= called_functions(functions[name].body)
+    for name in nested:
+        for loop in parallel_loops(functions[name].body):
+            loop.parallel = None
+            report["parallel loops"] -= 1
+    return report
@@ -0,0 +1,987 @@
+#!/usr/bin/env python3
+"""
+Control flow graph and static single assignment (SSA) form of the
+functions of a genericAST.Program, used between the genericAST and the
+cAST when compiling with --ssa.
+
+A function is split into basic blocks, each ending in a jump, a
+conditional branch or a return. Its local variables are then renamed so
+that every name is assigned exactly once: version k of x becomes the C
+variable _pyrt_x_k, parameters keep their own name as first version, and phi
+nodes at the start of a block select the version coming from each
+predecessor. Globals are not renamed, since any call may assign them, so
+main, whose variables are all globals, keeps the structured lowering.
+
+Passes run over the SSA form through a PassManager, which rebuilds the
+def-use chains before each of them. The result is lowered to cAST with
+labels and gotos, every phi node becoming copies at the end of the
+predecessors of its block.
+"""
+
+import copy
+from collections import Counter, defaultdict
+import cAST
+import genericAST
+from compilationContext import RESERVED_PREFIX
+from genericOptimizer import ARITHMETIC_OPS, COMPARISON_OPS, SHORT_CIRCUIT_OPS
+
+
+class SSAError(Exception): pass
+
+
+def references(node):
+    """
+    Variable references in node, i.e. its Constant nodes of type id
+    """
+    if isinstance(node, genericAST.Constant):
+        return [node] if node.const_type.name == "id" else []
+    found = []
+    for (_, child) in node.children() or ():
+        if isinstance(child, genericAST.GenericNode):
+            found.extend(references(child))
+    return found
+
+
+def replace_references(node, replace):
+    """
+    node with every variable reference c in it replaced by replace(c)
+    """
+    if isinstance(node, genericAST.Constant):
+        return replace(node) if node.const_type.name == "id" else node
+    for attr, value in list(vars(node).items()):
+        if isinstance(value, genericAST.GenericNode):
+            setattr(node, attr, replace_references(value, replace))
+        elif isinstance(value, list):
+            setattr(node, attr, [replace_references(v, replace) if isinstance(v, genericAST.GenericNode) else v
+                                 for v in value])
+    return node
+
+
+def has_side_effects(node):
+    """
+    Whether evaluating node may do more than compute a value: calls,
+    and checked indices and slices, which stop the program on errors
+    """
+    if isinstance(node, (genericAST.FunctionCall, genericAST.Slice)):
+        return True
+    if isinstance(node, genericAST.Index) and node.checked:
+        return True
+    for (_, child) in node.children() or ():
+        if isinstance(child, genericAST.GenericNode) and has_side_effects(child):
+            return True
+    return False
+
+
+def expression_text(node):
+    """
+    Readable form of the expression node, used to print functions
+    """
+    if node is None:
+        return ""
+    if isinstance(node, genericAST.Constant):
+        return repr(node.value) if node.const_type.name == "str" else str(node.value)
+    if isinstance(node, genericAST.BinaryOperation):
+        return f"({expression_text(node.left)} {node.op} {expression_text(node.right)})"
+    if isinstance(node, genericAST.UnaryOperation):
+        return f"{node.op} {expression_text(node.expr)}"
+    if isinstance(node, genericAST.Index):
+        return f"{expression_text(node.expr)}[{expression_text(node.expr_pos)}]"
+    if isinstance(node, genericAST.Slice):
+        return (f"{expression_text(node.expr)}[{expression_text(node.start)}:"
+                f"{expression_text(node.end)}:{expression_text(node.step)}]")
+    if isinstance(node, genericAST.FunctionCall):
+        args = (node.params.exprs if node.params else None) or []
+        return f"{node.name}({', '.join(expression_text(a) for a in args)})"
+    if isinstance(node, genericAST.List):
+        return f"[{', '.join(expression_text(e) for e in node.expr_list.exprs or [])}]"
+    return type(node).__name__
+
+
+class Jump(genericAST.GenericNode):
+    def __init__(self, target, lineno=0):
+        self.target = target
+        self.lineno = lineno
+
+    def children(self):
+        return ()
+    attr_names = ()
+
+
+class Branch(genericAST.GenericNode):
+    """
+    Jump to if_true when cond holds and to if_false otherwise
+    """
+    def __init__(self, cond, if_true, if_false, lineno=0):
+        self.cond = cond
+        self.if_true = if_true
+        self.if_false = if_false
+        self.lineno = lineno
+
+    def children(self):
+        return (('cond', self.cond),)
+    attr_names = ()
+
+
+class Label(genericAST.GenericNode):
+    def __init__(self, name, lineno=0):
+        self.name = name
+        self.lineno = lineno
+
+    def children(self):
+        return ()
+    attr_names = ('name', )
+
+    def to_c_node(self, ctx) -> cAST.Label:
+        return cAST.Label(self.name, self.lineno)
+
+
+class Goto(genericAST.GenericNode):
+    """
+    Jump to label, only if cond holds when it is given
+    """
+    def __init__(self, label, cond=None, lineno=0):
+        self.label = label
+        self.cond = cond
+        self.lineno = lineno
+
+    def children(self):
+        return (('cond', self.cond),) if self.cond is not None else ()
+    attr_names = ('label', )
+
+    def to_c_node(self, ctx) -> cAST.CNode:
+        goto = cAST.Goto(self.label, self.lineno)
+        if self.cond is None:
+            return goto
+        return cAST.IfStm(self.cond.to_c_node(ctx), cAST.StmList([goto], self.lineno), None, self.lineno)
+
+
+class LoopCounter(genericAST.GenericNode):
+    def __init__(self, lineno):
+        self.lineno = lineno
+
+    def children(self):
+        return ()
+    attr_names = ()
+
+    def to_c_node(self, ctx) -> cAST.LoopCounter:
+        return cAST.LoopCounter(ctx.function_name, self.lineno)
+
+
+class Variable(object):
+    """
+    A parameter or local variable, whose versions are the SSA values
+    """
+    def __init__(self, name, var_type, key, param=False):
+        self.name = name
+        self.var_type = var_type
+        # stands for the variable in references until they are renamed
+        self.key = key
+        self.param = param
+        # version read where the variable was never assigned, made on demand
+        self.undefined = None
+
+
+class Phi(object):
+    def __init__(self, variable, block):
+        self.variable = variable
+        self.block = block
+        self.name = None
+        # reference to the value coming from each predecessor, by block
+        self.args = dict()
+
+    def operands(self):
+        return list(self.args.values())
+
+
+class Instruction(object):
+    """
+    A simple statement of a basic block: assignment, call or declaration
+    """
+    def __init__(self, stm, block):
+        self.stm = stm
+        self.block = block
+
+    def defined(self):
+        """
+        Name assigned by the instruction, None if it assigns nothing
+        """
+        if isinstance(self.stm, (genericAST.AssignStm, genericAST.VariableDeclaration)):
+            return self.stm.name
+        return None
+
+    def operands(self):
+        return references(self.stm)
+
+
+class BasicBlock(object):
+    def __init__(self, index):
+        self.index = index
+        self.label = f"{RESERVED_PREFIX}_bb{index}"
+        self.phis = []
+        self.instructions = []
+        # Jump, Branch or genericAST.RetStm, None when the function ends here
+        self.terminator = None
+        self.preds = []
+        self.succs = []
+        # line of the while loop whose body starts here, see --instrument
+        self.loop_line = None
+
+    def append(self, stm):
+        self.instructions.append(Instruction(stm, self))
+
+    def link(self, succ):
+        self.succs.append(succ)
+        succ.preds.append(self)
+
+    def jump(self, target):
+        self.terminator = Jump(target)
+        self.link(target)
+
+    def branch(self, cond, if_true, if_false, lineno):
+        self.terminator = Branch(cond, if_true, if_false, lineno)
+        self.link(if_true)
+        self.link(if_false)
+
+    def retarget(self, old, new):
+        """
+        Make the edge to old lead to new instead
+        """
+        if isinstance(self.terminator, Jump):
+            self.terminator.target = new
+        else:
+            if self.terminator.if_true is old:
+                self.terminator.if_true = new
+            if self.terminator.if_false is old:
+                self.terminator.if_false = new
+        self.succs[self.succs.index(old)] = new
+        new.preds.append(self)
+
+
+class Function(genericAST.GenericNode):
+    """
+    Control flow graph of a function in SSA form, see build_function.
+
+    values maps every SSA name to its variable. After compute_def_use,
+    defs maps the SSA names to the Phi or Instruction assigning them
+    (names without one are parameters or never assigned) and uses maps
+    them to the (user, reference) pairs reading them, the user being a
+    Phi, an Instruction or the block whose terminator reads them.
+    """
+    def __init__(self, name, params, ret_type, lineno):
+        self.name = name
+        self.params = params
+        self.ret_type = ret_type
+        self.lineno = lineno
+        self.attribute = None
+        self.memoize = False
+        self.blocks = []
+        self.entry = self.new_block()
+        self.exit = None
+        # variables by key, see FunctionBuilder
+        self.variables = dict()
+        self.values = dict()
+        self.version_counts = Counter()
+        self.temp_count = 0
+        # reachable blocks in reverse postorder
+        self.order = []
+        self.idom = dict()
+        self.defs = dict()
+        self.uses = defaultdict(list)
+        self.lowered = False
+
+    def children(self):
+        return (('params', self.params), ('ret_type', self.ret_type))
+    attr_names = ('name', )
+
+    def new_block(self):
+        block = BasicBlock(len(self.blocks))
+        self.blocks.append(block)
+        return block
+
+    def new_value(self, variable):
+        self.version_counts[variable.name] += 1
+        name = f"{RESERVED_PREFIX}_{variable.name}_{self.version_counts[variable.name]}"
+        self.values[name] = variable
+        return name
+
+    def reverse_postorder(self):
+        """
+        Blocks reachable from the entry in reverse postorder. Successors are
+        visited last to first, so that the blocks of an if or while come
+        out in source order.
+        """
+        postorder = []
+        visited = {self.entry}
+        stack = [(self.entry, iter(reversed(self.entry.succs)))]
+        while stack:
+            block, succs = stack[-1]
+            succ = next(succs, None)
+            if succ is None:
+                stack.pop()
+                postorder.append(block)
+            elif succ not in visited:
+                visited.add(succ)
+                stack.append((succ, iter(reversed(succ.succs))))
+        return postorder[::-1]
+
+    def compute_dominators(self):
+        """
+        Immediate dominators of the blocks in order, by the iterative
+        algorithm of Cooper, Harvey and Kennedy, and the preorder and
+        postorder numbers of the dominator tree used by dominates
+        """
+        number = {block: i for i, block in enumerate(self.order)}
+        idom = {self.entry: self.entry}
+
+        def intersect(a, b):
+            while a is not b:
+                while number[a] > number[b]:
+                    a = idom[a]
+                while number[b] > number[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for block in self.order[1:]:
+                new_idom = None
+                for pred in block.preds:
+                    if pred in idom:
+                        new_idom = pred if new_idom is None else intersect(pred, new_idom)
+                if idom.get(block) is not new_idom:
+                    idom[block] = new_idom
+                    changed = True
+        self.idom = idom
+
+        self.dom_children = {block: [] for block in self.order}
+        for block in self.order[1:]:
+            self.dom_children[idom[block]].append(block)
+        self.preorder, self.postorder = dict(), dict()
+        stack = [(self.entry, False)]
+        while stack:
+            block, done = stack.pop()
+            if done:
+                self.postorder[block] = len(self.postorder)
+                continue
+            self.preorder[block] = len(self.preorder)
+            stack.append((block, True))
+            stack.extend((child, False) for child in reversed(self.dom_children[block]))
+
+    def dominates(self, a, b):
+        return self.preorder[a] <= self.preorder[b] and self.postorder[b] <= self.postorder[a]
+
+    def dominance_frontiers(self):
+        frontiers = {block: [] for block in self.order}
+        for block in self.order:
+            preds = [p for p in block.preds if p in self.idom]
+            if len(preds) < 2:
+                continue
+            for pred in preds:
+                runner = pred
+                while runner is not self.idom[block]:
+                    if block not in frontiers[runner]:
+                        frontiers[runner].append(block)
+                    runner = self.idom[runner]
+        return frontiers
+
+    def place_phis(self, frontiers):
+        """
+        Semi-pruned placement: phi nodes are only added for the variables
+        read in some block before being assigned there
+        """
+        non_local = dict()
+        sites = defaultdict(dict)
+        for variable in self.variables.values():
+            if variable.param:
+                sites[variable.key][self.entry] = True
+        for block in self.order:
+            assigned = set()
+            operands = [(ins.operands(), ins.defined()) for ins in block.instructions]
+            if block.terminator is not None:
+                operands.append((references(block.terminator), None))
+            for nodes, key in operands:
+                for node in nodes:
+                    if node.value in self.variables and node.value not in assigned:
+                        non_local[node.value] = True
+                if key in self.variables:
+                    assigned.add(key)
+                    sites[key][block] = True
+        for key in non_local:
+            work = list(sites[key])
+            queued = set(work)
+            has_phi = set()
+            while work:
+                for frontier in frontiers[work.pop()]:
+                    if frontier in has_phi:
+                        continue
+                    frontier.phis.append(Phi(self.variables[key], frontier))
+                    has_phi.add(frontier)
+                    if frontier not in queued:
+                        queued.add(frontier)
+                        work.append(frontier)
+
+    def rename(self):
+        """
+        Give every assignment and phi node a new version of its variable and
+        make every reference read the version reaching it, walking the
+        dominator tree
+        """
+        stacks = {key: [] for key in self.variables}
+        for variable in self.variables.values():
+            if variable.param:
+                stacks[variable.key].append(variable.name)
+                self.values[variable.name] = variable
+
+        def current(key):
+            if stacks[key]:
+                return stacks[key][-1]
+            variable = self.variables[key]
+            if variable.undefined is None:
+                variable.undefined = self.new_value(variable)
+            return variable.undefined
+
+        def read(nodes):
+            for node in nodes:
+                if node.value in self.variables:
+                    node.value = current(node.value)
+
+        pushed = dict()
+        stack = [(self.entry, False)]
+        while stack:
+            block, done = stack.pop()
+            if done:
+                for key in pushed.pop(block):
+                    stacks[key].pop()
+                continue
+            keys = []
+            for phi in block.phis:
+                phi.name = self.new_value(phi.variable)
+                stacks[phi.variable.key].append(phi.name)
+                keys.append(phi.variable.key)
+            for ins in block.instructions:
+                read(ins.operands())
+                key = ins.defined()
+                if key in self.variables:
+                    variable = self.variables[key]
+                    # a declaration leaves the variable without a value
+                    ins.stm.name = self.new_value(variable)
+                    stacks[key].append(ins.stm.name)
+                    keys.append(key)
+            if block.terminator is not None:
+                read(references(block.terminator))
+            for succ in block.succs:
+                for phi in succ.phis:
+                    phi.args[block] = genericAST.Constant(genericAST.Type("id"), current(phi.variable.key), 0)
+            pushed[block] = keys
+            stack.append((block, True))
+            stack.extend((child, False) for child in reversed(self.dom_children[block]))
+        for block in self.order:
+            block.instructions = [ins for ins in block.instructions
+                                  if not isinstance(ins.stm, genericAST.VariableDeclaration)]
+
+    def construct(self):
+        self.order = self.reverse_postorder()
+        self.compute_dominators()
+        self.place_phis(self.dominance_frontiers())
+        self.rename()
+
+    def compute_def_use(self):
+        self.defs = dict()
+        self.uses = defaultdict(list)
+        for block in self.order:
+            for phi in block.phis:
+                self.defs[phi.name] = phi
+                self.add_uses(phi, phi.operands())
+            for ins in block.instructions:
+                if ins.defined() in self.values:
+                    self.defs[ins.defined()] = ins
+                self.add_uses(ins, ins.operands())
+            if block.terminator is not None:
+                self.add_uses(block, references(block.terminator))
+
+    def add_uses(self, user, nodes):
+        for node in nodes:
+            if node.const_type.name == "id" and node.value in self.values:
+                self.uses[node.value].append((user, node))
+
+    def split_edge(self, pred, succ):
+        """
+        Insert an empty block on the edge from pred to succ and return it
+        """
+        middle = self.new_block()
+        pred.retarget(succ, middle)
+        succ.preds[succ.preds.index(pred)] = middle
+        middle.succs.append(succ)
+        middle.terminator = Jump(succ)
+        for phi in succ.phis:
+            phi.args[middle] = phi.args.pop(pred)
+        return middle
+
+    def sequentialize(self, copies):
+        """
+        Assignments performing the parallel copies [(name, reference)] one
+        after the other. Copies in a cycle go through a temporary.
+        """
+        pending = [(name, node.const_type, node.value) for name, node in copies
+                   if not (node.const_type.name == "id" and node.value == name)]
+        stms = []
+        while pending:
+            sources = {value for (_, const_type, value) in pending if const_type.name == "id"}
+            ready = [c for c in pending if c[0] not in sources]
+            if not ready:
+                name = pending[0][0]
+                temp = f"{RESERVED_PREFIX}_phi{self.temp_count}"
+                self.temp_count += 1
+                self.values[temp] = self.values[name]
+                stms.append(genericAST.AssignStm(temp, genericAST.Constant(genericAST.Type("id"), name, 0), 0))
+                pending = [(n, t, temp if t.name == "id" and v == name else v) for (n, t, v) in pending]
+                continue
+            for (name, const_type, value) in ready:
+                stms.append(genericAST.AssignStm(name, genericAST.Constant(const_type, value, 0), 0))
+            pending = [c for c in pending if c[0] in sources]
+        return stms
+
+    def destruct_phis(self):
+        """
+        Replace the phi nodes by copies at the end of the predecessors of
+        their block. Edges from blocks with several successors are split
+        first, so that the copies only run on the way to the phi nodes.
+        """
+        for block in self.reverse_postorder():
+            if not block.phis:
+                continue
+            for pred in list(block.preds):
+                copies = [(phi.name, phi.args[pred]) for phi in block.phis]
+                if len(pred.succs) > 1:
+                    pred = self.split_edge(pred, block)
+                pred.instructions.extend(Instruction(stm, pred) for stm in self.sequentialize(copies))
+            block.phis = []
+
+    def declarations(self, order):
+        used = set()
+        for block in order:
+            for ins in block.instructions:
+                used.add(ins.defined())
+                used.update(node.value for node in ins.operands())
+            if block.terminator is not None:
+                used.update(node.value for node in references(block.terminator))
+        return [genericAST.VariableDeclaration(name, variable.var_type, self.lineno)
+                for name, variable in self.values.items()
+                if name in used and not (variable.param and name == variable.name)]
+
+    def lower(self, count_loops):
+        """
+        Statements of the function once out of SSA form, with a label for
+        every block that is jumped to. Jumps to the block laid out next are
+        left out. With count_loops, the bodies of while loops count their
+        iterations.
+        """
+        if not self.lowered:
+            self.destruct_phis()
+            self.lowered = True
+        order = [block for block in self.reverse_postorder() if block is not self.exit]
+        if self.exit.preds:
+            order.append(self.exit)
+        targets = set()
+        blocks = []
+        for i, block in enumerate(order):
+            following = order[i + 1] if i + 1 < len(order) else None
+            stms = [ins.stm for ins in block.instructions]
+            terminator = block.terminator
+            if isinstance(terminator, Jump):
+                if terminator.target is not following:
+                    stms.append(Goto(terminator.target.label))
+                    targets.add(terminator.target)
+            elif isinstance(terminator, Branch):
+                if terminator.if_true is following:
+                    negated = genericAST.UnaryOperation("not", terminator.cond, terminator.lineno)
+                    stms.append(Goto(terminator.if_false.label, negated, terminator.lineno))
+                    targets.add(terminator.if_false)
+                else:
+                    stms.append(Goto(terminator.if_true.label, terminator.cond, terminator.lineno))
+                    targets.add(terminator.if_true)
+                    if terminator.if_false is not following:
+                        stms.append(Goto(terminator.if_false.label))
+                        targets.add(terminator.if_false)
+            elif terminator is not None:
+                stms.append(terminator)
+            if count_loops and block.loop_line is not None:
+                stms.insert(0, LoopCounter(block.loop_line))
+            blocks.append((block, stms))
+        statements = self.declarations(order)
+        for block, stms in blocks:
+            if block in targets:
+                statements.append(Label(block.label))
+            statements.extend(stms)
+        return statements
+
+    def to_c_node(self, ctx) -> cAST.FunctionDeclaration:
+        outer = ctx.temp_counters, ctx.function_name
+        ctx.temp_counters, ctx.function_name = dict(), self.name
+        body = genericAST.StmList(self.lower(ctx.options.instrument), self.lineno).to_c_node(ctx)
+        function = cAST.FunctionDeclaration(self.name, self.params.to_c_node(ctx), self.ret_type.to_c_node(ctx),
+                                            body, self.lineno, profile=ctx.options.instrument,
+                                            attribute=self.attribute, memoize=self.memoize)
+        ctx.temp_counters, ctx.function_name = outer
+        return function
+
+    def __str__(self):
+        params = ", ".join(p.name for p in (self.params.params if self.params else None) or ())
+        lines = [f"{self.name}({params}):"]
+        for block in self.order:
+            lines.append(f"{block.label}: preds {' '.join(p.label for p in block.preds)}")
+            for phi in block.phis:
+                args = ", ".join(f"{p.label}: {expression_text(v)}" for p, v in phi.args.items())
+                lines.append(f"    {phi.name} = phi({args})")
+            for ins in block.instructions:
+                if isinstance(ins.stm, genericAST.AssignStm):
+                    lines.append(f"    {ins.stm.name} = {expression_text(ins.stm.expr)}")
+                else:
+                    lines.append(f"    {expression_text(ins.stm)}")
+            terminator = block.terminator
+            if isinstance(terminator, Jump):
+                lines.append(f"    goto {terminator.target.label}")
+            elif isinstance(terminator, Branch):
+                lines.append(f"    if {expression_text(terminator.cond)} goto {terminator.if_true.label} "
+                             f"else {terminator.if_false.label}")
+            elif terminator is not None:
+                lines.append(f"    return {expression_text(terminator.expr)}")
+        return "\n".join(lines)
+
+
+class FunctionBuilder(object):
+    """
+    Builds the control flow graph of a genericAST function. References to
+    locals and parameters are resolved through the nested scopes of the
+    function and replaced by the key of their Variable, ready for renaming.
+    """
+
+    def __init__(self, function: genericAST.FunctionDeclaration):
+        self.function = function
+        self.ssa = Function(function.name, function.params, function.ret_type, function.lineno)
+        self.ssa.attribute = function.attribute
+        self.ssa.memoize = function.memoize
+        self.scopes = [dict()]
+
+    def declare(self, name, var_type, param=False):
+        variable = Variable(name, var_type, f"{name}#{len(self.ssa.variables)}", param)
+        self.ssa.variables[variable.key] = variable
+        self.scopes[-1][name] = variable
+
+    def resolve(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def bind(self, node):
+        variable = self.resolve(node.value)
+        if variable is None:
+            return node
+        return genericAST.Constant(genericAST.Type("id"), variable.key, node.lineno)
+
+    def expression(self, node):
+        return replace_references(node, self.bind) if node is not None else None
+
+    def statements(self, stm_list, block):
+        """
+        Add stm_list to the graph from block on, returning the block where
+        control continues after it, None if it always returns
+        """
+        self.scopes.append(dict())
+        for stm in (stm_list.stmt_lst if stm_list else None) or ():
+            block = self.statement(stm, block)
+            if block is None:
+                break
+        self.scopes.pop()
+        return block
+
+    def statement(self, stm, block):
+        if isinstance(stm, genericAST.VariableDeclaration):
+            self.declare(stm.name, stm.var_type)
+            block.append(genericAST.VariableDeclaration(self.resolve(stm.name).key, stm.var_type, stm.lineno))
+        elif isinstance(stm, genericAST.AssignStm):
+            stm.expr = self.expression(stm.expr)
+            target = self.resolve(stm.name)
+            if target is not None:
+                stm.name = target.key
+            block.append(stm)
+        elif isinstance(stm, genericAST.FunctionCall):
+            block.append(self.expression(stm))
+        elif isinstance(stm, genericAST.RetStm):
+            stm.expr = self.expression(stm.expr)
+            block.terminator = stm
+            return None
+        elif isinstance(stm, genericAST.IfStm):
+            return self.if_statement(stm, block)
+        elif isinstance(stm, genericAST.WhileStm):
+            if stm.parallel is not None:
+                raise SSAError("parallel loops have no SSA form")
+            header, body, after = self.ssa.new_block(), self.ssa.new_block(), self.ssa.new_block()
+            block.jump(header)
+            header.branch(self.expression(stm.cond), body, after, stm.lineno)
+            body.loop_line = stm.lineno
+            end = self.statements(stm.body, body)
+            if end is not None:
+                end.jump(header)
+            return after
+        else:
+            raise SSAError(f"{type(stm).__name__} has no SSA form")
+        return block
+
+    def if_statement(self, stm, block):
+        then = self.ssa.new_block()
+        if stm.else_branch is None:
+            join = self.ssa.new_block()
+            block.branch(self.expression(stm.cond), then, join, stm.lineno)
+            ends = [self.statements(stm.body, then)]
+        else:
+            other = self.ssa.new_block()
+            block.branch(self.expression(stm.cond), then, other, stm.lineno)
+            ends = [self.statements(stm.body, then)]
+            if isinstance(stm.else_branch, genericAST.IfStm):
+                ends.append(self.if_statement(stm.else_branch, other))
+            else:
+                ends.append(self.statements(stm.else_branch.body, other))
+            ends = [end for end in ends if end is not None]
+            if not ends:
+                return None
+            join = self.ssa.new_block()
+        for end in ends:
+            if end is not None:
+                end.jump(join)
+        return join
+
+    def build(self) -> Function:
+        for param in (self.function.params.params if self.function.params else None) or ():
+            self.declare(param.name, param.param_type, param=True)
+        end = self.statements(copy.deepcopy(self.function.body), self.ssa.entry)
+        self.ssa.exit = self.ssa.new_block()
+        if end is not None:
+            end.jump(self.ssa.exit)
+        return self.ssa
+
+
+class CopyPropagation(object):
+    """
+    Replaces the uses of x = y and x = constant by y or the constant and
+    removes the copy, then removes the phi nodes joining a single value.
+    Only int and bool constants are propagated, since a string constant
+    allocates a new string wherever it appears.
+    """
+    name = "copy propagation"
+
+    def propagated(self, function, expr):
+        if not isinstance(expr, genericAST.Constant):
+            return False
+        if expr.const_type.name == "id":
+            return expr.value in function.values
+        return expr.const_type.name in ("int", "bool")
+
+    def run(self, function, report):
+        replacement = dict()
+
+        def resolve(value):
+            path = []
+            while value[0].name == "id" and value[1] in replacement:
+                path.append(value[1])
+                value = replacement[value[1]]
+            # shorten the chains, e.g. of phi nodes replaced one by the next
+            for name in path:
+                replacement[name] = value
+            return value
+
+        removed = set()
+        for block in function.order:
+            for ins in block.instructions:
+                stm = ins.stm
+                if (isinstance(stm, genericAST.AssignStm) and stm.name in function.values
+                        and self.propagated(function, stm.expr)):
+                    replacement[stm.name] = (stm.expr.const_type, stm.expr.value)
+                    removed.add(ins)
+
+        work = [phi for block in function.order for phi in block.phis]
+        while work:
+            phi = work.pop()
+            if phi in removed:
+                continue
+            value = None
+            for node in phi.operands():
+                arg = resolve((node.const_type, node.value))
+                if arg == (genericAST.Type("id"), phi.name):
+                    continue
+                if value is not None and arg != value:
+                    value = None
+                    break
+                value = arg
+            if value is None:
+                continue
+            replacement[phi.name] = value
+            removed.add(phi)
+            work.extend(user for (user, _) in function.uses[phi.name] if isinstance(user, Phi))
+
+        for name in replacement:
+            for (_, node) in function.uses[name]:
+                node.const_type, node.value = resolve((node.const_type, node.value))
+        for block in function.order:
+            block.phis = [phi for phi in block.phis if phi not in removed]
+            block.instructions = [ins for ins in block.instructions if ins not in removed]
+        report["ssa copies propagated"] += len(removed)
+
+
+class LoopInvariantCodeMotion(object):
+    """
+    Moves the assignments computing the same value in every iteration of a
+    loop to the block before its header. Only arithmetic other than
+    division and comparisons of constants and of values assigned outside
+    the loop are moved: they cannot fail, so computing them when the loop
+    runs no iteration is harmless.
+    """
+    name = "loop invariant code motion"
+    OPS = (ARITHMETIC_OPS - {'/', '//', '%'}) | COMPARISON_OPS | SHORT_CIRCUIT_OPS
+
+    def loops(self, function):
+        """
+        Blocks of the natural loop of every header, smallest loops first
+        """
+        bodies = dict()
+        for block in function.order:
+            for succ in block.succs:
+                if function.dominates(succ, block):
+                    body = bodies.setdefault(succ, {succ})
+                    work = [block]
+                    while work:
+                        member = work.pop()
+                        if member not in body:
+                            body.add(member)
+                            work.extend(member.preds)
+        return sorted(bodies.items(), key=lambda loop: len(loop[1]))
+
+    def invariant(self, function, expr, body):
+        if isinstance(expr, genericAST.Constant):
+            if expr.const_type.name != "id":
+                return True
+            if expr.value not in function.values:
+                # globals may change in the loop
+                return False
+            definition = function.defs.get(expr.value)
+            return definition is None or definition.block not in body
+        if isinstance(expr, genericAST.BinaryOperation) and expr.op in self.OPS:
+            return self.invariant(function, expr.left, body) and self.invariant(function, expr.right, body)
+        if isinstance(expr, genericAST.UnaryOperation):
+            return self.invariant(function, expr.expr, body)
+        return False
+
+    def run(self, function, report):
+        position = {block: i for i, block in enumerate(function.order)}
+        for header, body in self.loops(function):
+            outside = [pred for pred in header.preds if pred not in body]
+            if len(outside) != 1 or len(outside[0].succs) != 1:
+                continue
+            preheader = outside[0]
+            # in reverse postorder assignments are moved before their uses
+            for block in sorted(body, key=position.get):
+                kept = []
+                for ins in block.instructions:
+                    stm = ins.stm
+                    if (isinstance(stm, genericAST.AssignStm) and stm.name in function.values
+                            and self.invariant(function, stm.expr, body)):
+                        preheader.instructions.append(ins)
+                        ins.block = preheader
+                        report["ssa instructions hoisted"] += 1
+                    else:
+                        kept.append(ins)
+                block.instructions = kept
+
+
+class DeadCodeElimination(object):
+    """
+    Removes the assignments and phi nodes whose value is never used.
+    Assignments with side effects, see has_side_effects, are kept.
+    """
+    name = "dead code elimination"
+
+    def run(self, function, report):
+        live = set()
+        work = []
+
+        def mark(nodes):
+            for node in nodes:
+                definition = function.defs.get(node.value) if node.const_type.name == "id" else None
+                if definition is not None and definition not in live:
+                    live.add(definition)
+                    work.append(definition)
+
+        for block in function.order:
+            for ins in block.instructions:
+                if ins.defined() not in function.values or has_side_effects(ins.stm):
+                    live.add(ins)
+                    work.append(ins)
+            if block.terminator is not None:
+                mark(references(block.terminator))
+        while work:
+            mark(work.pop().operands())
+
+        for block in function.order:
+            removed = len(block.phis) + len(block.instructions)
+            block.phis = [phi for phi in block.phis if phi in live]
+            block.instructions = [ins for ins in block.instructions if ins in live]
+            report["ssa dead instructions removed"] += removed - len(block.phis) - len(block.instructions)
+
+
+class PassManager(object):
+    """
+    Runs passes in order over SSA functions. A pass is an object with a
+    name and a run(function, report) method, which may change the function
+    freely: the def-use chains are rebuilt before each pass.
+    """
+
+    def __init__(self, passes, report=None):
+        self.passes = list(passes)
+        self.report = report if report is not None else Counter()
+
+    def add(self, ssa_pass):
+        self.passes.append(ssa_pass)
+
+    def run(self, function: Function):
+        for ssa_pass in self.passes:
+            function.compute_def_use()
+            ssa_pass.run(function, self.report)
+        return function
+
+
+def default_passes():
+    return [CopyPropagation(), LoopInvariantCodeMotion(), DeadCodeElimination()]
+
+
+def build_function(function: genericAST.FunctionDeclaration) -> Function:
+    """
+    SSA form of function, which is left untouched. Raises SSAError for
+    functions without one, i.e. containing nested functions or parallel loops.
+    """
+    ssa = FunctionBuilder(function).build()
+    ssa.construct()
+    return ssa
+
+
+def optimize_function(function: genericAST.FunctionDeclaration, report=None) -> genericAST.GenericNode:
+    """
+    SSA form of function after the default passes, to be lowered with
+    to_c_node, or function itself if it has no SSA form
+    """
+    try:
+        ssa = build_function(function)
+    except SSAError:
+        return function
+    PassManager(default_passes(), report).run(ssa)
+    return ssa
+
+
+def optimize_program(program: genericAST.Program, report=None):
+    report = report if report is not None else Counter()
+    functions = program.functions.functions
+    for i, function in enumerate(functions):
+        if isinstance(function, genericAST.FunctionDeclaration):
+            functions[i] = optimize_function(function, report)
+    return report
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 
-import json
+import io
+from collections import Counter
+from functools import partial
 import genericAST
-
-return_stack = []
+import genericOptimizer
+import genericSSA
+from astSerializer import JSONWriter, attribute_value
+from compilationContext import CompilationContext, CompilerOptions
 
 class Node:
     """
@@ -33,14 +37,15 @@ class Node:
 
 
 class FuncDecl(Node):
-    def __init__(self, name, params, ret_type, body, lineno):
+    def __init__(self, name, params, ret_type, body, lineno, ret_stms=None):
         self.name = name
         self.params = params
         self.ret_type = ret_type
         self.body = body
         self.lineno = lineno
-        self.ret_stms = return_stack[:]
-        return_stack.clear()
+        if ret_stms is None:
+            ret_stms = []
+        self.ret_stms = ret_stms
 
     def children(self):
         nodelist = [
@@ -56,10 +61,15 @@ class FuncDecl(Node):
 
 
 class FuncCall(Node):
+    """
+    builtin is the overload of the builtin called, set by the type checker,
+    see pythonSymbolTable.BUILTINS
+    """
     def __init__(self, name, params, lineno):
         self.name = name
         self.params = params
         self.lineno = lineno
+        self.builtin = None
 
     def children(self):
         nodelist = []
@@ -68,7 +78,10 @@ class FuncCall(Node):
         return tuple(nodelist)
 
     def to_generic_node(self) -> genericAST.FunctionCall:
-        return default_conversion(self, genericAST.FunctionCall)
+        if self.builtin is None:
+            return genericAST.FunctionCall(self.name, self.params.to_generic_node(), self.lineno)
+        params = ExprList(self.builtin.arguments(self.params.exprs or [], self.lineno), self.params.lineno)
+        return genericAST.FunctionCall(self.builtin.c_name, params.to_generic_node(), self.lineno)
     attr_names = ('name', )
 
 
@@ -172,7 +185,8 @@ class IfStm(Node):
 
 
 class ElifBlock(IfStm):
-    pass
+    def to_generic_node(self) -> genericAST.ElifBlock:
+        return default_conversion(self, genericAST.ElifBlock)
 
 
 class ElseBlock(Node):
@@ -212,7 +226,6 @@ class RetStm(Node):
     def __init__(self, expr, lineno):
         self.expr = expr
         self.lineno = lineno
-        return_stack.append(self)
 
     def children(self):
         return (('expr', self.expr),)
@@ -235,7 +248,7 @@ class Constant(Node):
     def to_generic_node(self) -> genericAST.Constant:
         return default_conversion(self, genericAST.Constant)
 
-    attr_names = ('type', 'value', )
+    attr_names = ('const_type', 'value', )
 
 
 class BinOp(Node):
@@ -332,11 +345,11 @@ class Slice(Node):
         self.expr = expr
         self.end = end
         if start is None:
-            self.start = Constant(Type('int'), 0)
+            self.start = SLICE_START
         if step is None:
-            self.step = Constant(Type('int'), 1)
+            self.step = SLICE_STEP
         if end is None:
-            self.end = Constant(Type('int'), 2147483647)
+            self.end = SLICE_END
         self.lineno = lineno
 
     def children(self):
@@ -354,9 +367,30 @@ class Slice(Node):
     attr_names = ()
 
 class Type(Node):
+    """
+    Types are hash-consed: Type(name) always returns the one shared, immutable
+    instance for that name, so two types are equal exactly when they are identical.
+    """
+    _interned = dict()
+
+    def __new__(cls, name, lineno=0):
+        t = cls._interned.get(name)
+        if t is None:
+            t = super().__new__(cls)
+            object.__setattr__(t, 'name', name)
+            object.__setattr__(t, 'lineno', 0)
+            # setdefault keeps a single instance if two threads race here
+            t = cls._interned.setdefault(name, t)
+        return t
+
     def __init__(self, name, lineno=0):
-        self.name = name
-        self.lineno = lineno
+        pass
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("Type instances are shared and cannot be modified")
+
+    def __reduce__(self):
+        return (self.__class__, (self.name,))
 
     def children(self):
         nodelist = []
@@ -367,6 +401,12 @@ class Type(Node):
     attr_names = ('name', )
 
 
+# Default slice bounds, shared by every Slice since constants are never modified
+SLICE_START = Constant(Type('int'), 0)
+SLICE_STEP = Constant(Type('int'), 1)
+SLICE_END = Constant(Type('int'), 2147483647)
+
+
 class NodeVisitor(object):
     """
     A base NodeVisitor class for visiting MiniJava nodes.
@@ -393,11 +433,15 @@ class NodeVisitor(object):
               useful when debugging your project
         """
         lead = ' ' * offset
+        if not isinstance(node, Node):
+            # e.g. the ";" the parser keeps for an empty statement
+            print(f"{lead}{node!r}")
+            return
 
         output = f"{lead}{node.lineno} {node.__class__.__name__}: "
 
         if node.attr_names:
-            vlist = [(n, getattr(node, n)) for n in node.attr_names]
+            vlist = [(n, attribute_value(node, n)) for n in node.attr_names]
             output += ', '.join('%s = %s' % v for v in vlist)
 
         print(output)
@@ -406,29 +450,19 @@ class NodeVisitor(object):
             self.visit(child, offset=offset + 2)
 
     def toJSON(self, node):
-        return json.dumps(self._toJSON(node), indent=4)
-
-    def _toJSON(self, node):
-        output = {}
-        output['node_class'] = node.__class__.__name__
-        output['lineno'] = node.lineno
-
-        if node.attr_names:
-            output['attributes'] = {}
-            for n in node.attr_names:
-                output['attributes'][n] = getattr(node, n)
-
-        children = node.children()
-        if children and len(children) > 0:
-            output['children'] = {}
-            for (child_name, child) in node.children():
-                output['children'][child_name] = self._toJSON(child)
+        out = io.StringIO()
+        self.writeJSON(node, out)
+        return out.getvalue()
 
-        return output
+    def writeJSON(self, node, out):
+        """
+        Write node as indented JSON to out as it is traversed, see astSerializer.JSONWriter
+        """
+        JSONWriter(out).write(node)
 
 
 def default_conversion(node: Node, genericNodeClass) -> genericAST.GenericNode:
-    kwargs = node.__dict__
+    kwargs = dict(node.__dict__)
     for k, v in kwargs.items():
         if isinstance(v, Node):
             kwargs[k] = v.to_generic_node()
@@ -438,13 +472,46 @@ def default_conversion(node: Node, genericNodeClass) -> genericAST.GenericNode:
     return genericNodeClass(**kwargs)
 
 
-def python_ast_to_generic(root):
+def emit_function(function: FuncDecl, options: CompilerOptions=None, global_types=None):
+    """
+    Lower a type checked function all the way to C code. Functions do not
+    depend on each other once type checked, so this runs on worker processes.
+    Returns the prototype, the code and the report of the optimization
+    passes, which need the type names of the globals.
+    """
+    options = options if options is not None else CompilerOptions()
+    generic_function = function.to_generic_node()
+    report = Counter()
+    if options.optimize:
+        genericOptimizer.optimize_function(generic_function, global_types, report)
+    if options.ssa:
+        generic_function = genericSSA.optimize_function(generic_function, report)
+    c_function = generic_function.to_c_node(CompilationContext(options))
+    return c_function.prototype(), c_function.to_code(), report
+
+
+def python_ast_to_generic(root, pool=None, options: CompilerOptions=None, report: Counter=None):
+    """
+    Convert the python tree into a generic Program. Given a process pool
+    of options.function_workers processes, functions are lowered and
+    emitted concurrently on it instead, and enter the Program as already
+    emitted code in their original order, lowered according to options.
+    Their optimization reports are added to report.
+    """
     generic_root = genericAST.Program(lineno=root.lineno)
-    for (_, statement) in root.children():
-        if isinstance(statement, DeclStm):
-            generic_root.add_variable(statement.to_generic_node())
-        elif isinstance(statement, FuncDecl):
-            generic_root.add_function(statement.to_generic_node())
+    statements = [statement for (_, statement) in root.children()]
+    if pool is not None:
+        functions = [s for s in statements if isinstance(s, FuncDecl)]
+        global_types = {s.name: s.var_type.name for s in statements if isinstance(s, DeclStm)}
+        chunksize = len(functions) // (4 * max(options.function_workers, 1)) + 1
+        emitted = iter(pool.map(partial(emit_function, options=options, global_types=global_types),
+                                functions, chunksize=chunksize))
+    for statement in statements:
+        if pool is not None and isinstance(statement, FuncDecl):
+            prototype, code, function_report = next(emitted)
+            if report is not None:
+                report.update(function_report)
+            generic_root.add_function(genericAST.EmittedFunction(code, statement.lineno, prototype))
         else:
-            generic_root.main_stms.stmt_lst.append(statement.to_generic_node())
+            generic_root.add_statement(statement.to_generic_node())
     return generic_root
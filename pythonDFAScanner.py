@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Hand-written scanner for the tokens of pythonScanner, used by pythonParser
+instead of the PLY lexer. It is a DFA over the source string: the first
+character of a token selects its class in CHAR_CLASSES, and the class
+consumes the rest of the token in a single loop (names, numbers, the
+newline runs), a single lookup (operators, where the two character ones
+win as in PLY) or a single find (strings).
+
+It produces the same tokens, line numbers and positions as
+pythonScanner.pythonLexer, including its corner cases: strings may span
+lines without counting them, a quote without a closing one is a
+QUOTATION, and illegal characters are reported and skipped. Tokens are
+slotted Token objects rather than LexTokens, and the lexer records the
+offset at which every line of its input starts, see column.
+"""
+
+import argparse
+from bisect import bisect_right
+from pythonScanner import tokens, reserved
+
+OPERATORS = {'+': 'PLUS', '-': 'MINUS', '*': 'TIMES', '/': 'DIVIDE', '%': 'MOD', '<': 'LESS', '>': 'GREATER',
+             ':': 'COLON', ',': 'COMMA', ';': 'SEMICO', '.': 'PERIOD', '=': 'EQ', '(': 'LPAREN', ')': 'RPAREN',
+             '[': 'LBRACK', ']': 'RBRACK', '{': 'LCBRACK', '}': 'RCBRACK'}
+TWO_CHAR_OPERATORS = {'//': 'INTDIVIDE', '<=': 'LESSEQ', '->': 'ARROW', '>=': 'GREATEREQ', '==': 'EQOP',
+                      '!=': 'NEQ'}
+
+# runs of spaces and name characters are measured by stripping them from
+# a window of this many characters, in a single call
+WINDOW = 32
+# character classes of the first character of a token
+SPACE, NAME, DIGIT, NEWLINE, OPERATOR, QUOTE = range(6)
+NAME_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_0123456789"
+SPACE_CHARS = " \t"
+CHAR_CLASSES = dict.fromkeys(set(NAME_CHARS) - set("0123456789"), NAME)
+CHAR_CLASSES.update(dict.fromkeys("0123456789", DIGIT))
+CHAR_CLASSES.update(dict.fromkeys(SPACE_CHARS, SPACE))
+CHAR_CLASSES.update(dict.fromkeys(set(OPERATORS) | {'!'}, OPERATOR))
+CHAR_CLASSES['\n'] = NEWLINE
+CHAR_CLASSES['"'] = QUOTE
+
+
+def run_end(data, pos, chars):
+    """
+    End of the run of chars starting at pos in data
+    """
+    while True:
+        window = data[pos:pos + WINDOW]
+        rest = len(window.lstrip(chars))
+        pos += len(window) - rest
+        if rest or len(window) < WINDOW:
+            return pos
+
+
+class Token(object):
+    """
+    A token with the attributes of a PLY LexToken, and printed like one
+    """
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer', 'endlineno', 'endlexpos')
+
+    def __init__(self, type, value, lineno, lexpos):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __str__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+    __repr__ = __str__
+
+
+class DFALexer(object):
+    """
+    Lexer with the interface yacc expects: input, token, and the lineno
+    and lexpos of the last token read. Like PLY, input keeps counting lines
+    from where the previous input ended. token is the __next__ method of
+    the generator scanning the input, which returns None once it is read.
+    """
+
+    def __init__(self, lineno=1):
+        self.tokens = tokens
+        self.lineno = lineno
+        self.lexpos = 0
+        self.data = ""
+        # offsets of the lines of data, the first one starting at 0
+        self.line_starts = [0]
+        self.token = self.scan().__next__
+
+    def clone(self):
+        return DFALexer(self.lineno)
+
+    def input(self, data):
+        self.data = data
+        self.lexpos = 0
+        self.line_starts = [0]
+        self.token = self.scan().__next__
+
+    def column(self, lexpos):
+        """
+        Column of lexpos in its line of the current input, starting at 1
+        """
+        return lexpos - self.line_starts[bisect_right(self.line_starts, lexpos) - 1] + 1
+
+    def scan(self):
+        data = self.data
+        n = len(data)
+        pos = 0
+        lineno = self.lineno
+        line_starts = self.line_starts
+        classes = CHAR_CLASSES
+        while pos < n:
+            char = data[pos]
+            kind = classes.get(char)
+            if kind == SPACE:
+                window = data[pos:pos + WINDOW]
+                pos += len(window) - len(window.lstrip(SPACE_CHARS))
+                continue
+            if kind == NAME:
+                window = data[pos:pos + WINDOW]
+                end = pos + len(window) - len(window.lstrip(NAME_CHARS))
+                if end - pos == WINDOW:
+                    end = run_end(data, end, NAME_CHARS)
+                value = data[pos:end]
+                token = Token(reserved.get(value, 'ID'), value, lineno, pos)
+            elif kind == OPERATOR:
+                value = data[pos:pos + 2]
+                token_type = TWO_CHAR_OPERATORS.get(value)
+                if token_type is not None:
+                    end = pos + 2
+                elif char in OPERATORS:
+                    end = pos + 1
+                    token_type, value = OPERATORS[char], char
+                else:
+                    self.illegal(char)
+                    pos += 1
+                    continue
+                token = Token(token_type, value, lineno, pos)
+            elif kind == NEWLINE:
+                while pos < n and data[pos] == '\n':
+                    pos += 1
+                    lineno += 1
+                    line_starts.append(pos)
+                self.lineno = lineno
+                if pos < n and data[pos] in SPACE_CHARS:
+                    window = data[pos:pos + WINDOW]
+                    pos += len(window) - len(window.lstrip(SPACE_CHARS))
+                continue
+            elif kind == DIGIT or kind is None and char.isdecimal():
+                # \d of PLY's rule also matches the other Unicode digits
+                end = pos + 1
+                while end < n and data[end].isdecimal():
+                    end += 1
+                token = Token('DECIMAL', int(data[pos:end]), lineno, pos)
+            elif kind == QUOTE:
+                end = data.find('"', pos + 1) + 1
+                if end:
+                    token = Token('STRING', data[pos + 1:end - 1], lineno, pos)
+                else:
+                    end = pos + 1
+                    token = Token('QUOTATION', char, lineno, pos)
+            else:
+                self.illegal(char)
+                pos += 1
+                continue
+            pos = self.lexpos = end
+            self.lineno = lineno
+            yield token
+        # PLY leaves lexpos one past the end of its input
+        self.lexpos = pos + 1
+        self.lineno = lineno
+        while True:
+            yield None
+
+    def illegal(self, char):
+        print("Illegal character '%s'" % char)
+
+    def test(self, data):
+        self.input(data)
+        while True:
+            tok = self.token()
+            if not tok:
+                break
+            print(tok)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Take in the python source code and perform lexical analysis.')
+    parser.add_argument('FILE', help="Input file with python source code")
+    args = parser.parse_args()
+
+    with open(args.FILE, 'r') as f:
+        data = f.read()
+
+    DFALexer().test(data)
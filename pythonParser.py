@@ -1,13 +1,47 @@
 #!/usr/bin/env python3
 
 import argparse
+import copy
 import os
+import re
 import shutil
 from ply import yacc
 import pythonAST as ast
+import astSerializer
+from compilationContext import CompilationContext
 
 # Get the token map from the lexer. This is required.
 from pythonScanner import tokens, pythonLexer
+from pythonDFAScanner import DFALexer
+
+# Tokens that decide where a top level statement ends, see split_statements
+STATEMENT_DELIMITERS = re.compile(rb'"[^"]*"|[{};]')
+ELSE_CONTINUATION = re.compile(rb'\s*(elif|else)\b')
+
+
+def split_statements(source):
+    """
+    Yield the (start, end) offsets of the top level statements in source,
+    a bytes-like buffer such as a memory-mapped file. A statement ends at a
+    semicolon or closing brace outside of any braces, unless the closing
+    brace is followed by an elif or else block.
+    """
+    depth = 0
+    start = 0
+    for m in STATEMENT_DELIMITERS.finditer(source):
+        delimiter = source[m.start()]
+        if delimiter == ord('{'):
+            depth += 1
+        elif delimiter == ord('}'):
+            depth = max(depth - 1, 0)
+            if depth == 0 and not ELSE_CONTINUATION.match(source, m.end()):
+                yield start, m.end()
+                start = m.end()
+        elif delimiter == ord(';') and depth == 0:
+            yield start, m.end()
+            start = m.end()
+    if start < len(source):
+        yield start, len(source)
 
 
 class pythonParser:
@@ -44,7 +78,8 @@ class pythonParser:
         if len(p) == 2:
             p[0] = [p[1]]
         else:
-            p[0] = p[1] + [p[2]]
+            p[1].append(p[2])
+            p[0] = p[1]
 
     def p_stm(self, p):
         '''
@@ -109,6 +144,7 @@ class pythonParser:
         ret_stm : RETURN expr
         '''
         p[0] = ast.RetStm(p[2], p.lineno(1))
+        p.parser.ctx.return_stack.append(p[0])
 
     def p_brackets_expr(self, p):
         '''
@@ -201,6 +237,12 @@ class pythonParser:
         '''
         p[0] = ast.Index(p[1], p[3], p[5], p.lineno(1))
 
+    def p_conversion(self, p):
+        '''
+        expr : type LPAREN expr RPAREN
+        '''
+        p[0] = ast.FuncCall(p[1].name, ast.ExprList([p[3]], p.lineno(2)), p.lineno(2))
+
     def p_slice_expression(self, p):
         '''
         expr : expr LBRACK slice RBRACK
@@ -242,13 +284,15 @@ class pythonParser:
         if (len(p) == 2):
             p[0] = [p[1]]
         else:
-            p[0] = p[1] + [p[3]]
+            p[1].append(p[3])
+            p[0] = p[1]
 
     def p_func_decl(self, p):
         '''
         func_decl : DEF ID LPAREN func_params_or_empty RPAREN ARROW type COLON body
         '''
-        p[0] = ast.FuncDecl(p[2], p[4], p[7], p[9], p.lineno(1))
+        p[0] = ast.FuncDecl(p[2], p[4], p[7], p[9], p.lineno(1),
+                            p.parser.ctx.drain_return_stack())
 
     def p_func_params_or_empty(self, p):
         '''
@@ -265,7 +309,8 @@ class pythonParser:
         if len(p) == 2:
             p[0] = [p[1]]
         else:
-            p[0] = p[1] + [p[3]]
+            p[1].append(p[3])
+            p[0] = p[1]
 
     def p_func_param(self, p):
         '''
@@ -295,20 +340,77 @@ class pythonParser:
         pass
 
     def p_error(self, p):
+        # Only reached when self.parser is used directly, parse() routes
+        # syntax errors to the compilation context instead
         print("Syntax error at token", p)
 
-    def build(self, **kwargs):
+    def build(self, ply_lexer=False, **kwargs):
+        """
+        Build the parser tables. Sources are scanned by the DFALexer of
+        pythonDFAScanner, or by the PLY lexer of pythonScanner if ply_lexer
+        is set, both producing the same tokens.
+        """
         self.tokens = tokens
-        self.lexer = pythonLexer()
-        self.lexer.build()
+        if ply_lexer:
+            self.lexer = pythonLexer()
+            self.lexer.build()
+            self.lexer = self.lexer.lexer
+        else:
+            self.lexer = DFALexer()
         self.parser = yacc.yacc(module=self, **kwargs)
 
-    def test(self, data, out):
-        result = self.parser.parse(data, tracking=True)
+    def new_parser(self, ctx: CompilationContext):
+        """
+        Return a lexer and parser private to one compilation, so that the
+        built tables can be shared by concurrent compilations.
+        Syntax errors are recorded in ctx.errors.
+        """
+        lexer = self.lexer.clone()
+        lexer.lineno = 1
+        parser = copy.copy(self.parser)
+        parser.ctx = ctx
+        parser.errorfunc = ctx.syntax_error
+        return lexer, parser
+
+    def parse(self, data, ctx: CompilationContext):
+        lexer, parser = self.new_parser(ctx)
+        return parser.parse(data, lexer=lexer, tracking=True)
+
+    def parse_statements(self, source, ctx: CompilationContext):
+        """
+        Parse source (str or bytes-like, e.g. a memory-mapped file) one top
+        level statement at a time, yielding each statement as soon as it is
+        parsed. Only the current statement is ever decoded and held in memory.
+        """
+        if isinstance(source, str):
+            source = source.encode()
+        lexer, parser = self.new_parser(ctx)
+        for start, end in split_statements(source):
+            # the lexer keeps counting lines across statements, but its
+            # positions start again with each statement
+            statement = source[start:end].decode()
+            result = parser.parse(statement, lexer=lexer, tracking=True)
+            ctx.lexpos_offset += len(statement)
+            if result is not None and result.stmt_lst:
+                yield from result.stmt_lst
+
+    def test(self, data, out, binary=False):
+        """
+        Parse data and write its tree to out, as JSON or in the binary
+        format of astSerializer
+        """
+        ctx = CompilationContext()
+        result = self.parse(data, ctx)
+        for error in ctx.errors:
+            print(*error.args)
+        if binary:
+            with open(out, 'wb') as f:
+                astSerializer.dump(result, f)
+            return
         visitor = ast.NodeVisitor()
         visitor.visit(result)
         with open(out, 'w') as f:
-            f.write(visitor.toJSON(result))
+            visitor.writeJSON(result, f)
 
 
 if __name__ == "__main__":
@@ -317,7 +419,10 @@ if __name__ == "__main__":
         description='Take in the python source code and parses it')
     argparser.add_argument(
         '-f', '--file', help='Input file with python source code', default=None)
+    argparser.add_argument(
+        '--binary', help='Write the trees in the binary format of astSerializer instead of JSON', action='store_true')
     args = argparser.parse_args()
+    extension = '.ast' if args.binary else '.json'
 
     m = pythonParser()
     m.build()
@@ -329,10 +434,10 @@ if __name__ == "__main__":
     if args.file:
         with open(args.file, 'r') as f:
             data = f.read()
-        m.test(data, os.path.join('out', os.path.split(args.file)[1]+'.json'))
+        m.test(data, os.path.join('out', os.path.split(args.file)[1]+extension), args.binary)
     else:
         for d in os.listdir('examples'):
             with open(os.path.join('examples', d)) as f:
                 data = f.read()
             name = os.path.split(d)[1]
-            m.test(data, os.path.join('out', name+'.json'))
+            m.test(data, os.path.join('out', name+extension), args.binary)
@@ -1,8 +1,45 @@
 #!/usr/bin/env python3
 
 import pythonAST
+from compilationContext import ParseError, RESERVED_PREFIX
 
-class ParseError(Exception): pass
+class Builtin(object):
+    """
+    One overload of a builtin function: the type names of its parameters
+    and result, the runtime function it is lowered to and the int constants
+    completing its arguments, e.g. range(n) calls list_range(0, n, 1)
+    """
+    def __init__(self, param_types, ret_type, c_name, leading=(), trailing=()):
+        self.param_types = param_types
+        self.ret_type = ret_type
+        self.c_name = c_name
+        self.leading = leading
+        self.trailing = trailing
+
+    def arguments(self, args, lineno):
+        constants = lambda values: [pythonAST.Constant(pythonAST.Type("int"), v, lineno) for v in values]
+        return constants(self.leading) + list(args) + constants(self.trailing)
+
+# The builtin prelude, by name. Each call is resolved to the first overload
+# taking the types of its arguments, see TypeChecker.check_FuncCall.
+BUILTINS = {
+    "len": (Builtin(("list",), "int", "list_length"), Builtin(("str",), "int", "string_length")),
+    "range": (Builtin(("int",), "list", "list_range", leading=(0,), trailing=(1,)),
+              Builtin(("int", "int"), "list", "list_range", trailing=(1,)),
+              Builtin(("int", "int", "int"), "list", "list_range")),
+    "sum": (Builtin(("list",), "int", "list_sum"),),
+    "min": (Builtin(("list",), "int", "list_min"), Builtin(("int", "int"), "int", "int_min")),
+    "max": (Builtin(("list",), "int", "list_max"), Builtin(("int", "int"), "int", "int_max")),
+    "str": (Builtin(("int",), "str", "int_to_string"),),
+}
+
+def check_name(name, line_number):
+    """
+    Raise a ParseError if name could be that of a compiler generated variable,
+    see RESERVED_PREFIX
+    """
+    if name.startswith(RESERVED_PREFIX):
+        raise ParseError(f"Names starting with {RESERVED_PREFIX} are reserved, cannot declare \"{name}\"", line_number)
 
 class SymbolTable(object):
     """
@@ -29,6 +66,7 @@ class SymbolTable(object):
         """
         if name in self.scope_stack[-1]:
             raise ParseError("Redeclaring variable named \"" + name + "\"", line_number)
+        check_name(name, line_number)
         self.scope_stack[-1][name] = var_type
 
     def lookup_variable(self, name, line_number):
@@ -46,10 +84,26 @@ class SymbolTable(object):
         """
         Declare a new function in this class, checking for duplicates
         """
-        if function_name in self.functions:
+        if function_name in self.functions or function_name in BUILTINS:
             raise ParseError("Redeclaring function named \"" + function_name + "\"", line_number)
+        check_name(function_name, line_number)
         self.functions[function_name] = function_node
     
+    def keep_signature(self, function_name):
+        """
+        Drop the body of the declared function named 'function_name', its
+        name, parameters and return type are enough to type check calls
+        """
+        function = self.functions[function_name]
+        self.functions[function_name] = pythonAST.FuncDecl(function.name, function.params, function.ret_type, None,
+                                                           function.lineno)
+
+    def lookup_builtin(self, function_name):
+        """
+        Return the overloads of the builtin named 'function_name', or None
+        """
+        return BUILTINS.get(function_name)
+
     def lookup_function(self, function_name, line_number):
         """
         Return the FunctionNode associated with the function named 'function_name',
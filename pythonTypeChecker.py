@@ -3,6 +3,8 @@
 from pythonSymbolTable import SymbolTable, ParseError
 import pythonAST as ast
 
+ANY = ast.Type("any")
+
 class TypeChecker(object):
     """
     Uses the same visitor pattern as ast.NodeVisitor, but modified to
@@ -29,11 +31,12 @@ class TypeChecker(object):
         """
         if not isinstance(t1, ast.Type) or not isinstance(t2, ast.Type):
             raise ParseError("eq_type invoked on non-type objects")
-        if t1.name == "any" or t2.name == "any":
-            return True
-        return t1.name == t2.name
+        # types are interned, see ast.Type
+        return t1 is t2 or t1 is ANY or t2 is ANY
 
     def check_FuncDecl(self, node, st: SymbolTable):
+        # declared first, so that the function can call itself
+        st.declare_function(node.name, node, node.lineno)
         st.push_scope()
         if node.params is not None:
             self.typecheck(node.params, st)
@@ -46,11 +49,12 @@ class TypeChecker(object):
                 raise ParseError("Mismatch of return type within function \"" + node.name + "\"", node.lineno)
         st.pop_scope()
 
-        st.declare_function(node.name, node, node.lineno)
-        
         return node.ret_type
     
     def check_FuncCall(self, node, st):
+        overloads = st.lookup_builtin(node.name)
+        if overloads is not None:
+            return self.check_builtin(node, overloads, st)
         function = st.lookup_function(node.name ,node.lineno)
 
         if len(function.params.params or []) != len(node.params.exprs or []):
@@ -63,7 +67,20 @@ class TypeChecker(object):
 
         return function.ret_type
 
-    
+    def check_builtin(self, node, overloads, st):
+        """
+        Resolve a call of a builtin by the types of its arguments. It is
+        lowered to a call of the runtime function of that overload.
+        """
+        args = node.params.exprs or []
+        arg_types = [self.typecheck(arg, st) for arg in args]
+        for builtin in overloads:
+            if len(builtin.param_types) == len(args) and \
+                    all(self.eq_type(t, ast.Type(p)) for t, p in zip(arg_types, builtin.param_types)):
+                node.builtin = builtin
+                return ast.Type(builtin.ret_type)
+        raise ParseError(f"No overload of builtin {node.name} takes these arguments", node.lineno)
+
     def check_AssignStm(self, node, st):
 
         var_type = st.lookup_variable(node.name, node.lineno)